@@ -13,6 +13,9 @@ class AccountPlan(Enum):
     STUDENT = "student" # "SP"
 
 class Account:
+    # no per-instance __dict__, keeps large account files small in memory
+    __slots__ = ("accountNumber", "holderName", "balance", "status", "plan")
+
     def __init__(self, accountNumber: str, holderName: str, balance: float):
         # account info
         self.accountNumber = accountNumber
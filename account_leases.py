@@ -0,0 +1,215 @@
+"""
+account_leases.py - account number blocks leased by concurrent front ends
+
+Several front ends started from the same accounts file would all hand
+out numbers from the same nextAccountNumber. With a shared lease file
+each process instead leases a block of blockSize numbers and allocates
+from it without further coordination; the lease file is only touched
+(under an exclusive lock on <lease file>.lock) to lease, renew or
+return a block.
+
+Lease file (JSON, replaced atomically):
+    next        first number never leased
+    free        [start, end) ranges that were returned, reused first
+    leases      owner, [start, end), reserved and expires of every block
+
+A holder may only issue numbers below `reserved`, which it moves ahead
+of what it uses (by reserveStep numbers, the whole block by default)
+before issuing them. Returning a block on shutdown frees everything from
+the next unused number. A lease that is not renewed within ttl seconds,
+or whose process is gone (same host), is reclaimed by the next process
+that takes the lock: only the part above its reserved mark is freed, so
+numbers a crashed process may have issued are never handed out again.
+"""
+
+import atexit
+import json
+import os
+import socket
+import threading
+import time
+
+LEASE_VERSION = 1
+
+DEFAULT_BLOCK_SIZE = 100
+DEFAULT_TTL = 3600.0
+
+# account numbers are five digits
+MAX_ACCOUNT_NUMBER = 99999
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock(file) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(file) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(file) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(file) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+# True unless owner is a process on this host that no longer exists
+def _ownerAlive(owner: str) -> bool:
+    host, _, rest = owner.partition(":")
+    pid = rest.partition(":")[0]
+    if host != socket.gethostname() or not pid.isdigit() or os.name != "posix":
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# [start, end) ranges with the parts below floor removed and neighbours joined
+def _normalize(ranges: list, floor: int) -> list:
+    merged = []
+    for start, end in sorted(ranges):
+        start = max(start, floor)
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class AccountNumberLeases:
+    def __init__(self, leaseFile: str, blockSize: int = DEFAULT_BLOCK_SIZE, ttl: float = DEFAULT_TTL,
+                 reserveStep: int = None):
+        if blockSize < 1:
+            raise ValueError("Lease block size must be at least 1")
+        self.leaseFile = leaseFile
+        self.blockSize = blockSize
+        self.ttl = ttl
+        self.reserveStep = reserveStep or blockSize
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._mutex = threading.Lock()
+        # the current block [start, end): numbers from next on, issued below reserved only
+        self.start = self.next = self.end = self.reserved = 0
+        self._expires = 0.0
+        self._registered = False
+
+    # the next account number, at least floor (the manager's nextAccountNumber)
+    def allocate(self, floor: int = 1) -> int:
+        with self._mutex:
+            if self.next < floor:
+                # the accounts file already holds numbers in this block
+                self.next = min(floor, self.end)
+            if self.next >= self.reserved or time.time() >= self._expires - self.ttl / 2:
+                self._update(floor)
+            number = self.next
+            self.next += 1
+            return number
+
+    # give the unused part of the block back
+    def release(self) -> None:
+        with self._mutex:
+            if self.end:
+                self._transact(self._returnBlock)
+                self.start = self.next = self.end = self.reserved = 0
+            if self._registered:
+                atexit.unregister(self.release)
+                self._registered = False
+
+    # renew the lease and move the reserved mark, or lease a new block
+    def _update(self, floor: int) -> None:
+        def update(state):
+            lease = self._findLease(state)
+            if lease is not None and self.next < self.end:
+                self.reserved = max(self.reserved, min(self.next + self.reserveStep, self.end))
+                lease["reserved"] = self.reserved
+                lease["expires"] = self._expires = time.time() + self.ttl
+                return
+            if lease is not None:
+                state["leases"].remove(lease)
+            self._leaseBlock(state, floor)
+        self._transact(update)
+        if not self._registered:
+            atexit.register(self.release)
+            self._registered = True
+
+    # our lease of the current block, None if there is none or it was reclaimed
+    def _findLease(self, state):
+        for lease in state["leases"]:
+            if lease["owner"] == self.owner and lease["start"] == self.start and self.end:
+                return lease
+        return None
+
+    # caller holds the lock
+    def _leaseBlock(self, state: dict, floor: int) -> None:
+        state["free"] = _normalize(state["free"], floor)
+        if state["free"]:
+            start, end = state["free"][0]
+            end = min(end, start + self.blockSize)
+            if end == state["free"][0][1]:
+                state["free"].pop(0)
+            else:
+                state["free"][0][0] = end
+        else:
+            start = max(state["next"], floor)
+            end = min(start + self.blockSize, MAX_ACCOUNT_NUMBER + 1)
+            if start >= end:
+                raise ValueError("No account numbers left to lease")
+            state["next"] = end
+        self.start, self.next, self.end = start, start, end
+        self.reserved = min(start + self.reserveStep, end)
+        self._expires = time.time() + self.ttl
+        state["leases"].append({"owner": self.owner, "start": start, "end": end,
+                                "reserved": self.reserved, "expires": self._expires})
+
+    def _returnBlock(self, state: dict) -> None:
+        lease = self._findLease(state)
+        if lease is not None:
+            state["leases"].remove(lease)
+            if self.next < self.end:
+                state["free"].append([self.next, self.end])
+
+    # run change(state) on the lease file under the lock, expired leases reclaimed first
+    def _transact(self, change) -> None:
+        with open(self.leaseFile + ".lock", "a+b") as lockFile:
+            _lock(lockFile)
+            try:
+                state = self._read()
+                now = time.time()
+                for lease in list(state["leases"]):
+                    if lease["owner"] == self.owner:
+                        continue
+                    if lease["expires"] < now or not _ownerAlive(lease["owner"]):
+                        state["leases"].remove(lease)
+                        if lease["reserved"] < lease["end"]:
+                            state["free"].append([lease["reserved"], lease["end"]])
+                change(state)
+                self._write(state)
+            finally:
+                _unlock(lockFile)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.leaseFile) as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return {"version": LEASE_VERSION, "next": 1, "free": [], "leases": []}
+        if state.get("version") != LEASE_VERSION:
+            raise ValueError(f"'{self.leaseFile}' is not a version {LEASE_VERSION} lease file")
+        return state
+
+    def _write(self, state: dict) -> None:
+        tmpName = self.leaseFile + ".tmp"
+        with open(tmpName, "w") as file:
+            json.dump(state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmpName, self.leaseFile)
@@ -3,19 +3,51 @@ account_manager.py - manages all account objects
 """
 
 from account import Account, AccountPlan
+from money import FLOAT_MONEY
+
+# accounts per page of search results
+SEARCH_PAGE_SIZE = 10
+
 class AccountManager:
-    def __init__(self):
+    def __init__(self, money=FLOAT_MONEY):
        
         # all accounts in the system
         self.accounts = {}
         self.nextAccountNumber = 1
 
+        # lower-cased holder name -> {accountNumber: Account}
+        # one holder can own several accounts, insertion order is kept
+        self.holderIndex = {}
+
+        # float dollars or integer cents, see money.py
+        self.money = money
+
+        # sorted holder names for searchHolders, built once the accounts are loaded
+        self.nameIndex = None
+
+        # AccountNumberLeases shared with other front ends (account_leases.py), if any
+        self.numberLeases = None
+
+        # the front end's output sink (output_sink.py) for load messages, printed when None
+        self.output = None
+
+    # a message for the user, in order with the front end's own messages
+    def message(self, text: str) -> None:
+        if self.output is None:
+            print(text)
+        else:
+            self.output.message(text)
+
     # create new account
     def createAccount(self, holderName: str, balance: float) -> Account:
-        accountNumber = f"{self.nextAccountNumber:05d}"
+        if self.numberLeases is not None:
+            # from this process's leased block, never below the loaded accounts
+            accountNumber = f"{self.numberLeases.allocate(self.nextAccountNumber):05d}"
+        else:
+            accountNumber = f"{self.nextAccountNumber:05d}"
+            self.nextAccountNumber += 1
         account = Account(accountNumber, holderName, balance)
         # self.accounts[accountNumber] = account - back end handels this
-        self.nextAccountNumber += 1
         return account
         
     # save accounts to file
@@ -23,16 +55,78 @@ class AccountManager:
         with open(filename, "w") as file:
             for account in self.accounts.values():
                 status = "A" if account.isActive() else "D"
-                line = f"{account.accountNumber} {account.holderName} {status} {account.balance:.2f}"
+                line = f"{account.accountNumber} {account.holderName} {status} {self.money.format(account.balance)}"
                 file.write(line + "\n")
             file.write("END_OF_FILE\n")
 
+    # add account to the system and the holder name index
+    def addAccount(self, account: Account) -> None:
+        key = account.holderName.lower()
+        old = self.accounts.get(account.accountNumber)
+        if old is not None and old.holderName.lower() != key:
+            self._unindexAccount(old)
+        self.accounts[account.accountNumber] = account
+        owned = self.holderIndex.get(key)
+        if owned is None:
+            owned = self.holderIndex[key] = {}
+            if self.nameIndex is not None:
+                self.nameIndex.add(key)
+        owned[account.accountNumber] = account
+
+    # remove account from the holder name index
+    def _unindexAccount(self, account: Account) -> None:
+        key = account.holderName.lower()
+        owned = self.holderIndex.get(key)
+        if owned is None:
+            return
+        owned.pop(account.accountNumber, None)
+        if not owned:
+            del self.holderIndex[key]
+
     # find account by holder name
     def findByHolderName(self, holderName: str):
-        for account in self.accounts.values():
-            if account.holderName.lower() == holderName.lower():
-                return account
-        return None
+        owned = self.holderIndex.get(holderName.lower())
+        if not owned:
+            return None
+        return next(iter(owned.values()))
+
+    # find every account owned by holder name
+    def findAllByHolderName(self, holderName: str) -> list:
+        owned = self.holderIndex.get(holderName.lower())
+        if not owned:
+            return []
+        return list(owned.values())
+
+    # index the holder names loaded so far (one sort), see name_index.py
+    def buildNameIndex(self) -> None:
+        from name_index import NameIndex
+        self.nameIndex = NameIndex(self.holderIndex)
+
+    # accounts whose holder name starts with query, or with maxDistance > 0 is
+    # within that many edits of it (closest first); returns one page of them
+    # and whether more pages follow
+    def searchHolders(self, query: str, maxDistance: int = 0, page: int = 1,
+                      pageSize: int = SEARCH_PAGE_SIZE) -> tuple:
+        if self.nameIndex is None:
+            raise ValueError("Holder names are not indexed")
+        if page < 1:
+            raise ValueError("Page numbers start at 1")
+        if maxDistance:
+            names = (name for _, name in self.nameIndex.fuzzy(query, maxDistance))
+        else:
+            names = self.nameIndex.prefix(query)
+        skip = (page - 1) * pageSize
+        accounts = []
+        for name in names:
+            # names whose accounts were all deleted stay in the index
+            for account in self.findAllByHolderName(name):
+                if skip:
+                    skip -= 1
+                elif len(accounts) == pageSize:
+                    return accounts, True
+                else:
+                    accounts.append(account)
+        return accounts, False
     
     # find account by number
     def getAccount(self, accountNumber: str) -> Account:
@@ -40,6 +134,7 @@ class AccountManager:
     
     def deleteAccount(self, accountNumber: str):
         if accountNumber in self.accounts:
+            self._unindexAccount(self.accounts[accountNumber])
             del self.accounts[accountNumber]
     
     # disable account
@@ -48,6 +143,11 @@ class AccountManager:
         if account:
             account.disable()
     
+    # move funds between two accounts
+    def transferFunds(self, fromAccount: Account, toAccount: Account, amount: float) -> None:
+        fromAccount.adjustBalance(-amount)
+        toAccount.adjustBalance(amount)
+
     # change account plan
     def changeAccountPlan(self, accountNumber: str, newPlan: str) -> None:
         account = self.getAccount(accountNumber)
@@ -61,25 +161,36 @@ class AccountManager:
                     line = raw.strip()
                     if not line or line.startswith("END_OF_FILE"):
                         break
-                    parts = line.split()
 
-                    if len(parts) < 4:
+                    account = parseAccountLine(line, self.money)
+                    if account is None:
                         continue
 
-                    acctNum = parts[0]
-                    holderName = " ".join(parts[1:-2])
-                    status = parts[-2]
-                    balance = float(parts[-1])
-                    account = Account(acctNum, holderName, balance)
+                    self.addAccount(account)
 
-                    if status == "disabled" or status.lower() == "d":
-                        account.disable()
-
-                    self.accounts[acctNum] = account
-
-                    num = int(acctNum)
+                    num = int(account.accountNumber)
                     if num >= self.nextAccountNumber:
                         self.nextAccountNumber = num + 1
 
         except FileNotFoundError:
-            print(f"Account file '{filename}' not found.")
\ No newline at end of file
+            self.message(f"Account file '{filename}' not found.")
+        self.buildNameIndex()
+
+
+# parse one current accounts record, None if the line is malformed
+def parseAccountLine(line: str, money=FLOAT_MONEY):
+    parts = line.split()
+
+    if len(parts) < 4:
+        return None
+
+    acctNum = parts[0]
+    holderName = " ".join(parts[1:-2])
+    status = parts[-2]
+    balance = money.parse(parts[-1])
+    account = Account(acctNum, holderName, balance)
+
+    if status == "disabled" or status.lower() == "d":
+        account.disable()
+
+    return account
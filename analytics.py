@@ -0,0 +1,217 @@
+"""
+analytics.py - end-of-day totals over a day's transactions
+
+A transaction set is turned into columns (codes, account numbers,
+amounts in cents, extras, session keys) from a live TransactionManager
+or from archived .atf files, and the aggregates are computed a column
+at a time:
+    byCode / byPayee    masks built with bytes.translate and summed
+                        with itertools.compress, no per-record Python code
+    byAccount / bySession / topAccounts
+                        counts with Counter, sums in one pass into a dense
+                        array indexed by key (a dict for sparse keys)
+    limitUsage          per-session withdraw / transfer / paybill totals
+                        as a share of the session limits, in 10% buckets
+
+Live transactions carry the id of the session that recorded them. The
+.atf format does not record sessions, so for files a session is one
+holder name within one file (a standard session belongs to one holder).
+
+Usage (JSON report for archived files):
+    python analytics.py [--top N] <transactions_file>...
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import sys
+from array import array
+from collections import Counter
+
+from money import CENTS_MONEY, formatCents
+from session import Session
+from transaction import TRANSFER_CREDIT
+from transaction_reader import TransactionColumns, readColumns, withoutTransferCredits
+from validation import PAYBILL, PAYEES
+
+PAYBILL_CODE = PAYBILL
+
+# code -> name of the session limit it counts against
+LIMITED_CODES = {1: "withdraw", 2: "transfer", 3: "paybill"}
+
+# share of a limit per bucket
+LIMIT_BUCKET = 0.1
+LIMIT_BUCKETS = 10
+
+# keys below this are summed into a dense array instead of a dict
+DENSE_KEYS = 1 << 22
+
+
+# columns plus a session key per record
+class DailyColumns(TransactionColumns):
+    def __init__(self):
+        super().__init__()
+        self.sessions = array("Q")
+
+
+# the transactions of a TransactionManager as DailyColumns
+def columnsFromManager(manager) -> DailyColumns:
+    columns = DailyColumns()
+    # one pass, getAllTransactions may stream them
+    for transaction in manager.getAllTransactions():
+        if transaction.code == "02" and transaction.extra == TRANSFER_CREDIT:
+            # a transfer counts once, on its source account
+            continue
+        columns.codes.append(int(transaction.code))
+        columns.accountNumbers.append(int(transaction.accountNumber))
+        if transaction.money.cents:
+            columns.amounts.append(int(transaction.amount))
+        else:
+            columns.amounts.append(round(transaction.amount * 100))
+        columns.holderNames.append(transaction.holderName)
+        columns.extras.append(transaction.extra)
+        columns.sessions.append(transaction.session or 0)
+    columns.finished = True
+    return columns
+
+
+# the transactions of daily files as DailyColumns, one session per holder per file
+def columnsFromFiles(filenames: list, errors: list = None) -> DailyColumns:
+    columns = DailyColumns()
+    sessionKeys = {}
+    for fileIndex, filename in enumerate(filenames):
+        part = withoutTransferCredits(readColumns(filename, errors))
+        columns.codes += part.codes
+        columns.accountNumbers += part.accountNumbers
+        columns.amounts += part.amounts
+        columns.holderNames += part.holderNames
+        columns.extras += part.extras
+        keys = [(fileIndex, name.lower()) for name in part.holderNames]
+        for key in keys:
+            if key not in sessionKeys:
+                sessionKeys[key] = len(sessionKeys) + 1
+        columns.sessions += array("Q", map(sessionKeys.__getitem__, keys))
+    columns.finished = True
+    return columns
+
+
+# 1 where values[i] is one of wanted, else 0 (values: bytes of small ints)
+def _mask(values: bytes, wanted) -> bytes:
+    table = bytearray(256)
+    for value in wanted:
+        table[value] = 1
+    return values.translate(table)
+
+
+# (count, total cents) of the records selected by mask
+def _countAndSum(amounts: array, mask: bytes) -> tuple:
+    return mask.count(1), sum(itertools.compress(amounts, mask))
+
+
+# code -> (count, total cents)
+def byCode(columns: TransactionColumns) -> dict:
+    codes = columns.codes.tobytes()
+    return {code: _countAndSum(columns.amounts, _mask(codes, (code,))) for code in sorted(set(codes))}
+
+
+# payee -> (count, total cents) over the paybill records
+def byPayee(columns: TransactionColumns) -> dict:
+    payeeIds = {payee: i + 1 for i, payee in enumerate(PAYEES)}
+    extras = bytes(map(payeeIds.get, columns.extras, itertools.repeat(0, len(columns.extras))))
+    paybill = _mask(columns.codes.tobytes(), (PAYBILL_CODE,))
+    # payee id where the record is a paybill, 0 elsewhere
+    payees = bytes(map(int.__mul__, extras, paybill))
+    return {payee: _countAndSum(columns.amounts, _mask(payees, (payeeIds[payee],))) for payee in PAYEES}
+
+
+# key -> [count, total cents]
+def _group(keys: array, amounts: array) -> dict:
+    counts = Counter(keys)
+    if not counts:
+        return {}
+    top = max(counts)
+    if 0 <= min(counts) and top < DENSE_KEYS:
+        totals = array("q", bytes(8 * (top + 1)))
+    else:
+        totals = dict.fromkeys(counts, 0)
+    for key, amount in zip(keys, amounts):
+        totals[key] += amount
+    return {key: [count, totals[key]] for key, count in counts.items()}
+
+
+# account number -> [count, total cents]
+def byAccount(columns: TransactionColumns) -> dict:
+    return _group(columns.accountNumbers, columns.amounts)
+
+
+# session key -> [count, total cents]
+def bySession(columns: DailyColumns) -> dict:
+    return _group(columns.sessions, columns.amounts)
+
+
+# the n accounts with the largest total amount (or count), largest first
+def topAccounts(columns: TransactionColumns, n: int = 10, by: str = "amount", groups: dict = None) -> list:
+    groups = groups if groups is not None else byAccount(columns)
+    field = 1 if by == "amount" else 0
+    return heapq.nlargest(n, groups.items(), key=lambda item: item[1][field])
+
+
+# limit name -> bucket counts of per-session totals as a share of the limit;
+# bucket i holds shares in (i * 10%, (i + 1) * 10%], the last one is over the limit
+def limitUsage(columns: DailyColumns) -> dict:
+    session = Session(CENTS_MONEY)
+    limits = {
+        "withdraw": session.withdrawLimit,
+        "transfer": session.transferLimit,
+        "paybill": session.paybillLimit,
+    }
+
+    codes = columns.codes.tobytes()
+    usage = {}
+    for code, name in LIMITED_CODES.items():
+        mask = _mask(codes, (code,))
+        totals = _group(array("Q", itertools.compress(columns.sessions, mask)),
+                        array("q", itertools.compress(columns.amounts, mask)))
+        buckets = [0] * (LIMIT_BUCKETS + 1)
+        for _, total in totals.values():
+            share = total / limits[name]
+            index = min(int(share / LIMIT_BUCKET - 1e-9), LIMIT_BUCKETS) if share > 0 else 0
+            buckets[index] += 1
+        usage[name] = buckets
+    return usage
+
+
+# the whole end-of-day report, amounts formatted as dollars
+def dailyReport(columns: DailyColumns, top: int = 10) -> dict:
+    accounts = byAccount(columns)
+    sessions = bySession(columns)
+
+    def totals(count, cents):
+        return {"count": count, "total": formatCents(cents)}
+
+    labels = [f"{i * 10}-{(i + 1) * 10}%" for i in range(LIMIT_BUCKETS)] + [">100%"]
+    return {
+        "records": len(columns),
+        "by_code": {f"{code:02}": totals(*value) for code, value in byCode(columns).items()},
+        "by_payee": {payee: totals(*value) for payee, value in byPayee(columns).items()},
+        "accounts": len(accounts),
+        "sessions": len(sessions),
+        "top_accounts": [dict(account=f"{num:05d}", **totals(*value))
+                         for num, value in topAccounts(columns, top, groups=accounts)],
+        "limit_usage": {name: dict(zip(labels, buckets)) for name, buckets in limitUsage(columns).items()},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-of-day analytics for daily transaction files.")
+    parser.add_argument("files", nargs="+", help="daily transaction files")
+    parser.add_argument("--top", type=int, default=10, help="accounts in the top list")
+    args = parser.parse_args()
+
+    try:
+        report = dailyReport(columnsFromFiles(args.files), args.top)
+    except (FileNotFoundError, ValueError) as error:
+        print(f"Could not read transactions: {error}")
+        sys.exit(1)
+    print(json.dumps(report, indent=2))
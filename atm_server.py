@@ -0,0 +1,267 @@
+# =========================================================
+# Program: atm_server.py
+# Purpose:
+#   Serves many ATM terminal sessions at once over a local TCP
+#   or Unix socket. Accounts are loaded once and shared by every
+#   connection; each connection gets its own Session and speaks
+#   the same line protocol as the terminal front end.
+#
+#   Commands run on one thread per connection. Commands that
+#   check and change balances hold per-account locks (taken in
+#   account number order), so concurrent withdrawals, transfers
+#   and bill payments can never overdraw an account.
+#
+# How to Run:
+#   python atm_server.py current_accounts.txt transout.atf --port 9060
+#   python atm_server.py current_accounts.txt transout.atf --unix /tmp/atm.sock
+#
+#   --output events sends one JSON record per command instead of the
+#   terminal messages (used by benchmarks/bench_server.py); the
+#   default is ATM_OUTPUT.
+#
+# Settings: the ATM_* environment variables of frontend_main.py
+#   apply, except that
+#   - ATM_DELTA_LOG saves the changed accounts once, when the server
+#     stops, not on every logout
+#   - ATM_STATS is written when the server stops (and on SIGUSR1)
+#   - ATM_PROFILE=cpu is refused, cProfile would only see the event
+#     loop thread; ATM_PROFILE=memory covers every connection
+# =========================================================
+
+import argparse
+import asyncio
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+
+from frontend_main import FrontendMain, createAccountManager, createTransactionManager, settingsError
+from instrumentation import createStats
+from money import CENTS_MONEY, FLOAT_MONEY
+from output_sink import SINKS, createSink
+
+
+# one lock per account plus a lock for the manager as a whole
+class AccountLocks:
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+        self.managerLock = threading.RLock()
+
+    def _lockFor(self, accountNumber: str):
+        lock = self._locks.get(accountNumber)
+        if lock is None:
+            with self._guard:
+                lock = self._locks.setdefault(accountNumber, threading.Lock())
+        return lock
+
+    # context manager holding the accounts, or the manager with no arguments
+    def hold(self, *accountNumbers):
+        if not accountNumbers:
+            return self.managerLock
+        return HeldLocks([self._lockFor(num) for num in sorted(set(accountNumbers))])
+
+
+class HeldLocks:
+    def __init__(self, locks: list):
+        self.locks = locks
+
+    def __enter__(self):
+        for lock in self.locks:
+            lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        for lock in reversed(self.locks):
+            lock.release()
+        return False
+
+
+# transaction manager shared by every connection
+class SharedTransactions:
+    def __init__(self, manager):
+        self.manager = manager
+        self._lock = threading.Lock()
+
+    def addTransaction(self, transaction):
+        with self._lock:
+            self.manager.addTransaction(transaction)
+
+    def addTransactions(self, transactions: list):
+        with self._lock:
+            self.manager.addTransactions(transactions)
+
+    def writeTransactionsToFile(self, filename: str):
+        with self._lock:
+            self.manager.writeTransactionsToFile(filename)
+
+    def closeTransactionFile(self, filename: str):
+        with self._lock:
+            self.manager.closeTransactionFile(filename)
+
+    def getAllTransactions(self):
+        return self.manager.getAllTransactions()
+
+
+# output stream that hands text to the connection's event loop
+class ConnectionStream:
+    def __init__(self, loop, writer):
+        self.loop = loop
+        self.writer = writer
+
+    def write(self, text: str) -> None:
+        self.loop.call_soon_threadsafe(self.writer.write, text.encode())
+
+    def flush(self) -> None:
+        pass
+
+
+# front end for one connection, reads its lines from inbox
+class SessionFrontend(FrontendMain):
+    def __init__(self, server, inbox, stream):
+        super().__init__()
+        self.server = server
+        self.accountManager = server.accountManager
+        self.transactionManager = server.transactionManager
+        self.useMoney(server.money)
+        self.accountsFile = server.accountsFile
+        self.transactionsFile = server.transactionsFile
+        self.output = createSink(server.outputMode, stream)
+        self.stats = server.stats
+        self._inbox = inbox
+
+    def readInput(self) -> str:
+        self.output.flush()
+        line = self._inbox.get()
+        if line is None:
+            raise EOFError
+        return line
+
+    def lockAccounts(self, *accountNumbers):
+        return self.server.locks.hold(*accountNumbers)
+
+    # exit/quit only ends this connection, the daily file stays open and
+    # the accounts are saved when the server stops
+    def processCommand(self, command: str):
+        if command not in ("exit", "quit"):
+            super().processCommand(command)
+            return
+        start = time.perf_counter()
+        self._lastTransaction = None
+        if self.session.isLoggedIn():
+            self.handleLogout()
+        self.output.message("Thank you for using the ATM. Goodbye!")
+        self.commandDone(command, start)
+        raise EOFError
+
+    def serve(self) -> None:
+        try:
+            self.welcomeMessage()
+            self.runCommands()
+        finally:
+            self.output.close()
+
+
+class ATMServer:
+    def __init__(self, accountsFile: str, transactionsFile: str, outputMode: str = "text"):
+        self.accountsFile = accountsFile
+        self.transactionsFile = transactionsFile
+        self.outputMode = outputMode
+        self.money = CENTS_MONEY if os.environ.get("ATM_CENTS") == "1" else FLOAT_MONEY
+        self.saveAccounts = os.environ.get("ATM_DELTA_LOG") == "1"
+        self.stats = createStats()
+        if self.stats is not None and "cpu" in self.stats.profilers:
+            raise ValueError("ATM_PROFILE=cpu is not supported by the server")
+        self.accountManager = createAccountManager()
+        self.accountManager.money = self.money
+        self.transactionManager = SharedTransactions(createTransactionManager(transactionsFile))
+        if self.stats is not None:
+            self.stats.attach(self)
+            self.stats.installSignalHandler()
+            self.stats.startProfilers()
+        self.accountManager.loadAccountsFromFile(accountsFile)
+        self.locks = AccountLocks()
+        self.connections = 0
+
+    async def handleClient(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        inbox = queue.SimpleQueue()
+        done = loop.create_future()
+        frontend = SessionFrontend(self, inbox, ConnectionStream(loop, writer))
+
+        def run():
+            try:
+                frontend.serve()
+            finally:
+                loop.call_soon_threadsafe(done.set_result, None)
+
+        self.connections += 1
+        threading.Thread(target=run, name=f"atm-session-{self.connections}", daemon=True).start()
+        try:
+            while not done.done():
+                readLine = asyncio.ensure_future(reader.readline())
+                await asyncio.wait({readLine, done}, return_when=asyncio.FIRST_COMPLETED)
+                if not readLine.done():
+                    readLine.cancel()
+                    break
+                line = readLine.result()
+                if not line:
+                    break
+                inbox.put(line.decode().rstrip("\r\n"))
+        finally:
+            inbox.put(None)
+            await done
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9060, unixPath: str = None):
+        if unixPath:
+            server = await asyncio.start_unix_server(self.handleClient, path=unixPath)
+        else:
+            server = await asyncio.start_server(self.handleClient, host, port)
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        async with server:
+            await stop.wait()
+
+    # write the end of transactions record, the changed accounts and the
+    # stats when the server stops
+    def close(self) -> None:
+        self.transactionManager.closeTransactionFile(self.transactionsFile)
+        if self.saveAccounts:
+            with self.locks.hold():
+                self.accountManager.saveAccountsToFile(self.accountsFile)
+        if self.stats is not None:
+            self.stats.dump()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-session ATM server.")
+    parser.add_argument("accounts_file")
+    parser.add_argument("transactions_file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9060)
+    parser.add_argument("--unix", default=None, help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--output", choices=sorted(SINKS), default=os.environ.get("ATM_OUTPUT", "text"))
+    args = parser.parse_args()
+
+    error = settingsError()
+    if error:
+        print(error)
+        sys.exit(1)
+    try:
+        atmServer = ATMServer(args.accounts_file, args.transactions_file, args.output)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+    try:
+        asyncio.run(atmServer.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        atmServer.close()
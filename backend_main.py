@@ -0,0 +1,347 @@
+# =========================================================
+# Program: backend_main.py
+# Course: CSCI 3060U - Winter 2025
+# Group: Class Project Group 27
+# =========================================================
+# Purpose:
+#   This program is the Back End of the banking system. It applies
+#   the day's merged transaction file to the previous current accounts
+#   file and writes the new current accounts file.
+#
+# How it works:
+#   - Transactions are sorted by account number (stable, so each
+#     account sees its transactions in the order they happened).
+#     Runs larger than RUN_SIZE are sorted in memory, spilled to
+#     temporary .atf files and merged back.
+#   - The accounts file (sorted by account number) and the sorted
+#     transactions are streamed side by side; only one account is
+#     held at a time.
+#   - Codes 01 - 08 are applied; a transaction that cannot be applied
+#     is rejected with a reason and leaves the account unchanged.
+#   - A transfer is two 02 records written together: the debit of the
+#     source account, then the credit of the target account (MM = CR).
+#     The legs are paired in file order before sorting, so the file
+#     must keep the terminals' order (merge_transactions.py without
+#     --by-account); a leg without its partner is rejected. When one
+#     leg is rejected, a second pass over the new accounts takes the
+#     other leg back.
+#   - The new accounts are written through
+#     AccountManager.saveAccountsToFile.
+#
+# Input Files:
+#   - current_accounts.txt              previous current bank account records
+#   - transactions .atf                 the day's merged transaction file
+#                                       (see merge_transactions.py)
+#
+# Output Files:
+#   - new current accounts file
+#   - Terminal log                      one line per rejected transaction,
+#                                       written as it is rejected
+#
+# How to Run:
+#   python backend_main.py current_accounts.txt merged.atf new_accounts.txt
+#
+# Environment:
+#   - ATM_CENTS=1                       keep amounts as integer cents instead of
+#                                       float dollars
+# =========================================================
+
+import heapq
+import itertools
+import os
+import sys
+import tempfile
+from array import array
+
+from account import Account, AccountPlan
+from account_manager import AccountManager, parseAccountLine
+from money import CENTS_MONEY, FLOAT_MONEY
+from transaction import TRANSFER_CREDIT
+from transaction_encoder import writeEncoded
+from transaction_reader import readTransactions
+
+# transactions sorted in memory before a run is spilled to disk
+RUN_SIZE = 500000
+
+# 08 records the plan letter typed at the front end
+PLANS = {"S": AccountPlan.STUDENT, "N": AccountPlan.NON_STUDENT}
+
+# pair numbers read back at a time from a run's .pairs file
+PAIR_CHUNK = 1 << 14
+
+
+# the accounts iterated by AccountManager.saveAccountsToFile
+class AccountStream:
+    def __init__(self, accounts):
+        self._accounts = accounts
+
+    def values(self):
+        return self._accounts
+
+
+# accounts of a current accounts file, which must be sorted by number
+def readAccounts(filename: str, money=FLOAT_MONEY):
+    last = -1
+    with open(filename, "r") as file:
+        for raw in file:
+            line = raw.strip()
+            if not line or line.startswith("END_OF_FILE"):
+                break
+            account = parseAccountLine(line, money)
+            if account is None:
+                continue
+            num = int(account.accountNumber)
+            if num <= last:
+                raise ValueError(f"Account file '{filename}' is not sorted by account number")
+            last = num
+            yield account
+
+
+# give each debit record of a transfer and the credit record right after it
+# the same pair number and the account of the other leg (other); legs
+# without a partner keep pair 0
+def pairTransfers(transactions):
+    pairs = itertools.count(1)
+    debit = None
+    for transaction in transactions:
+        transaction.pair = 0
+        transaction.other = 0
+        if debit is not None:
+            if (transaction.code == "02" and transaction.extra == TRANSFER_CREDIT
+                    and transaction.amount == debit.amount):
+                debit.pair = transaction.pair = next(pairs)
+                debit.other = int(transaction.accountNumber)
+                transaction.other = int(debit.accountNumber)
+            yield debit
+            debit = None
+        if transaction.code == "02" and transaction.extra != TRANSFER_CREDIT:
+            debit = transaction
+        else:
+            yield transaction
+    if debit is not None:
+        yield debit
+
+
+# a sorted run as an .atf file plus (pair, other) of every record in runFile.pairs
+def _writeRun(run: list, runFile: str) -> None:
+    writeEncoded(run, runFile)
+    with open(runFile + ".pairs", "wb") as file:
+        array("q", (value for transaction in run for value in (transaction.pair, transaction.other))).tofile(file)
+
+
+def _readRun(runFile: str, money):
+    with open(runFile + ".pairs", "rb") as file:
+        values = array("q")
+        i = 0
+        for transaction in readTransactions(runFile, money=money):
+            if i == len(values):
+                values = array("q")
+                i = 0
+                try:
+                    values.fromfile(file, 2 * PAIR_CHUNK)
+                except EOFError:
+                    pass  # the last chunk is shorter, what was there is read
+            transaction.pair = values[i]
+            transaction.other = values[i + 1]
+            i += 2
+            yield transaction
+
+
+# transactions of filename ordered by account number, file order kept per account
+def sortTransactions(filename: str, tmpdir: str, money=FLOAT_MONEY, runSize: int = RUN_SIZE):
+    def key(transaction):
+        return int(transaction.accountNumber)
+
+    runs = []
+    run = []
+    for transaction in pairTransfers(readTransactions(filename, money=money)):
+        run.append(transaction)
+        if len(run) >= runSize:
+            run.sort(key=key)
+            runFile = os.path.join(tmpdir, f"run{len(runs)}.atf")
+            _writeRun(run, runFile)
+            runs.append(runFile)
+            run = []
+    run.sort(key=key)
+
+    if not runs:
+        return iter(run)
+    # heapq.merge is stable: equal keys come out in run order
+    return heapq.merge(*[_readRun(runFile, money) for runFile in runs], run, key=key)
+
+
+class BackEnd:
+    # report(transaction, reason) is called for every rejected transaction
+    def __init__(self, money=FLOAT_MONEY, runSize: int = RUN_SIZE, report=None):
+        self.money = money
+        self.runSize = runSize
+        self.maxBalance = money.fromDollars(99999.99)
+        self.report = report
+        self.applied = 0
+        self.rejected = 0
+        # pair -> the rejected leg, for transfers with exactly one leg rejected
+        self.rejectedLegs = {}
+
+    def reject(self, transaction, reason: str) -> None:
+        self.rejected += 1
+        if self.report is not None:
+            self.report(transaction, reason)
+        pair = getattr(transaction, "pair", 0)
+        if pair:
+            # both legs rejected: nothing was moved, nothing to take back
+            if self.rejectedLegs.pop(pair, None) is None:
+                self.rejectedLegs[pair] = transaction
+
+    # apply one transaction to account (None if it does not exist),
+    # returns the account as it is afterwards
+    def apply(self, account, transaction):
+        code = transaction.code
+        amount = transaction.amount
+
+        if code == "05":
+            if account is not None:
+                self.reject(transaction, "account number already in use")
+                return account
+            if amount < 0 or amount > self.maxBalance:
+                self.reject(transaction, "balance must be between $0.00 and $99,999.99")
+                return account
+            self.applied += 1
+            return Account(transaction.accountNumber, transaction.holderName, amount)
+
+        if account is None:
+            self.reject(transaction, "account not found")
+            return account
+        if not account.matchesOwner(transaction.holderName):
+            self.reject(transaction, "holder name does not match the account")
+            return account
+
+        credit = code == "02" and transaction.extra == TRANSFER_CREDIT
+        if code == "02" and not getattr(transaction, "pair", 0):
+            self.reject(transaction, "transfer record without its other leg")
+            return account
+        if code in ("01", "03") or (code == "02" and not credit):
+            # withdrawal, paybill and the debit of a transfer
+            if not account.isActive():
+                self.reject(transaction, "account is disabled")
+                return account
+            if account.balance < amount:
+                self.reject(transaction, "insufficient funds")
+                return account
+            account.adjustBalance(-amount)
+        elif code == "04" or credit:
+            # deposit and the credit of a transfer
+            if not account.isActive():
+                self.reject(transaction, "account is disabled")
+                return account
+            if account.balance + amount > self.maxBalance:
+                self.reject(transaction, "balance would exceed $99,999.99")
+                return account
+            account.adjustBalance(amount)
+        elif code == "06":
+            self.applied += 1
+            return None
+        elif code == "07":
+            account.disable()
+        elif code == "08":
+            plan = PLANS.get(transaction.extra.upper())
+            if plan is None:
+                self.reject(transaction, "unknown plan")
+                return account
+            account.changePlan(plan)
+        else:
+            self.reject(transaction, f"unknown transaction code {code}")
+            return account
+
+        self.applied += 1
+        return account
+
+    # sort-merge the accounts with the sorted transactions
+    def mergeAccounts(self, accounts, transactions):
+        accounts = iter(accounts)
+        nextAccount = next(accounts, None)
+        currentKey = None
+        current = None
+
+        for transaction in transactions:
+            key = int(transaction.accountNumber)
+            if key != currentKey:
+                if current is not None:
+                    yield current
+                # accounts without transactions are passed through
+                while nextAccount is not None and int(nextAccount.accountNumber) < key:
+                    yield nextAccount
+                    nextAccount = next(accounts, None)
+                current = None
+                if nextAccount is not None and int(nextAccount.accountNumber) == key:
+                    current = nextAccount
+                    nextAccount = next(accounts, None)
+                currentKey = key
+            current = self.apply(current, transaction)
+
+        if current is not None:
+            yield current
+        while nextAccount is not None:
+            yield nextAccount
+            nextAccount = next(accounts, None)
+
+    # second pass: take back the applied leg of every transfer whose other
+    # leg was rejected, in account number order
+    def undoTransferLegs(self, accounts):
+        legs = sorted(self.rejectedLegs.values(), key=lambda leg: leg.other)
+        self.rejectedLegs = {}
+        i = 0
+        for account in accounts:
+            num = int(account.accountNumber)
+            while i < len(legs) and legs[i].other <= num:
+                leg = legs[i]
+                i += 1
+                if leg.other < num:
+                    self._notUndone(leg)
+                    continue
+                # a rejected credit leaves the debit to return, a rejected debit the credit to take back
+                account.adjustBalance(leg.amount if leg.extra == TRANSFER_CREDIT else -leg.amount)
+                self.applied -= 1
+                self.rejected += 1
+                if self.report is not None:
+                    self.report(leg, f"other leg in account {leg.other:05d} taken back")
+            yield account
+        for leg in legs[i:]:
+            self._notUndone(leg)
+
+    def _notUndone(self, leg) -> None:
+        if self.report is not None:
+            self.report(leg, f"other leg could not be taken back, account {leg.other:05d} not found")
+
+    # write the new accounts file from the old one and the day's transactions
+    def run(self, accountsFile: str, transactionsFile: str, outputFile: str) -> None:
+        manager = AccountManager(self.money)
+        tmpFile = outputFile + ".tmp"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            transactions = sortTransactions(transactionsFile, tmpdir, self.money, self.runSize)
+            merged = self.mergeAccounts(readAccounts(accountsFile, self.money), transactions)
+            manager.accounts = AccountStream(merged)
+            manager.saveAccountsToFile(tmpFile)
+            if self.rejectedLegs:
+                undoneFile = os.path.join(tmpdir, "undone.txt")
+                manager.accounts = AccountStream(self.undoTransferLegs(readAccounts(tmpFile, self.money)))
+                manager.saveAccountsToFile(undoneFile)
+                os.replace(undoneFile, tmpFile)
+        os.replace(tmpFile, outputFile)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python backend_main.py <current_accounts_file> <transactions_file> <new_accounts_file>")
+        sys.exit(1)
+
+    def report(transaction, reason):
+        print(f"Rejected {transaction.formatForFile()} - {reason}")
+
+    backEnd = BackEnd(CENTS_MONEY if os.environ.get("ATM_CENTS") == "1" else FLOAT_MONEY, report=report)
+    try:
+        backEnd.run(sys.argv[1], sys.argv[2], sys.argv[3])
+    except (FileNotFoundError, ValueError) as error:
+        print(f"Back end failed: {error}")
+        sys.exit(1)
+
+    print(f"{backEnd.applied} transactions applied, {backEnd.rejected} rejected.")
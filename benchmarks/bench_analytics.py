@@ -0,0 +1,45 @@
+# =========================================================
+# Script: bench_analytics.py
+# Purpose: Time each end-of-day aggregate on a generated
+#          day of transactions.
+#
+# How to run:
+#   python benchmarks/bench_analytics.py [--accounts N] [--transactions N]
+# =========================================================
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import analytics
+from bench_backend import makeTransactions
+from transaction_encoder import writeEncoded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the end-of-day analytics.")
+    parser.add_argument("--accounts", type=int, default=90000)
+    parser.add_argument("--transactions", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        transactionsFile = os.path.join(tmp, "merged.atf")
+        writeEncoded(makeTransactions(args.accounts, args.transactions), transactionsFile)
+        start = time.perf_counter()
+        columns = analytics.columnsFromFiles([transactionsFile])
+        print(f"{'columnsFromFiles':<18}{time.perf_counter() - start:8.2f}s")
+
+    for aggregate in (analytics.byCode, analytics.byPayee, analytics.byAccount,
+                      analytics.bySession, analytics.limitUsage):
+        start = time.perf_counter()
+        aggregate(columns)
+        print(f"{aggregate.__name__:<18}{time.perf_counter() - start:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
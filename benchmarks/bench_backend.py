@@ -0,0 +1,82 @@
+# =========================================================
+# Script: bench_backend.py
+# Purpose: Measure back end throughput (transactions applied
+#          per minute) on generated accounts and transactions.
+#
+# How to run:
+#   python benchmarks/bench_backend.py [--accounts N] [--transactions N]
+#                                      [--run-size N]
+# =========================================================
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend_main import BackEnd, RUN_SIZE
+from transaction import TRANSFER_CREDIT, Transaction
+from transaction_encoder import writeEncoded
+from workload import holderName, writeAccounts
+
+# relative weight of each transaction code
+CODE_MIX = {"01": 30, "02": 15, "03": 15, "04": 30, "05": 4, "06": 2, "07": 2, "08": 2}
+
+
+# random transactions against accounts 1..size, new accounts above size
+def makeTransactions(size: int, count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    codes = rng.choices(list(CODE_MIX), weights=list(CODE_MIX.values()), k=count)
+    nextNum = size + 1
+    transactions = []
+    for code in codes:
+        if code == "05" and nextNum > 99999:
+            code = "04"
+        if code == "05":
+            num = nextNum
+            nextNum += 1
+            name = f"New Holder {num}"
+        else:
+            num = rng.randint(1, size)
+            name = holderName(num)
+        extra = rng.choice("SN") if code == "08" else ""
+        amount = 0.0 if code in ("06", "07", "08") else rng.randint(1, 50000) / 100
+        if code == "02":
+            target = rng.randint(1, size)
+            transactions.append(Transaction(code, name, f"{num:05d}", amount, f"{target:05d}"))
+            # the credit record the front end writes after every transfer
+            transactions.append(Transaction(code, holderName(target), f"{target:05d}", amount, TRANSFER_CREDIT))
+            continue
+        transactions.append(Transaction(code, name, f"{num:05d}", amount, extra))
+    return transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the back end.")
+    parser.add_argument("--accounts", type=int, default=90000)
+    parser.add_argument("--transactions", type=int, default=1000000)
+    parser.add_argument("--run-size", type=int, default=RUN_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        accountsFile = os.path.join(tmp, "accounts.txt")
+        transactionsFile = os.path.join(tmp, "merged.atf")
+        writeAccounts(accountsFile, args.accounts)
+        writeEncoded(makeTransactions(args.accounts, args.transactions), transactionsFile)
+
+        backEnd = BackEnd(runSize=args.run_size)
+        start = time.perf_counter()
+        backEnd.run(accountsFile, transactionsFile, os.path.join(tmp, "new_accounts.txt"))
+        elapsed = time.perf_counter() - start
+
+    print(f"{args.transactions} transactions in {elapsed:.2f}s "
+          f"({args.transactions / elapsed * 60:,.0f} per minute), "
+          f"{backEnd.applied} applied, {backEnd.rejected} rejected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# =========================================================
+# Script: bench_encoder.py
+# Purpose: Compare writing the daily transaction file line by
+#          line with the batched bytes encoder.
+#
+# How to run:
+#   python benchmarks/bench_encoder.py [count]
+#   (default count: 200000)
+# =========================================================
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from transaction import Transaction, END_RECORD
+from transaction_encoder import writeEncoded, writeSidecar
+
+
+# the original text-mode writer
+def writeLines(transactions: list, filename: str) -> None:
+    with open(filename, "w") as file:
+        for transaction in transactions:
+            file.write(transaction.formatForFile() + "\n")
+        file.write(END_RECORD + "\n")
+
+
+# seconds taken by fn()
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(count: int):
+    rng = random.Random(1)
+    codes = ["01", "02", "03", "04", "05", "06", "07", "08", "10"]
+    transactions = [
+        Transaction(rng.choice(codes), f"Holder {rng.randint(1, 9999)}", f"{rng.randint(1, 99999):05d}",
+                    rng.randint(0, 9999999) / 100, rng.choice(["", "EC", "CQ", "FI"]))
+        for _ in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lineFile = os.path.join(tmp, "lines.atf")
+        encodedFile = os.path.join(tmp, "encoded.atf")
+        sidecarFile = os.path.join(tmp, "encoded.atb")
+        lines = timed(lambda: writeLines(transactions, lineFile))
+        encoded = timed(lambda: writeEncoded(transactions, encodedFile))
+        sidecar = timed(lambda: writeSidecar(transactions, sidecarFile))
+        with open(lineFile, "rb") as a, open(encodedFile, "rb") as b:
+            identical = a.read() == b.read()
+        sidecarSize = os.path.getsize(sidecarFile)
+
+    print(f"{count} transactions")
+    print(f"line by line  {lines:.3f}s")
+    print(f"encoded       {encoded:.3f}s  ({lines / encoded:.1f}x, identical: {identical})")
+    print(f"sidecar       {sidecar:.3f}s  ({sidecarSize} bytes)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
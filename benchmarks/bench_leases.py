@@ -0,0 +1,55 @@
+# =========================================================
+# Script: bench_leases.py
+# Purpose: Measure create throughput of several front-end
+#          processes sharing one account number lease file,
+#          and check that no number is issued twice.
+#
+# How to run:
+#   python benchmarks/bench_leases.py [--processes N] [--creates N]
+#                                     [--block N]...
+# =========================================================
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from account_leases import AccountNumberLeases
+from account_manager import AccountManager
+
+
+# create accounts in one process, returns the numbers issued
+def createAccounts(leaseFile: str, block: int, creates: int) -> list:
+    manager = AccountManager()
+    manager.numberLeases = AccountNumberLeases(leaseFile, block)
+    numbers = [manager.createAccount("Bench Holder", 0.0).accountNumber for _ in range(creates)]
+    manager.numberLeases.release()
+    return numbers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark leased account number allocation.")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--creates", type=int, default=5000, help="creates per process")
+    parser.add_argument("--block", type=int, nargs="+", default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    for block in args.block:
+        with tempfile.TemporaryDirectory() as tmp:
+            leaseFile = os.path.join(tmp, "leases.json")
+            with multiprocessing.Pool(args.processes) as pool:
+                start = time.perf_counter()
+                results = pool.starmap(createAccounts, [(leaseFile, block, args.creates)] * args.processes)
+                elapsed = time.perf_counter() - start
+        numbers = [number for result in results for number in result]
+        unique = "all unique" if len(set(numbers)) == len(numbers) else "DUPLICATES"
+        print(f"block {block:>5}: {len(numbers)} creates in {elapsed:.2f}s "
+              f"({len(numbers) / elapsed:,.0f}/s), {unique}")
+
+
+if __name__ == "__main__":
+    main()
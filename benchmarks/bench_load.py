@@ -0,0 +1,49 @@
+# =========================================================
+# Script: bench_load.py
+# Purpose: Compare AccountManager.loadAccountsFromFile with the
+#          parallel bulk loader on a generated accounts file.
+#
+# How to run:
+#   python benchmarks/bench_load.py [accounts] [workers]
+#   (default: 99999 accounts, one worker per CPU)
+# =========================================================
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from account_manager import AccountManager
+from bulk_loader import loadAccountsBulk
+from workload import MAX_ACCOUNTS, writeAccounts
+
+
+def main(size: int, workers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "accounts.txt")
+        writeAccounts(filename, size)
+
+        start = time.perf_counter()
+        serial = AccountManager()
+        serial.loadAccountsFromFile(filename)
+        serialTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bulk = AccountManager()
+        loadAccountsBulk(bulk, filename, workers)
+        bulkTime = time.perf_counter() - start
+
+    assert len(serial.accounts) == len(bulk.accounts)
+    assert len(serial.holderIndex) == len(bulk.holderIndex) == len(bulk.nameIndex)
+    assert serial.nextAccountNumber == bulk.nextAccountNumber
+    print(f"accounts: {size}  workers: {workers or os.cpu_count()}")
+    print(f"serial: {serialTime:.2f}s  bulk: {bulkTime:.2f}s  speedup: {serialTime / bulkTime:.2f}x")
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else MAX_ACCOUNTS
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    main(size, workers)
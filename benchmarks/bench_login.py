@@ -0,0 +1,63 @@
+# =========================================================
+# Script: bench_login.py
+# Purpose: Compare standard login lookup latency using the
+#          holder name index against the old linear scan.
+#
+# How to run:
+#   python benchmarks/bench_login.py [sizes...]
+#   (default sizes: 10000 100000 1000000)
+# =========================================================
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from account import Account
+from account_manager import AccountManager
+
+LOOKUPS = 200
+
+
+# old login lookup, kept here for comparison
+def scanByHolderName(manager: AccountManager, holderName: str):
+    for account in manager.accounts.values():
+        if account.holderName.lower() == holderName.lower():
+            return account
+    return None
+
+
+# build a manager with the given number of accounts
+def buildManager(size: int) -> AccountManager:
+    manager = AccountManager()
+    for i in range(1, size + 1):
+        manager.addAccount(Account(f"{i:07d}", f"Holder {i}", 100.0))
+    manager.nextAccountNumber = size + 1
+    return manager
+
+
+# average seconds per call of lookup(manager, name)
+def timeLookups(lookup, manager: AccountManager, names: list) -> float:
+    start = time.perf_counter()
+    for name in names:
+        lookup(manager, name)
+    return (time.perf_counter() - start) / len(names)
+
+
+def main(sizes):
+    print(f"{'accounts':>10} {'scan (ms)':>12} {'index (us)':>12} {'speedup':>10}")
+    for size in sizes:
+        manager = buildManager(size)
+        # spread lookups over the whole file, worst case for the scan
+        names = [f"HOLDER {size - (i * size) // LOOKUPS}" for i in range(LOOKUPS)]
+        # the scan is slow at large sizes, only a few calls are needed
+        scanNames = names[: max(1, LOOKUPS * 10000 // size)]
+
+        scan = timeLookups(scanByHolderName, manager, scanNames)
+        index = timeLookups(AccountManager.findByHolderName, manager, names)
+        print(f"{size:>10} {scan * 1e3:>12.3f} {index * 1e6:>12.3f} {scan / index:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
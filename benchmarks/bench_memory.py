@@ -0,0 +1,54 @@
+# =========================================================
+# Script: bench_memory.py
+# Purpose: Report memory used per million accounts by the
+#          slotted Account against the old __dict__ layout.
+#
+# How to run:
+#   python benchmarks/bench_memory.py [size]
+#   (default size: 1000000)
+# =========================================================
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from account import Account, AccountStatus, AccountPlan
+
+
+# old account layout, every instance carries a __dict__
+class DictAccount:
+    def __init__(self, accountNumber: str, holderName: str, balance: float):
+        self.accountNumber = accountNumber
+        self.holderName = holderName
+        self.balance = balance
+        self.status = AccountStatus.ACTIVE
+        self.plan = AccountPlan.NON_STUDENT
+
+
+# bytes allocated while building size accounts of accountClass
+def measure(accountClass, size: int) -> int:
+    tracemalloc.start()
+    accounts = {}
+    for i in range(1, size + 1):
+        acctNum = f"{i:07d}"
+        accounts[acctNum] = accountClass(acctNum, f"Holder {i}", float(i))
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del accounts
+    return used
+
+
+def main(size: int):
+    scale = 1000000 / size
+    old = measure(DictAccount, size) * scale
+    new = measure(Account, size) * scale
+    print(f"{'layout':<10} {'MiB per 1M accounts':>22}")
+    print(f"{'__dict__':<10} {old / 2**20:>22.1f}")
+    print(f"{'__slots__':<10} {new / 2**20:>22.1f}")
+    print(f"saved {100 * (old - new) / old:.0f}%")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
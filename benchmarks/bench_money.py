@@ -0,0 +1,74 @@
+# =========================================================
+# Script: bench_money.py
+# Purpose: Compare float dollars with integer cents for the
+#          parsing, arithmetic and formatting the front end does.
+#
+# How to run:
+#   python benchmarks/bench_money.py [count]
+#   (default count: 1000000)
+# =========================================================
+
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from money import CENTS_MONEY, FLOAT_MONEY
+
+
+# add deltas[i] to balances[indexes[i]], all contiguous arrays
+def applyDeltas(balances: array, indexes: array, deltas: array) -> None:
+    for i, delta in zip(indexes, deltas):
+        balances[i] += delta
+
+
+# seconds taken by fn()
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(count: int):
+    rng = random.Random(1)
+    texts = [f"{rng.randint(1, 99999999) / 100:.2f}" for _ in range(count)]
+    results = {}
+
+    for money in (FLOAT_MONEY, CENTS_MONEY):
+        name = "cents" if money.cents else "float"
+        values = [money.parse(text) for text in texts]
+        parse = timed(lambda: [money.parse(text) for text in texts])
+        fieldFormat = money.formatField
+        fmt = timed(lambda: [fieldFormat(value) for value in values])
+
+        # running session-style totals
+        def accumulate():
+            total = money.zero
+            for value in values:
+                total += value
+            return total
+        arith = timed(accumulate)
+
+        # bulk balance update over a contiguous array
+        balances = array(money.arrayType, values)
+        indexes = array("q", [rng.randrange(count) for _ in range(count)])
+        deltas = array(money.arrayType, values)
+        bulk = timed(lambda: applyDeltas(balances, indexes, deltas))
+
+        results[name] = (parse, fmt, arith, bulk, accumulate())
+
+    print(f"{count} amounts")
+    print(f"{'':<8} {'parse':>9} {'format':>9} {'sum':>9} {'bulk':>9}")
+    for name, (parse, fmt, arith, bulk, _) in results.items():
+        print(f"{name:<8} {parse:>8.3f}s {fmt:>8.3f}s {arith:>8.3f}s {bulk:>8.3f}s")
+    floatTotal = results["float"][4]
+    centsTotal = results["cents"][4]
+    print(f"float total {floatTotal:.6f}  cents total {centsTotal / 100:.2f}  "
+          f"drift {abs(floatTotal * 100 - centsTotal):.4f} cents")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
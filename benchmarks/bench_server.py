@@ -0,0 +1,122 @@
+# =========================================================
+# Script: bench_server.py
+# Purpose: Load test atm_server.py and report throughput and
+#          p99 command latency as the number of concurrent
+#          connections grows.
+#
+# How it works:
+#   - Generates an accounts file and starts the server on a
+#     Unix socket with --output events (one reply per command).
+#   - Each connection runs standard user sessions, sending one
+#     command at a time and waiting for its reply.
+#
+# How to run:
+#   python benchmarks/bench_server.py [--accounts N]
+#                                     [--connections 1,4,16,64]
+#                                     [--sessions N]
+# =========================================================
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from account_manager import AccountManager
+from workload import DEFAULT_MIX, ADMIN_ONLY, commandLines, writeAccounts
+
+
+# send one command and wait for its event, returns the latency
+async def send(reader, writer, lines: list) -> float:
+    start = time.perf_counter()
+    writer.write(("\n".join(lines) + "\n").encode())
+    await writer.drain()
+    reply = await reader.readline()
+    if not reply:
+        raise ConnectionError("server closed the connection")
+    return time.perf_counter() - start
+
+
+# one connection running sessions standard user sessions
+async def client(socketPath: str, manager: AccountManager, accounts: list,
+                 sessions: int, seed: int, latencies: list) -> None:
+    rng = random.Random(seed)
+    mix = [(c, w) for c, w in DEFAULT_MIX.items() if c not in ADMIN_ONLY]
+    reader, writer = await asyncio.open_unix_connection(socketPath)
+    try:
+        for _ in range(sessions):
+            owner = rng.choice(accounts)
+            owned = manager.findAllByHolderName(owner.holderName)
+            latencies.append(await send(reader, writer, ["login", "standard", owner.holderName]))
+            for command in rng.choices([c for c, _ in mix], [w for _, w in mix], k=5):
+                latencies.append(await send(reader, writer, commandLines(rng, command, False, owned, accounts)))
+            latencies.append(await send(reader, writer, ["logout"]))
+    finally:
+        writer.close()
+
+
+async def runLoad(socketPath: str, manager: AccountManager, connections: int, sessions: int) -> tuple:
+    accounts = list(manager.accounts.values())
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(socketPath, manager, accounts, sessions, seed, latencies) for seed in range(connections)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)]
+    return len(latencies) / elapsed, p99
+
+
+# wait until the server accepts connections
+async def waitForServer(socketPath: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_unix_connection(socketPath)
+            writer.close()
+            return
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the ATM server.")
+    parser.add_argument("--accounts", type=int, default=10000)
+    parser.add_argument("--connections", default="1,4,16,64")
+    parser.add_argument("--sessions", type=int, default=20, help="sessions per connection")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        accountsFile = os.path.join(tmp, "accounts.txt")
+        socketPath = os.path.join(tmp, "atm.sock")
+        writeAccounts(accountsFile, args.accounts)
+        manager = AccountManager()
+        manager.loadAccountsFromFile(accountsFile)
+
+        env = dict(os.environ, ATM_JOURNAL=os.environ.get("ATM_JOURNAL", "session"))
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "atm_server.py"), accountsFile,
+             os.path.join(tmp, "transout.atf"), "--unix", socketPath, "--output", "events"],
+            env=env)
+        try:
+            asyncio.run(waitForServer(socketPath))
+            print(f"{'connections':>12} {'commands/s':>12} {'p99 (ms)':>10}")
+            for connections in [int(n) for n in args.connections.split(",")]:
+                rate, p99 = asyncio.run(runLoad(socketPath, manager, connections, args.sessions))
+                print(f"{connections:>12} {rate:>12.0f} {p99 * 1000:>10.2f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# =========================================================
+# Script: bench_shards.py
+# Purpose: Measure operation throughput of the sharded account
+#          manager as the number of shards grows.
+#
+# How it works:
+#   - Generates an accounts file and random withdraw / deposit /
+#     transfer operations (about 10% cross-account transfers).
+#   - Sends the operations in batches, every shard works on its
+#     part of a batch at the same time.
+#
+# How to run:
+#   python benchmarks/bench_shards.py [--accounts N] [--ops N]
+#                                     [--shards 1,2,4,8]
+# =========================================================
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sharded_account_manager import ShardedAccountManager
+from workload import MAX_ACCOUNTS, writeAccounts
+
+
+# random operations against accounts 1..size
+def makeOperations(size: int, count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    operations = []
+    for _ in range(count):
+        num = f"{rng.randint(1, size):05d}"
+        roll = rng.random()
+        if roll < 0.1:
+            other = f"{rng.randint(1, size):05d}"
+            operations.append(("transfer", (num, other, 1.0, None)))
+        elif roll < 0.6:
+            operations.append(("withdraw", (num, 1.0, None)))
+        else:
+            operations.append(("adjust", (num, 1.0)))
+    return operations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sharded account manager.")
+    parser.add_argument("--accounts", type=int, default=MAX_ACCOUNTS)
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--shards", default="1,2,4,8")
+    args = parser.parse_args()
+
+    operations = makeOperations(args.accounts, args.ops)
+    with tempfile.TemporaryDirectory() as tmp:
+        accountsFile = os.path.join(tmp, "accounts.txt")
+        writeAccounts(accountsFile, args.accounts)
+
+        print(f"{'shards':>7} {'load (s)':>9} {'ops/s':>10}")
+        for count in [int(n) for n in args.shards.split(",")]:
+            manager = ShardedAccountManager(count)
+            start = time.perf_counter()
+            manager.loadAccountsFromFile(accountsFile)
+            loadTime = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(0, len(operations), args.batch):
+                manager.applyBatch(operations[i:i + args.batch])
+            elapsed = time.perf_counter() - start
+            manager.close()
+            print(f"{count:>7} {loadTime:>9.2f} {len(operations) / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
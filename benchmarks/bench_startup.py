@@ -0,0 +1,74 @@
+# =========================================================
+# Script: bench_startup.py
+# Purpose: Compare front end cold start with and without the
+#          accounts snapshot cache (ATM_SNAPSHOT=1).
+#
+# How it works:
+#   - Generates an accounts file and starts frontend_main.py on
+#     it with an empty command file, several times per mode.
+#   - Reports the wall time of each process and the load time
+#     from its ATM_STATS dump (the part before the first prompt
+#     that depends on the file).
+#   - "snapshot (build)" is the first run, which writes the cache.
+#
+# How to run:
+#   python benchmarks/bench_startup.py [accounts] [runs]
+#   (default: 99999 accounts, 3 runs)
+# =========================================================
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from workload import MAX_ACCOUNTS, writeAccounts
+
+
+# (wall seconds, load seconds) of one front end process
+def startOnce(accountsFile: str, tmp: str, extraEnv: dict) -> tuple:
+    statsFile = os.path.join(tmp, "stats.json")
+    commandFile = os.path.join(tmp, "empty.txt")
+    open(commandFile, "w").close()
+    env = dict(os.environ, ATM_STATS=statsFile, **extraEnv)
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, "frontend_main.py"), accountsFile,
+                    os.path.join(tmp, "transout.atf"), commandFile],
+                   env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    wall = time.perf_counter() - start
+
+    with open(statsFile) as file:
+        operations = json.load(file)["operations"]
+    load = sum(op["total_ms"] for name, op in operations.items() if name.endswith("loadAccountsFromFile"))
+    return wall, load / 1000
+
+
+def main(size: int, runs: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        accountsFile = os.path.join(tmp, "accounts.txt")
+        writeAccounts(accountsFile, size)
+
+        results = {
+            "no cache": [startOnce(accountsFile, tmp, {}) for _ in range(runs)],
+            "snapshot (build)": [startOnce(accountsFile, tmp, {"ATM_SNAPSHOT": "1"})],
+            "snapshot": [startOnce(accountsFile, tmp, {"ATM_SNAPSHOT": "1"}) for _ in range(runs)],
+        }
+
+    print(f"accounts: {size}  runs: {runs}")
+    print(f"{'mode':<18} {'wall (s)':>9} {'load (s)':>9}")
+    for mode, samples in results.items():
+        wall = statistics.median(sample[0] for sample in samples)
+        load = statistics.median(sample[1] for sample in samples)
+        print(f"{mode:<18} {wall:>9.2f} {load:>9.2f}")
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else MAX_ACCOUNTS
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    main(size, runs)
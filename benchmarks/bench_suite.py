@@ -0,0 +1,166 @@
+# =========================================================
+# Script: bench_suite.py
+# Purpose: Time the main steps of the ATM front end on a
+#          generated workload and store the results as JSON.
+#
+# What is timed:
+#   - AccountManager.loadAccountsFromFile
+#   - login lookup (AccountManager.findByHolderName)
+#   - every command handler, replayed in batch mode
+#   - TransactionManager.writeTransactionsToFile
+#   - AccountManager.saveAccountsToFile
+#
+# How to run:
+#   python benchmarks/bench_suite.py [--accounts N] [--sessions N]
+#                                    [--out results.json]
+#   (results go to benchmarks/bench_results.json by default)
+#                                    [--compare baseline.json]
+# =========================================================
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from account_manager import AccountManager
+from frontend_main import FrontendMain
+from output_sink import NullSink
+from transaction_manager import TransactionManager
+from workload import MAX_ACCOUNTS, writeAccounts, writeSessions
+
+# next to this script, ignored by git
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results.json")
+
+
+# keeps the latency of every command instead of printing
+class TimingSink(NullSink):
+    def __init__(self):
+        self.latencies = {}
+
+    def commandDone(self, command: str, transaction, outcome: str, seconds: float) -> None:
+        self.latencies.setdefault(command, []).append(seconds)
+
+
+# count, total and percentiles of a list of durations in seconds
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    count = len(ordered)
+    total = sum(ordered)
+    return {
+        "count": count,
+        "total_s": round(total, 6),
+        "mean_us": round(total / count * 1e6, 3),
+        "p50_us": round(ordered[count // 2] * 1e6, 3),
+        "p99_us": round(ordered[min(count - 1, count * 99 // 100)] * 1e6, 3),
+    }
+
+
+# time fn once per repeat
+def timeCalls(fn, repeat: int = 1) -> list:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# short hash of the checked out commit, if any
+def currentCommit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def runSuite(accounts: int, sessions: int, seed: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        accountsFile = os.path.join(tmp, "accounts.txt")
+        scriptFile = os.path.join(tmp, "sessions.txt")
+        writeAccounts(accountsFile, accounts, seed)
+        writeSessions(accountsFile, scriptFile, sessions, seed=seed)
+
+        manager = AccountManager()
+        results["loadAccountsFromFile"] = summarize(
+            timeCalls(lambda: manager.loadAccountsFromFile(accountsFile)))
+
+        rng = random.Random(seed)
+        accounts = list(manager.accounts.values())
+        names = [account.holderName for account in rng.sample(accounts, min(1000, len(accounts)))]
+        results["loginLookup"] = summarize([
+            timeCalls(lambda: manager.findByHolderName(name))[0] for name in names])
+
+        # replay the sessions; logout is timed without its file rewrite
+        frontend = FrontendMain()
+        frontend.accountManager = manager
+        frontend.transactionsFile = os.path.join(tmp, "transactions.atf")
+        frontend.transactionManager.writeTransactionsToFile = lambda filename: None
+        sink = frontend.output = TimingSink()
+        with open(scriptFile) as file:
+            frontend._input_iter = (line.rstrip("\n") for line in file)
+            frontend.runCommands()
+        for command, samples in sorted(sink.latencies.items()):
+            results[f"handle:{command}"] = summarize(samples)
+
+        transactions = TransactionManager()
+        transactions.transactions = frontend.transactionManager.transactions
+        results["writeTransactionsToFile"] = summarize(
+            timeCalls(lambda: transactions.writeTransactionsToFile(frontend.transactionsFile), 3))
+        results["saveAccountsToFile"] = summarize(
+            timeCalls(lambda: manager.saveAccountsToFile(os.path.join(tmp, "new_accounts.txt")), 3))
+        results["transactions"] = {"count": len(transactions.transactions)}
+    return results
+
+
+# print the change of every mean against an earlier result file
+def compare(current: dict, baselineFile: str) -> None:
+    with open(baselineFile) as file:
+        baseline = json.load(file)
+    print(f"\ncompared with {baseline.get('commit') or baselineFile}:")
+    for name, stats in current["results"].items():
+        old = baseline["results"].get(name, {})
+        if "mean_us" in stats and old.get("mean_us"):
+            ratio = stats["mean_us"] / old["mean_us"]
+            print(f"  {name:<28} {old['mean_us']:>12.1f} -> {stats['mean_us']:>12.1f} us  ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ATM front end.")
+    parser.add_argument("--accounts", type=int, default=MAX_ACCOUNTS)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--compare", default=None, help="earlier results to compare with")
+    args = parser.parse_args()
+
+    report = {
+        "commit": currentCommit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "params": {"accounts": args.accounts, "sessions": args.sessions, "seed": args.seed},
+        "results": runSuite(args.accounts, args.sessions, args.seed),
+    }
+    with open(args.out, "w") as file:
+        json.dump(report, file, indent=2)
+
+    for name, stats in report["results"].items():
+        if "mean_us" in stats:
+            print(f"{name:<28} n={stats['count']:<7} mean={stats['mean_us']:>12.1f} us  "
+                  f"p99={stats['p99_us']:>12.1f} us")
+    print(f"results written to {args.out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# =========================================================
+# Script: bench_validation.py
+# Purpose: Compare validating a batch of proposed transactions
+#          in one validateBatch call with checking them one at a
+#          time, the way the interactive handlers do.
+#
+# How to run:
+#   python benchmarks/bench_validation.py [--accounts N] [--transactions N]
+# =========================================================
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from account import Account
+from account_manager import AccountManager
+from money import CENTS_MONEY
+from session import Session, SessionMode
+from validation import REASONS, validateBatch
+from workload import holderName
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the validation engine.")
+    parser.add_argument("--accounts", type=int, default=90000)
+    parser.add_argument("--transactions", type=int, default=1000000)
+    args = parser.parse_args()
+
+    manager = AccountManager(CENTS_MONEY)
+    for i in range(1, args.accounts + 1):
+        manager.addAccount(Account(f"{i:05d}", holderName(i), 100000))
+    session = Session(CENTS_MONEY)
+    session.login(SessionMode.ADMIN, "admin")
+
+    rng = random.Random(1)
+    n = args.transactions
+    codes = rng.choices([1, 2, 3, 4], weights=[30, 15, 15, 20], k=n)
+    numbers = [f"{rng.randint(1, args.accounts + 100):05d}" for _ in range(n)]
+    amounts = [rng.randint(-100, 50000) for _ in range(n)]
+    extras = [f"{rng.randint(1, args.accounts):05d}" if code == 2 else rng.choice(["EC", "CQ", "FI", "XX"])
+              if code == 3 else "" for code in codes]
+
+    start = time.perf_counter()
+    reasons = validateBatch(codes, numbers, amounts, extras, session, manager)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(n):
+        validateBatch(codes[i:i + 1], numbers[i:i + 1], amounts[i:i + 1], extras[i:i + 1], session, manager)
+    single = time.perf_counter() - start
+
+    print(f"{n} transactions: batch {batch:.2f}s ({n / batch:,.0f}/s), "
+          f"one at a time {single:.2f}s ({n / single:,.0f}/s)")
+    for code, name in enumerate(REASONS):
+        if reasons.count(code):
+            print(f"  {name:<20}{reasons.count(code)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# =========================================================
+# Script: workload.py
+# Purpose: Generate synthetic account files and session scripts
+#          for benchmarking the ATM front end.
+#
+# How to run:
+#   python benchmarks/workload.py accounts <file> <size>   (size <= 99999)
+#   python benchmarks/workload.py sessions <accounts_file> <file> <sessions>
+#
+# Command mix (sessions): --mix withdraw=30,transfer=15,...
+# =========================================================
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from account_manager import AccountManager
+
+FIRST_NAMES = ["John", "Mary", "Ali", "Wei", "Sara", "Omar", "Lena", "Ravi", "Ana", "Tom",
+               "Nora", "Ivan", "Maya", "Jose", "Emma", "Kofi", "Yuki", "Liam", "Zoe", "Amir"]
+LAST_NAMES = ["Doe", "Jane", "Khan", "Chen", "Smith", "Ali", "Novak", "Patel", "Silva", "Brown",
+              "Kim", "Petrov", "Lee", "Garcia", "Jones", "Mensah", "Sato", "Walsh", "Young", "Haddad"]
+
+# relative weight of each command in a generated session
+DEFAULT_MIX = {
+    "withdraw": 30,
+    "transfer": 15,
+    "paybill": 15,
+    "deposit": 20,
+    "viewbalance": 10,
+    "create": 4,
+    "disable": 2,
+    "changeplan": 2,
+    "delete": 2,
+}
+
+# account numbers are five digits in the accounts file format
+MAX_ACCOUNTS = 99999
+
+ADMIN_ONLY = ("create", "disable", "changeplan", "delete")
+PAYEES = ("EC", "CQ", "FI")
+
+
+# holder name for account i, about one holder in five owns two accounts
+def holderName(i: int) -> str:
+    owner = i - (i % 5 == 0)
+    return f"{FIRST_NAMES[owner % 20]} {LAST_NAMES[(owner // 20) % 20]} {owner // 400}"
+
+
+# write an accounts file with size records in the AccountManager format
+def writeAccounts(filename: str, size: int, seed: int = 1) -> None:
+    if size > MAX_ACCOUNTS:
+        raise ValueError(f"At most {MAX_ACCOUNTS} accounts fit five digit account numbers, got {size}")
+    rng = random.Random(seed)
+    with open(filename, "w") as file:
+        for i in range(1, size + 1):
+            status = "D" if rng.random() < 0.02 else "A"
+            balance = rng.randint(0, 9999999) / 100
+            file.write(f"{i:05d} {holderName(i)} {status} {balance:.2f}\n")
+        file.write("END_OF_FILE\n")
+
+
+# parse "withdraw=30,transfer=15" into a command mix
+def parseMix(text: str) -> dict:
+    mix = {}
+    for item in text.split(","):
+        command, weight = item.split("=")
+        if command not in DEFAULT_MIX:
+            raise ValueError(f"Unknown command '{command}' in mix")
+        mix[command] = int(weight)
+    return mix
+
+
+# random amount up to limit, in whole cents
+def amount(rng: random.Random, limit: float) -> str:
+    return f"{rng.randint(1, int(limit * 100)) / 100:.2f}"
+
+
+# lines for one command, admin sessions name the holder first
+def commandLines(rng: random.Random, command: str, admin: bool, owned: list, accounts: list) -> list:
+    account = rng.choice(owned)
+    acctNum, name = account.accountNumber, account.holderName
+    holder = [name] if admin else []
+
+    if command == "withdraw":
+        return ["withdraw"] + holder + [acctNum, amount(rng, 200)]
+    if command == "transfer":
+        return ["transfer"] + holder + [acctNum, rng.choice(accounts).accountNumber, amount(rng, 400)]
+    if command == "paybill":
+        return ["paybill"] + holder + [acctNum, rng.choice(PAYEES), amount(rng, 500)]
+    if command == "deposit":
+        return ["deposit"] + holder + [acctNum, amount(rng, 1000)]
+    if command == "viewbalance":
+        return ["viewbalance"] + holder + [acctNum]
+    if command == "create":
+        return ["create", holderName(rng.randint(1, 10 ** 6))[:20], amount(rng, 5000)]
+    if command == "disable":
+        return ["disable", acctNum]
+    if command == "changeplan":
+        return ["changeplan", acctNum, rng.choice("SN")]
+    return ["delete", acctNum]
+
+
+# write a script of sessions against the accounts in accountsFile
+def writeSessions(accountsFile: str, filename: str, sessions: int, mix: dict = None,
+                  commandsPerSession: int = 5, adminShare: float = 0.1, seed: int = 1) -> int:
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    manager = AccountManager()
+    manager.loadAccountsFromFile(accountsFile)
+    accounts = list(manager.accounts.values())
+    adminMix = [(command, weight) for command, weight in mix.items() if weight > 0]
+    standardMix = [(command, weight) for command, weight in adminMix if command not in ADMIN_ONLY]
+
+    commands = 0
+    with open(filename, "w") as file:
+        for _ in range(sessions):
+            admin = rng.random() < adminShare or not standardMix
+            choices = adminMix if admin else standardMix
+            if admin:
+                lines = ["login", "admin"]
+                pool = accounts
+            else:
+                owner = rng.choice(accounts)
+                lines = ["login", "standard", owner.holderName]
+                pool = manager.findAllByHolderName(owner.holderName)
+
+            picked = rng.choices([c for c, _ in choices], [w for _, w in choices], k=commandsPerSession)
+            for command in picked:
+                lines += commandLines(rng, command, admin, pool, accounts)
+            lines.append("logout")
+            commands += len(picked) + 2
+            file.write("\n".join(lines) + "\n")
+    return commands
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate ATM benchmark workloads.")
+    sub = parser.add_subparsers(dest="kind", required=True)
+    acc = sub.add_parser("accounts", help="write a current accounts file")
+    acc.add_argument("file")
+    acc.add_argument("size", type=int)
+    acc.add_argument("--seed", type=int, default=1)
+    ses = sub.add_parser("sessions", help="write a session script")
+    ses.add_argument("accounts_file")
+    ses.add_argument("file")
+    ses.add_argument("sessions", type=int)
+    ses.add_argument("--mix", type=parseMix, default=None)
+    ses.add_argument("--commands", type=int, default=5, help="commands per session")
+    ses.add_argument("--admin-share", type=float, default=0.1)
+    ses.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.kind == "accounts":
+        writeAccounts(args.file, args.size, args.seed)
+    else:
+        writeSessions(args.accounts_file, args.file, args.sessions, args.mix,
+                      args.commands, args.admin_share, args.seed)
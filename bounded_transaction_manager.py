@@ -0,0 +1,134 @@
+"""
+bounded_transaction_manager.py - transactions kept within a memory cap
+
+A TransactionManager holds every Transaction object of the day. Here a
+transaction is stored as its daily file record instead (encoded bytes,
+about 41 per transaction, plus its session id). The newest records stay
+in an in-memory buffer of at most `bufferSize` transactions. When the
+buffer is full it is appended to a temporary spill segment on disk in a
+single write. The spill files are deleted when the manager is closed or
+garbage collected.
+
+getAllTransactions streams Transaction objects from the segment, then
+from the buffer, in the order they were added. They are rebuilt from
+their records, so they hold exactly what the daily file holds (amounts
+as written, to the cent). writeTransactionsToFile copies the segment
+and the buffer to the daily file in chunks and adds the end record, so
+it never holds more than one chunk and the buffer in memory.
+"""
+
+import locale
+import mmap
+import os
+import tempfile
+from array import array
+
+from transaction import Transaction, END_RECORD
+from transaction_manager import TransactionManager
+from transaction_reader import parseTransactions
+
+DEFAULT_BUFFER_SIZE = 10000
+
+# bytes per read when copying the spill segment
+COPY_CHUNK = 1 << 20
+
+
+class BoundedTransactionManager(TransactionManager):
+    def __init__(self, bufferSize: int = DEFAULT_BUFFER_SIZE):
+        super().__init__()
+        if bufferSize < 1:
+            raise ValueError("Transaction buffer size must be at least 1")
+        self.bufferSize = bufferSize
+        self.transactions = None  # not kept, see getAllTransactions
+        self._encoding = locale.getpreferredencoding(False)
+        self._newline = os.linesep
+        self._buffer = bytearray()  # records of the newest transactions
+        self._sessions = array("Q")  # their session ids, 0 for none
+        self._buffered = 0
+        self._spilled = 0
+        self._segment = None  # spilled records, created on the first spill
+        self._segmentSessions = None
+        self._money = None  # money of the first transaction, used to read them back
+
+    # add new transaction, spilling the buffer when it is full
+    def addTransaction(self, transaction: Transaction):
+        line = transaction.formatForFile() + self._newline
+        self._buffer += line.encode("ascii") if line.isascii() else line.encode(self._encoding)
+        self._sessions.append(transaction.session or 0)
+        self._buffered += 1
+        if self._money is None:
+            self._money = transaction.money
+        if self._buffered >= self.bufferSize:
+            self._spill()
+
+    def __len__(self):
+        return self._spilled + self._buffered
+
+    def _spill(self) -> None:
+        if self._segment is None:
+            self._segment = tempfile.TemporaryFile(prefix="atm-transactions-")
+            self._segmentSessions = tempfile.TemporaryFile(prefix="atm-sessions-")
+        self._segment.write(self._buffer)
+        self._segmentSessions.write(self._sessions.tobytes())
+        self._spilled += self._buffered
+        self._buffer = bytearray()
+        self._sessions = array("Q")
+        self._buffered = 0
+
+    # stream every transaction added so far, oldest first
+    def getAllTransactions(self):
+        money = self._money
+        if money is None:
+            return
+        # later additions are not part of this pass
+        buffer = bytes(self._buffer)
+        sessions = self._sessions[:]
+        if self._spilled:
+            self._segment.flush()
+            self._segmentSessions.flush()
+            size = self._segment.tell()
+            segment = mmap.mmap(self._segment.fileno(), size, access=mmap.ACCESS_READ)
+            segmentSessions = mmap.mmap(self._segmentSessions.fileno(), self._spilled * sessions.itemsize,
+                                        access=mmap.ACCESS_READ)
+            try:
+                with memoryview(segmentSessions) as view, view.cast("Q") as ids:
+                    yield from self._withSessions(parseTransactions(segment, money=money), ids)
+            finally:
+                segment.close()
+                segmentSessions.close()
+        yield from self._withSessions(parseTransactions(buffer, money=money), sessions)
+
+    @staticmethod
+    def _withSessions(transactions, sessions):
+        for transaction, session in zip(transactions, sessions):
+            transaction.session = session or None
+            yield transaction
+
+    # stream the spill segment, the buffer and the end record to the daily file
+    def writeTransactionsToFile(self, filename: str):
+        with open(filename, "wb") as file:
+            if self._spilled:
+                self._segment.flush()
+                size = self._segment.tell()
+                self._segment.seek(0)
+                while size > 0:
+                    chunk = self._segment.read(min(COPY_CHUNK, size))
+                    file.write(chunk)
+                    size -= len(chunk)
+                self._segment.seek(0, os.SEEK_END)
+            file.write(self._buffer + (END_RECORD + self._newline).encode("ascii"))
+
+    # clear all transactions
+    def clearTransactions(self):
+        self.close()
+        self._buffer = bytearray()
+        self._sessions = array("Q")
+        self._buffered = 0
+
+    # delete the spill files
+    def close(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segmentSessions.close()
+            self._segment = self._segmentSessions = None
+        self._spilled = 0
@@ -0,0 +1,160 @@
+"""
+bulk_loader.py - parallel loader for large current accounts files
+
+The file is split into newline-aligned byte ranges that are parsed in a
+process pool. Each worker returns its range as columns (account numbers,
+names, a status byte mask and an array of balances) which are merged
+into the AccountManager in file order through addAccount, and the
+holder name index is built at the end. Stopping at a blank line or
+END_OF_FILE and skipping malformed lines behave like
+AccountManager.loadAccountsFromFile.
+
+BulkAccountManager loads this way, FrontendMain uses it with
+ATM_LOAD_WORKERS=<n>.
+"""
+
+import locale
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from account import Account
+from account_manager import AccountManager
+from money import CENTS_MONEY, FLOAT_MONEY
+
+# files smaller than this are not worth starting a pool for
+MIN_PARALLEL_SIZE = 4 * 1024 * 1024
+
+
+# parsed columns of one byte range
+class ParsedChunk:
+    def __init__(self, money=FLOAT_MONEY):
+        self.accountNumbers = []
+        self.holderNames = []
+        self.disabled = bytearray()  # 1 = disabled
+        self.balances = array(money.arrayType)  # float dollars or int cents
+        self.maxAccountNumber = 0
+        self.stopped = False  # hit a blank line or END_OF_FILE
+        self.error = None  # exception raised by the first bad record
+
+
+# parse the lines in [start, end) of filename
+def parseChunk(filename: str, start: int, end: int, encoding: str, cents: bool = False) -> ParsedChunk:
+    with open(filename, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    money = CENTS_MONEY if cents else FLOAT_MONEY
+    parseBalance = money.parse
+    chunk = ParsedChunk(money)
+    lines = data.decode(encoding).split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+
+    numbers = chunk.accountNumbers
+    names = chunk.holderNames
+    disabled = chunk.disabled
+    balances = chunk.balances
+    maxNum = 0
+    try:
+        for raw in lines:
+            line = raw.strip()
+            if not line or line.startswith("END_OF_FILE"):
+                chunk.stopped = True
+                break
+            parts = line.split()
+
+            if len(parts) < 4:
+                continue
+
+            status = parts[-2]
+            balance = parseBalance(parts[-1])
+            numbers.append(parts[0])
+            names.append(" ".join(parts[1:-2]))
+            disabled.append(status == "disabled" or status.lower() == "d")
+            balances.append(balance)
+
+            num = int(parts[0])
+            if num > maxNum:
+                maxNum = num
+    except ValueError as error:
+        chunk.error = error
+    chunk.maxAccountNumber = maxNum
+    return chunk
+
+
+# byte offsets that split filename into count newline-aligned ranges
+def splitRanges(filename: str, count: int) -> list:
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, "rb") as file:
+        for i in range(1, count):
+            file.seek(max(size * i // count, bounds[-1]))
+            file.readline()
+            pos = file.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# add the parsed columns to manager, returns False once loading must stop
+def mergeChunk(manager: AccountManager, chunk: ParsedChunk) -> bool:
+    numbers = chunk.accountNumbers
+    names = chunk.holderNames
+    disabled = chunk.disabled
+    balances = chunk.balances
+    for i in range(len(numbers)):
+        account = Account(numbers[i], names[i], balances[i])
+        if disabled[i]:
+            account.disable()
+        manager.addAccount(account)
+
+    if numbers and chunk.maxAccountNumber >= manager.nextAccountNumber:
+        manager.nextAccountNumber = chunk.maxAccountNumber + 1
+    if chunk.error is not None:
+        raise chunk.error
+    return not chunk.stopped
+
+
+# load filename into manager using a pool of worker processes
+def loadAccountsBulk(manager: AccountManager, filename: str, workers: int = None) -> None:
+    try:
+        size = os.path.getsize(filename)
+    except FileNotFoundError:
+        manager.message(f"Account file '{filename}' not found.")
+        manager.buildNameIndex()
+        return
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or size < MIN_PARALLEL_SIZE:
+        AccountManager.loadAccountsFromFile(manager, filename)
+        return
+
+    # names are indexed once at the end, not one at a time
+    manager.nameIndex = None
+
+    encoding = locale.getpreferredencoding(False)
+    ranges = splitRanges(filename, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(parseChunk, filename, start, end, encoding, manager.money.cents) for start, end in ranges]
+        try:
+            for future in futures:
+                if not mergeChunk(manager, future.result()):
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+    manager.buildNameIndex()
+
+
+# AccountManager that loads with loadAccountsBulk
+class BulkAccountManager(AccountManager):
+    def __init__(self, money=FLOAT_MONEY, workers: int = None):
+        super().__init__(money)
+        self.workers = workers
+
+    def loadAccountsFromFile(self, filename: str):
+        loadAccountsBulk(self, filename, self.workers)
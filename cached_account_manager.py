@@ -0,0 +1,190 @@
+"""
+cached_account_manager.py - startup snapshot of the parsed accounts file
+
+The current accounts file does not change during the day, so the parsed
+AccountManager state is kept in a binary snapshot next to it
+(<accounts file>.snapshot). The snapshot is keyed by the file's path,
+size, mtime and BLAKE2b content hash, plus the money representation.
+A valid snapshot is loaded directly; a missing or stale one is rebuilt
+from the accounts file.
+
+Snapshot layout (little endian):
+    header      magic "ATMS", version, cents flag, account count,
+                nextAccountNumber, size, mtime_ns, content hash, path length
+    path        utf-8
+    lengths     byte length of the numbers, names and index sections
+    numbers     account numbers, utf-8, newline separated
+    names       holder names, utf-8, newline separated
+    index       the sorted lower-cased holder names of the NameIndex
+    status      one byte per account, 1 = disabled
+    plans       one byte per account, 1 = student
+    balances    array of float dollars ("d") or integer cents ("q")
+"""
+
+import gc
+import hashlib
+import os
+import struct
+from array import array
+
+from account import Account, AccountPlan, AccountStatus
+from account_manager import AccountManager
+from money import FLOAT_MONEY
+from name_index import NameIndex
+
+SNAPSHOT_MAGIC = b"ATMS"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct("<4sHBQQQq32sI")
+SNAPSHOT_LENGTHS = struct.Struct("<QQQ")
+
+HASH_CHUNK = 1 << 20
+
+
+# BLAKE2b digest of a file's contents
+def fileDigest(filename: str) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(filename, "rb") as file:
+        while True:
+            chunk = file.read(HASH_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.digest()
+
+
+# indexes of the non-zero bytes of mask
+def _flagged(mask: bytes):
+    i = mask.find(1)
+    while i >= 0:
+        yield i
+        i = mask.find(1, i + 1)
+
+
+class CachedAccountManager(AccountManager):
+    def __init__(self, money=FLOAT_MONEY):
+        super().__init__(money)
+        self.snapshotLoaded = False  # the last load came from the snapshot
+
+    @staticmethod
+    def snapshotFileFor(filename: str) -> str:
+        return filename + ".snapshot"
+
+    # load from the snapshot when it matches the file, rebuild it otherwise
+    def loadAccountsFromFile(self, filename: str):
+        self.snapshotLoaded = False
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            super().loadAccountsFromFile(filename)
+            return
+
+        key = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns, fileDigest(filename))
+        # millions of long-lived objects, collecting while they are built only costs time
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            if self._loadSnapshot(self.snapshotFileFor(filename), key):
+                self.snapshotLoaded = True
+                return
+            super().loadAccountsFromFile(filename)
+            try:
+                self._writeSnapshot(self.snapshotFileFor(filename), key)
+            except OSError:
+                # a read-only directory only costs the cache
+                pass
+        finally:
+            # the accounts live for the whole run, later collections can skip them
+            gc.freeze()
+            if enabled:
+                gc.enable()
+
+    def _loadSnapshot(self, snapshotFile: str, key: tuple) -> bool:
+        try:
+            with open(snapshotFile, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return False
+        if len(data) < SNAPSHOT_HEADER.size:
+            return False
+
+        (magic, version, cents, count, nextNum, size, mtime,
+         digest, pathLength) = SNAPSHOT_HEADER.unpack_from(data, 0)
+        offset = SNAPSHOT_HEADER.size
+        path = data[offset:offset + pathLength].decode("utf-8", "replace")
+        if (magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or bool(cents) != self.money.cents
+                or (path, size, mtime, digest) != key):
+            return False
+        offset += pathLength
+
+        numbersLength, namesLength, indexLength = SNAPSHOT_LENGTHS.unpack_from(data, offset)
+        offset += SNAPSHOT_LENGTHS.size
+        numbers = data[offset:offset + numbersLength].decode("utf-8").split("\n")
+        offset += numbersLength
+        names = data[offset:offset + namesLength].decode("utf-8").split("\n")
+        offset += namesLength
+        indexed = data[offset:offset + indexLength].decode("utf-8").split("\n")
+        offset += indexLength
+        status = data[offset:offset + count]
+        offset += count
+        plans = data[offset:offset + count]
+        offset += count
+        balances = array(self.money.arrayType)
+        balances.frombytes(data[offset:offset + count * balances.itemsize])
+        if not count:
+            numbers = names = indexed = []
+        if len(numbers) != count or len(names) != count or len(balances) != count:
+            return False
+
+        accounts = list(map(Account, numbers, names, balances))
+        disabled = AccountStatus.DISABLED
+        student = AccountPlan.STUDENT
+        for i in _flagged(status):
+            accounts[i].status = disabled
+        for i in _flagged(plans):
+            accounts[i].plan = student
+
+        if self.accounts:
+            for account in accounts:
+                self.addAccount(account)
+            self.buildNameIndex()
+        else:
+            # empty manager: the same result as addAccount, built in bulk
+            self.accounts.update(zip(numbers, accounts))
+            index = self.holderIndex
+            for account in accounts:
+                key = account.holderName.lower()
+                owned = index.get(key)
+                if owned is None:
+                    owned = index[key] = {}
+                owned[account.accountNumber] = account
+            # sorted when the snapshot was written
+            self.nameIndex = NameIndex.fromSorted(indexed)
+        self.nextAccountNumber = max(self.nextAccountNumber, nextNum)
+        return True
+
+    def _writeSnapshot(self, snapshotFile: str, key: tuple) -> None:
+        path, size, mtime, digest = key
+        accounts = list(self.accounts.values())
+        numbers = "\n".join(account.accountNumber for account in accounts).encode("utf-8")
+        names = "\n".join(account.holderName for account in accounts).encode("utf-8")
+        if self.nameIndex is None or self.nameIndex.pending:
+            self.buildNameIndex()
+        indexed = "\n".join(self.nameIndex.names).encode("utf-8")
+        status = bytes(not account.isActive() for account in accounts)
+        plans = bytes(account.plan == AccountPlan.STUDENT for account in accounts)
+        balances = array(self.money.arrayType, [account.balance for account in accounts])
+        pathBytes = path.encode("utf-8")
+
+        tmpName = snapshotFile + ".tmp"
+        with open(tmpName, "wb") as file:
+            file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.money.cents, len(accounts),
+                                            self.nextAccountNumber, size, mtime, digest, len(pathBytes)))
+            file.write(pathBytes)
+            file.write(SNAPSHOT_LENGTHS.pack(len(numbers), len(names), len(indexed)))
+            file.write(numbers)
+            file.write(names)
+            file.write(indexed)
+            file.write(status)
+            file.write(plans)
+            file.write(balances.tobytes())
+        os.replace(tmpName, snapshotFile)
@@ -0,0 +1,190 @@
+"""
+delta_account_manager.py - incremental persistence for the accounts file
+
+The accounts file is the checkpoint and is only ever written by the back
+end, so every other reader (and the back end applying the day's
+transactions) sees the balances it last produced. Changed accounts
+(balance, status, plan, creation through addAccount, deletion) are
+tracked, and a save only appends them to a delta log next to the
+checkpoint (<accounts file>.delta), so its cost depends on the number of
+changes. Once the log holds more than compactFactor records per changed
+account (and more than MIN_LOG_RECORDS), the next save rewrites it with
+one record per changed account.
+
+Loading reads the checkpoint and replays the log. The log starts with the
+size and modification time of the checkpoint it was written against; a
+log whose checkpoint has since been replaced by the back end is ignored
+and started over. Log records hold the whole account state, so replaying
+a record twice is harmless:
+    C <checkpoint size> <checkpoint mtime in ns>
+    U <account record in the accounts file format>
+    D <account number>
+"""
+
+import os
+
+from account import Account
+from account_manager import AccountManager, parseAccountLine
+from money import FLOAT_MONEY
+
+MIN_LOG_RECORDS = 1000
+
+CHECKPOINT = "C"
+UPDATE = "U"
+DELETE = "D"
+
+
+# the checkpoint line identifying the current contents of filename
+def _checkpointLine(filename: str) -> str:
+    try:
+        info = os.stat(filename)
+    except FileNotFoundError:
+        return f"{CHECKPOINT} 0 0\n"
+    return f"{CHECKPOINT} {info.st_size} {info.st_mtime_ns}\n"
+
+
+# account that reports its changes to the owning manager
+class TrackedAccount(Account):
+    __slots__ = ("changes",)
+
+    def __init__(self, accountNumber: str, holderName: str, balance: float, changes: dict):
+        super().__init__(accountNumber, holderName, balance)
+        self.changes = changes
+
+    @classmethod
+    def fromAccount(cls, account: Account, changes: dict):
+        tracked = cls(account.accountNumber, account.holderName, account.balance, changes)
+        tracked.status = account.status
+        tracked.plan = account.plan
+        return tracked
+
+    def adjustBalance(self, amount: float) -> None:
+        super().adjustBalance(amount)
+        self.changes[self.accountNumber] = self
+
+    def disable(self) -> None:
+        super().disable()
+        self.changes[self.accountNumber] = self
+
+    def changePlan(self, newPlan) -> None:
+        super().changePlan(newPlan)
+        self.changes[self.accountNumber] = self
+
+
+class DeltaAccountManager(AccountManager):
+    def __init__(self, money=FLOAT_MONEY, compactFactor: float = 2.0):
+        super().__init__(money)
+        # account number -> changed account, or None once deleted
+        self.changes = {}
+        self.compactFactor = compactFactor
+        self.checkpointFile = None
+        # account numbers with a record in the log, None until the log matches the checkpoint
+        self.logged = None
+        self.logRecords = 0
+
+    # delta log belonging to an accounts file
+    @staticmethod
+    def logFileFor(filename: str) -> str:
+        return filename + ".delta"
+
+    # load the checkpoint, then replay its delta log
+    def loadAccountsFromFile(self, filename: str):
+        super().loadAccountsFromFile(filename)
+        self.checkpointFile = filename
+        self.logged = set()
+        self.logRecords = self._replayLog(filename)
+        if self.logRecords is None:
+            self.logged = None
+            self.logRecords = 0
+        self.changes.clear()
+
+    # add account to the system, tracked from now on
+    def addAccount(self, account: Account) -> None:
+        if not isinstance(account, TrackedAccount):
+            account = TrackedAccount.fromAccount(account, self.changes)
+        super().addAccount(account)
+        self.changes[account.accountNumber] = account
+
+    def deleteAccount(self, accountNumber: str):
+        if accountNumber in self.accounts:
+            super().deleteAccount(accountNumber)
+            self.changes[accountNumber] = None
+
+    # append the changes to the delta log of the loaded accounts file, any
+    # other file gets a full save
+    def saveAccountsToFile(self, filename: str):
+        if filename != self.checkpointFile:
+            super().saveAccountsToFile(filename)
+            return
+        if self.logged is None or self.logRecords + len(self.changes) > max(
+                MIN_LOG_RECORDS, len(self.logged | self.changes.keys()) * self.compactFactor):
+            self.compact()
+            return
+        if not self.changes:
+            return
+
+        lines = [self._record(accountNumber) for accountNumber in self.changes]
+        with open(self.logFileFor(filename), "a") as file:
+            file.write("".join(lines))
+            file.flush()
+            os.fsync(file.fileno())
+        self.logRecords += len(lines)
+        self.logged.update(self.changes)
+        self.changes.clear()
+
+    # rewrite the delta log with one record per account changed since the checkpoint
+    def compact(self) -> None:
+        logged = (self.logged or set()) | self.changes.keys()
+        logFile = self.logFileFor(self.checkpointFile)
+        tmpName = logFile + ".tmp"
+        with open(tmpName, "w") as file:
+            file.write(_checkpointLine(self.checkpointFile))
+            file.write("".join(self._record(accountNumber) for accountNumber in sorted(logged)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmpName, logFile)
+        self.logged = logged
+        self.logRecords = len(logged)
+        self.changes.clear()
+
+    # the log record for the current state of an account
+    def _record(self, accountNumber: str) -> str:
+        account = self.accounts.get(accountNumber)
+        if account is None:
+            return f"{DELETE} {accountNumber}\n"
+        status = "A" if account.isActive() else "D"
+        return (f"{UPDATE} {account.accountNumber} {account.holderName} {status} "
+                f"{self.money.format(account.balance)}\n")
+
+    # apply the records of the delta log of filename and add their accounts
+    # to self.logged, returns how many there were (None if there is no log
+    # for the current checkpoint)
+    def _replayLog(self, filename: str):
+        count = 0
+        try:
+            with open(self.logFileFor(filename), "r") as file:
+                if file.readline() != _checkpointLine(filename):
+                    return None
+                for line in file:
+                    # a record cut short by a crash was never saved
+                    if not line.endswith("\n"):
+                        break
+                    kind, _, record = line.rstrip("\n").partition(" ")
+                    if kind == DELETE:
+                        AccountManager.deleteAccount(self, record.strip())
+                        self.logged.add(record.strip())
+                    elif kind == UPDATE:
+                        account = parseAccountLine(record, self.money)
+                        if account is None:
+                            continue
+                        self.addAccount(account)
+                        self.logged.add(account.accountNumber)
+                        num = int(account.accountNumber)
+                        if num >= self.nextAccountNumber:
+                            self.nextAccountNumber = num + 1
+                    else:
+                        continue
+                    count += 1
+        except FileNotFoundError:
+            return None
+        return count
@@ -23,21 +23,110 @@
 # How to Run:
 #   - From terminal:
 #       python frontend_main.py current_accounts.txt transout.atf
+#   - Batch mode, commands read from a file instead of the terminal:
+#       python frontend_main.py current_accounts.txt transout.atf commands.txt
+#
+# Environment:
+#   - ATM_LAZY_ACCOUNTS=1               memory-map the accounts file and read
+#                                       accounts on demand (file must be sorted)
+#   - ATM_SHARDS=<n>                    split the accounts by number range across
+#                                       n worker processes
+#   - ATM_JOURNAL=<policy>              append transactions to the daily file as
+#                                       they happen; policy is record, session
+#                                       or interval (ATM_JOURNAL_INTERVAL seconds)
+#   - ATM_ACCOUNT_LEASES=<file>         take new account numbers from blocks
+#                                       leased through a lease file shared with
+#                                       other front ends (ATM_LEASE_BLOCK numbers
+#                                       per block, default 100)
+#   - ATM_TRANSACTION_BUFFER=<n>        keep at most n transactions in memory as
+#                                       compact records, older ones are spilled
+#                                       to a temporary file
+#   - ATM_CENTS=1                       keep amounts as integer cents instead of
+#                                       float dollars
+#   - ATM_OUTPUT=<mode>                 text (default, the terminal messages),
+#                                       events (one JSON record per command)
+#                                       or off
+#   - ATM_DELTA_LOG=1                   save changed accounts on logout and exit,
+#                                       appended to <accounts file>.delta and
+#                                       replayed over the accounts file until
+#                                       the back end replaces it (not with
+#                                       ATM_LAZY_ACCOUNTS or ATM_SHARDS)
+#   - ATM_SNAPSHOT=1                    load the parsed accounts from
+#                                       <accounts file>.snapshot when it matches
+#                                       the file, rebuilding it when stale
+#   - ATM_LOAD_WORKERS=<n>              parse large accounts files in n worker
+#                                       processes (0 = one per CPU)
+#   - ATM_STATS=<file>                  write per-command latency histograms,
+#                                       outcome counts and file operation times
+#                                       as JSON on exit/quit, end of input or
+#                                       SIGUSR1, also while idle ("-" for stderr)
+#   - ATM_PROFILE=cpu,memory            add cProfile and/or tracemalloc results
+#                                       to the stats (default file atm_stats.json)
 # =========================================================
 
 from account_manager import AccountManager
 from session import Session, SessionMode
-from transaction import Transaction
+from transaction import TRANSFER_CREDIT, Transaction
 from transaction_manager import TransactionManager
 from account import AccountPlan
+from output_sink import TextSink, createSink
+from money import CENTS_MONEY, FLOAT_MONEY
+from validation import (ACCOUNT_DISABLED, INSUFFICIENT_FUNDS, LIMIT_EXCEEDED, NOT_FOUND, NOT_OWNER,
+                        NOT_POSITIVE, isValidPayee, validateTransactions)
+import contextlib
+import os
 import sys
+import time
+
+# read buffer for batch command files
+BATCH_BUFFER_SIZE = 1 << 16
+
+NO_LOCK = contextlib.nullcontext()
+
+# message for every reason validation.py rejects a command's transaction with
+REJECTIONS = {
+    'deposit': {
+        NOT_POSITIVE: "Deposit amount must be positive!",
+        NOT_FOUND: "Account was not found! Please try again.",
+        NOT_OWNER: "You can only deposit to your own account!",
+        ACCOUNT_DISABLED: "Account is disabled!",
+    },
+    'paybill': {
+        NOT_POSITIVE: "Bill amount must be positive!",
+        LIMIT_EXCEEDED: "Session paybill limit exceeded ($2000)!",
+        NOT_FOUND: "Account was not found! Please try again.",
+        NOT_OWNER: "You can only pay bills from your own account!",
+        ACCOUNT_DISABLED: "Account is disabled!",
+        INSUFFICIENT_FUNDS: "Insufficient funds!",
+    },
+    'withdraw': {
+        NOT_POSITIVE: "Amount must be positive!",
+        LIMIT_EXCEEDED: "Withdrawal limit exceeded!",
+        NOT_FOUND: "Account not found!",
+        NOT_OWNER: "You can only withdraw from your own account!",
+        ACCOUNT_DISABLED: "Account is disabled!",
+        INSUFFICIENT_FUNDS: "Insufficient funds!",
+    },
+    'transfer': {
+        NOT_POSITIVE: "Amount must be positive!",
+        LIMIT_EXCEEDED: "Transfer limit exceeded!",
+        NOT_FOUND: "Invalid account number!",
+        NOT_OWNER: "You can only transfer from your own account!",
+        ACCOUNT_DISABLED: "Account is disabled!",
+        INSUFFICIENT_FUNDS: "Insufficient funds!",
+    },
+}
+
+# commands that record a transaction when they succeed
+TRANSACTION_COMMANDS = ('create', 'deposit', 'paybill', 'withdraw', 'transfer',
+                        'disable', 'delete', 'changeplan')
 
 
 class FrontendMain:
     def __init__(self):
         self.accountManager = AccountManager()
         self.transactionManager = TransactionManager()
-        self.session = Session()
+        self.useMoney(FLOAT_MONEY) # also creates the session
         self.accountsFile = "current_accounts.txt"
         self.transactionsFile = "transactions.txt"
         self.commands = {
@@ -50,53 +139,113 @@ class FrontendMain:
             'delete': self.handleDelete,
             'changeplan': self.handleChangePlan,
             'viewbalance': self.handleViewBalance,
+            'search': self.handleSearch,
         }
         self._input_iter = None
+        self.commandCount = 0
+        self.output = TextSink()
+        self._lastTransaction = None
+        self._attempt = None # what the current command tried, reported if it is rejected
+        self._interactive = False
+        self.saveAccounts = False # write the accounts file on logout and exit
+        self.stats = None # CommandStats when instrumentation is on (see instrumentation.py)
 
     def handleViewBalance(self):
         if not self.session.isLoggedIn():
-            print("You must be logged in!")
+            self.output.message("You must be logged in!")
             return
 
         if self.session.isAdmin():
-            holderName = input().strip()
+            holderName = self.readInput().strip()
         else:
             holderName = self.session.currentUser
 
-        accountNumber = input().strip()
+        accountNumber = self.readInput().strip()
         account = self.accountManager.getAccount(accountNumber)
 
         if not account:
-            print("Account not found!")
+            self.output.message("Account not found!")
             return
 
         if not self.session.isAdmin() and account.holderName != holderName:
-            print("You can only view your own account!")
+            self.output.message("You can only view your own account!")
             return
 
-        print(f"Current Balance: ${account.balance:.2f}")
+        self.output.message(f"Current Balance: ${self.money.format(account.balance)}")
 
     def run(self, command_file=None):
-        self.welcomeMessage() # display welcome message
-        self.accountManager.loadAccountsFromFile(self.accountsFile) # load accounts from file
-        
+        if self.stats is not None:
+            self.stats.attach(self)
+            self.stats.installSignalHandler()
+            self.stats.startProfilers()
+        try:
+            self.welcomeMessage() # display welcome message
+            self.accountManager.output = self.output
+            self.accountManager.loadAccountsFromFile(self.accountsFile) # load accounts from file
+
+            if command_file is None:
+                self._interactive = sys.stdin.isatty()
+                self.runCommands()
+            else:
+                self.runBatch(command_file)
+        finally:
+            self.output.close()
+            if self.stats is not None:
+                self.stats.dump()
+
+    # batch mode: feed the handlers from the command file
+    def runBatch(self, command_file: str):
+        start = time.perf_counter()
+        with open(command_file, "r", buffering=BATCH_BUFFER_SIZE) as file:
+            self._input_iter = (line.rstrip("\n") for line in file)
+            try:
+                self.runCommands()
+            finally:
+                self._input_iter = None
+                elapsed = time.perf_counter() - start
+                rate = self.commandCount / elapsed if elapsed > 0 else 0.0
+                print(f"Processed {self.commandCount} commands in {elapsed:.3f}s "
+                      f"({rate:.0f} commands/s)", file=sys.stderr)
+
+    # read and process commands until the input runs out
+    def runCommands(self):
         try:
             while True:
-                command = input().strip().lower()
+                command = self.readInput().strip().lower()
+                self.commandCount += 1
                 self.processCommand(command)
         except EOFError:
-            pass
+            # end of input finishes the transaction file like exit/quit
+            self.transactionManager.closeTransactionFile(self.transactionsFile)
+
+    # next input line, from the command file in batch mode
+    def readInput(self) -> str:
+        if self._input_iter is None:
+            if self._interactive:
+                self.output.flush()
+            return input()
+        try:
+            return next(self._input_iter)
+        except StopIteration:
+            raise EOFError from None
 
     def welcomeMessage(self):
-        print("================================")
-        print("Welcome to the Bank ATM System!")
-        print("================================")
+        self.output.message("================================")
+        self.output.message("Welcome to the Bank ATM System!")
+        self.output.message("================================")
 
     def processCommand(self, command: str):
+        start = time.perf_counter()
+        self._lastTransaction = None
+        self._attempt = None
+
         if command in ["exit","quit"]:
-            self.transactionManager.writeTransactionsToFile(self.transactionsFile)
-            print("Transactions saved to file.")
-            print("Thank you for using the ATM. Goodbye!")
+            self.transactionManager.closeTransactionFile(self.transactionsFile)
+            if self.saveAccounts:
+                self.accountManager.saveAccountsToFile(self.accountsFile)
+            self.output.message("Transactions saved to file.")
+            self.output.message("Thank you for using the ATM. Goodbye!")
+            self.commandDone(command, start)
             exit(0)
 
         elif command == "login":
@@ -106,16 +255,75 @@ class FrontendMain:
         elif command in self.commands:
             self.commands[command]()
         else:
-            print("Invalid command!")
-            
-        
+            self.output.message("Invalid command!")
+
+        self.commandDone(command, start)
+
+    # report the outcome of a finished command to the output sink
+    def commandDone(self, command: str, start: float):
+        transaction = self._lastTransaction
+        if transaction is not None:
+            outcome = "accepted"
+        elif command in TRANSACTION_COMMANDS:
+            outcome = "rejected"
+            transaction = self._attempt
+        elif command in self.commands or command in ("login", "logout", "exit", "quit"):
+            outcome = "ok"
+        else:
+            outcome = "invalid"
+        seconds = time.perf_counter() - start
+        self.output.commandDone(command, transaction, outcome, seconds)
+        if self.stats is not None:
+            self.stats.recordCommand(command, outcome, seconds)
+
+    # switch between float dollars and integer cents (see money.py)
+    def useMoney(self, money):
+        self.money = money
+        self.maxBalance = money.fromDollars(99999.99)
+        self.session = Session(money)
+        self.accountManager.money = money
+
+    # hold the given accounts (or the whole manager with no arguments) while
+    # a command checks and changes them; a single terminal needs no locking
+    def lockAccounts(self, *accountNumbers):
+        return NO_LOCK
+
+    # record a transaction made by the current command
+    # credit is the record of the receiving side of a transfer, written right after it
+    def recordTransaction(self, transaction: Transaction, credit: Transaction = None):
+        transaction.money = self.money
+        transaction.session = self.session.sessionId
+        if credit is None:
+            self.transactionManager.addTransaction(transaction)
+        else:
+            credit.money = self.money
+            credit.session = self.session.sessionId
+            self.transactionManager.addTransactions([transaction, credit])
+        self._lastTransaction = transaction
+
+    # the transaction the current command is trying, kept so a rejection can
+    # report its account and amount (None while they are not read yet)
+    def attempt(self, code: str, holderName: str, accountNumber: str = None, amount=None,
+                extra: str = "") -> Transaction:
+        transaction = Transaction(code, holderName, accountNumber, amount, extra)
+        transaction.money = self.money
+        self._attempt = transaction
+        return transaction
+
+    # check a proposed transaction against the business rules (validation.py),
+    # returns the reason code and the accounts it looked up by number
+    def checkTransaction(self, transaction: Transaction) -> tuple:
+        found = {}
+        reason = validateTransactions([transaction], self.session, self.accountManager, found)[0]
+        return reason, found
+
     def handleLogin(self):
         if self.session.isLoggedIn():
-            print("Already logged in!")
+            self.output.message("Already logged in!")
             return
 
         while True:
-            modeInput = input().strip().lower()
+            modeInput = self.readInput().strip().lower()
             if modeInput == "admin":
                 mode = SessionMode.ADMIN
                 break
@@ -123,114 +331,111 @@ class FrontendMain:
                 mode = SessionMode.STANDARD
                 break
             else:
-                print("Mode incorrect, please enter 'admin' or 'standard'.")
+                self.output.message("Mode incorrect, please enter 'admin' or 'standard'.")
 
         if mode == SessionMode.STANDARD:
-            username = input().strip()
+            username = self.readInput().strip()
             account = self.accountManager.findByHolderName(username)
 
             if not account:
-                print("User does not exist.")
+                self.output.message("User does not exist.")
                 return
             self.session.login(mode, username)
         else:
             self.session.login(mode,"admin")
 
-        print("Login is successful!")
+        self.output.message("Login is successful!")
 
     def handleLogout(self):
         if not self.session.isLoggedIn():
-            print("No user currently logged in!")
+            self.output.message("No user currently logged in!")
             return
 
-        print("Logging out...")
+        self.output.message("Logging out...")
         self.session.logout()
 
         # Write all recorded transactions to output file
         self.transactionManager.writeTransactionsToFile(self.transactionsFile)
+        if self.saveAccounts:
+            self.accountManager.saveAccountsToFile(self.accountsFile)
 
 
-        print("Transactions and accounts saved to file.")
+        self.output.message("Transactions and accounts saved to file.")
 
 
     # Standard user commands
     def handleCreate(self):
         if not self.session.isLoggedIn() or not self.session.isAdmin():
-            print("Only admins can create accounts!")
+            self.output.message("Only admins can create accounts!")
             return
 
         try:
-            username = input().strip()
+            username = self.readInput().strip()
+            self.attempt("05", username)
             if len(username) > 20:
-                print("Name must be 20 characters or less!")
+                self.output.message("Name must be 20 characters or less!")
                 return
 
-            balance = float(input())
-            if balance < 0 or balance > 99999.99:
-                print("Balance must be between $0.00 and $99,999.99!")
+            balance = self.money.parse(self.readInput())
+            self.attempt("05", username, amount=balance)
+            if balance < 0 or balance > self.maxBalance:
+                self.output.message("Balance must be between $0.00 and $99,999.99!")
                 return
 
-            account = self.accountManager.createAccount(username, balance)
-            print("Account successfully created!")
-            print(f"New Account Number: {account.accountNumber}")
+            with self.lockAccounts():
+                account = self.accountManager.createAccount(username, balance)
+                self.output.message("Account successfully created!")
+                self.output.message(f"New Account Number: {account.accountNumber}")
 
-            transaction = Transaction(
-                "05", username, account.accountNumber, balance, ""
-            )
-            self.transactionManager.addTransaction(transaction)
+                transaction = Transaction(
+                    "05", username, account.accountNumber, balance, ""
+                )
+                self.recordTransaction(transaction)
 
         except ValueError:
-            print("Invalid input!")
+            self.output.message("Invalid input!")
 
     def handleDeposit(self):
         if not self.session.isLoggedIn():
-            print("You must be logged in to deposit!")
+            self.output.message("You must be logged in to deposit!")
             return
         
         if self.session.isAdmin():
-            holderName = input().strip()
+            holderName = self.readInput().strip()
         else:
             holderName = self.session.currentUser
 
-        accountNumber = input().strip()
+        accountNumber = self.readInput().strip()
+        self.attempt("04", holderName, accountNumber)
         
         try:
-            amount = float(input())
-            if amount <= 0:
-                print("Deposit amount must be positive!")
-                return
-            
-            account = self.accountManager.getAccount(accountNumber)
-            if not account:
-                print("Account was not found! Please try again.")
-                return
-            
-            # Standard users can only deposit to their own account
-            if not self.session.isAdmin() and not account.matchesOwner(holderName):
-                print("You can only deposit to your own account!")
+            amount = self.money.parse(self.readInput())
+            # record transaction (04 is deposit code)
+            transaction = self.attempt("04", holderName, accountNumber, amount)
+            reason, _ = self.checkTransaction(transaction)
+            if reason:
+                self.output.message(REJECTIONS["deposit"][reason])
                 return
 
             # account.adjustBalance(amount)
-            print("Deposit was successful! Funds will be available in next session.")
-
-            # record transaction (04 is deposit code)
-            transaction = Transaction("04", holderName, account.accountNumber, amount, "")
-            self.transactionManager.addTransaction(transaction)
+            self.output.message("Deposit was successful! Funds will be available in next session.")
+            self.recordTransaction(transaction)
 
         except ValueError:
-            print("Invalid amount entered!")
+            self.output.message("Invalid amount entered!")
 
     def handlePayBill(self):
         if not self.session.isLoggedIn():
-            print("You must be logged in to pay a bill!")
+            self.output.message("You must be logged in to pay a bill!")
             return
         
         if self.session.isAdmin():
-            holderName = input().strip()
+            holderName = self.readInput().strip()
         else:
             holderName = self.session.currentUser
 
-        accountNumber = input().strip()
+        accountNumber = self.readInput().strip()
+        self.attempt("03", holderName, accountNumber)
         
         # valid payees and print options
         validPayees = {
@@ -239,216 +444,174 @@ class FrontendMain:
             'fi': 'Fast Internet, Inc. (FI)'
         }
 
-        payeeCode = input().strip().lower()
-        if payeeCode not in validPayees:
-            print("Invalid payee code!")
+        payeeCode = self.readInput().strip().lower()
+        if not isValidPayee(payeeCode):
+            self.output.message("Invalid payee code!")
             return
         
         try:
-            amount = float(input())
-            if amount <= 0:
-                print("Bill amount must be positive!")
-                return
-            
-            if not self.session.canPayBill(amount):
-                print("Session paybill limit exceeded ($2000)!")
-                return
-            
-            account = self.accountManager.getAccount(accountNumber)
-            if not account:
-                print("Account was not found! Please try again.")
-                return
-            
-            if not self.session.isAdmin() and account.holderName != holderName:
-                print("You can only pay bills from your own account!")
-                return
-            
-            if account.balance - amount < 0:
-                print("Insufficient funds!")
-                return
-            
-            account.adjustBalance(-amount)
-            self.session.recordPayBill(amount)
-            print("Bill payment was successful!")
-            print(f"Payee: {validPayees[payeeCode]}")
-            print(f"Current Balance: ${account.balance:.2f}")
-
-            # record transaction (03 is paybill code)
-            transaction = Transaction("03", holderName, account.accountNumber, amount, payeeCode.upper())
-            self.transactionManager.addTransaction(transaction)
+            amount = self.money.parse(self.readInput())
+            with self.lockAccounts(accountNumber):
+                # record transaction (03 is paybill code)
+                transaction = self.attempt("03", holderName, accountNumber, amount, payeeCode.upper())
+                reason, found = self.checkTransaction(transaction)
+                if reason:
+                    self.output.message(REJECTIONS["paybill"][reason])
+                    return
+
+                account = found[accountNumber]
+                account.adjustBalance(-amount)
+                self.session.recordPayBill(amount)
+                self.output.message("Bill payment was successful!")
+                self.output.message(f"Payee: {validPayees[payeeCode]}")
+                self.output.message(f"Current Balance: ${self.money.format(account.balance)}")
+                self.recordTransaction(transaction)
 
         except ValueError:
-            print("Invalid amount entered!")
+            self.output.message("Invalid amount entered!")
 
 
     # Admin commands (commented out)
     def handleWithdraw(self):
         if not self.session.isLoggedIn():
-            print("You must be logged in!")
+            self.output.message("You must be logged in!")
             return
 
         if self.session.isAdmin():
-            holderName = input().strip()
+            holderName = self.readInput().strip()
         else:
             holderName = self.session.currentUser
-        accountNumber = input().strip()
+        accountNumber = self.readInput().strip()
+        self.attempt("01", holderName, accountNumber)
 
         try:
-            amount = float(input())
-            if amount <= 0:
-                print("Amount must be positive!")
-                return
-
-            if not self.session.canWithdraw(amount):
-                print("Withdrawal limit exceeded!")
-                return
-
-            account = self.accountManager.getAccount(accountNumber)
-
-            if not account:
-                print("Account not found!")
-                return
-
-            if not self.session.isAdmin() and account.holderName != holderName:
-                print("You can only withdraw from your own account!")
-                return
+            amount = self.money.parse(self.readInput())
+            with self.lockAccounts(accountNumber):
+                transaction = self.attempt("01", holderName, accountNumber, amount)
+                reason, found = self.checkTransaction(transaction)
+                if reason:
+                    self.output.message(REJECTIONS["withdraw"][reason])
+                    return
 
-            if account.balance < amount:
-                print("Insufficient funds!")
-                return
-
-            account.adjustBalance(-amount)
-            self.session.recordWithdraw(amount)
-
-            print("Withdrawal successful.")
+                found[accountNumber].adjustBalance(-amount)
+                self.session.recordWithdraw(amount)
 
-            transaction = Transaction("01", holderName, accountNumber, amount, "")
-            self.transactionManager.addTransaction(transaction)
+                self.output.message("Withdrawal successful.")
+                self.recordTransaction(transaction)
 
         except ValueError:
-            print("Invalid amount entered!")
+            self.output.message("Invalid amount entered!")
             
     def handleTransfer(self):
         if not self.session.isLoggedIn():
-            print("You must be logged in!")
+            self.output.message("You must be logged in!")
             return
 
         if self.session.isAdmin():
-            holderName = input().strip()
+            holderName = self.readInput().strip()
         else:
             holderName = self.session.currentUser
-        fromAccountNum = input().strip()
-        toAccountNum = input().strip()
+        fromAccountNum = self.readInput().strip()
+        toAccountNum = self.readInput().strip()
+        self.attempt("02", holderName, fromAccountNum, extra=toAccountNum)
 
         try:
-            amount = float(input())
-            if amount <= 0:
-                print("Amount must be positive!")
-                return
-
-            if not self.session.canTransfer(amount):
-                print("Transfer limit exceeded!")
-                return
-
-            fromAccount = self.accountManager.getAccount(fromAccountNum)
-            toAccount = self.accountManager.getAccount(toAccountNum)
-
-            if not fromAccount or not toAccount:
-                print("Invalid account number!")
-                return
-
-            if not self.session.isAdmin() and fromAccount.holderName != holderName:
-                print("You can only transfer from your own account!")
-                return
-
-            if fromAccount.balance < amount:
-                print("Insufficient funds!")
-                return
-
-            fromAccount.adjustBalance(-amount)
-            toAccount.adjustBalance(amount)
-            self.session.recordTransfer(amount)
-
-            print("Transfer successful.")
-
-            transaction = Transaction("02", holderName, fromAccountNum, amount, toAccountNum)
-            self.transactionManager.addTransaction(transaction)
+            amount = self.money.parse(self.readInput())
+            with self.lockAccounts(fromAccountNum, toAccountNum):
+                transaction = self.attempt("02", holderName, fromAccountNum, amount, toAccountNum)
+                reason, found = self.checkTransaction(transaction)
+                if reason:
+                    self.output.message(REJECTIONS["transfer"][reason])
+                    return
+
+                self.accountManager.transferFunds(found[fromAccountNum], found[toAccountNum], amount)
+                self.session.recordTransfer(amount)
+
+                self.output.message("Transfer successful.")
+                target = found[toAccountNum]
+                self.recordTransaction(transaction,
+                                       Transaction("02", target.holderName, toAccountNum, amount, TRANSFER_CREDIT))
 
         except ValueError:
-            print("Invalid amount entered!")
+            self.output.message("Invalid amount entered!")
 
 # Admin Only Operations
 # handleDisable will disable an existing account, and record a disable transaction. Its also an admin only operation
     def handleDisable(self):
     # Ensures a user is logged in before proceeding
         if not self.session.isLoggedIn():
-            print("You must be logged in!")
+            self.output.message("You must be logged in!")
             return
     # Only admins are allowed to disable accounts
         if not self.session.isAdmin():
-            print("Only admins can disable accounts!")
+            self.output.message("Only admins can disable accounts!")
             return
     # Prompt admin for account number to disable
-        accountNumber = input().strip()
-        account = self.accountManager.getAccount(accountNumber)
-    # Validate that account exists
-        if not account:
-            print("Account not found!")
-            return
-     # Prevent disabling an already disabled account
-        if not account.isActive():
-            print("Account already disabled!")
-            return
+        accountNumber = self.readInput().strip()
+        self.attempt("07", "", accountNumber, self.money.zero)
+        with self.lockAccounts(accountNumber):
+            account = self.accountManager.getAccount(accountNumber)
+        # Validate that account exists
+            if not account:
+                self.output.message("Account not found!")
+                return
+         # Prevent disabling an already disabled account
+            if not account.isActive():
+                self.output.message("Account already disabled!")
+                return
 
-        self.accountManager.disableAccount(accountNumber)
-        print("Account disabled successfully.")
-    # Record disable transaction (07 = disable code)
-        transaction = Transaction("07", account.holderName, accountNumber, 0.0, "")
-        self.transactionManager.addTransaction(transaction)
+            self.accountManager.disableAccount(accountNumber)
+            self.output.message("Account disabled successfully.")
+        # Record disable transaction (07 = disable code)
+            transaction = Transaction("07", account.holderName, accountNumber, self.money.zero, "")
+            self.recordTransaction(transaction)
 
 # handleDelete deletes an existing account and record a delete transaction. Its also an admin only operation.
     def handleDelete(self):
  # Ensure a user is logged in before proceeding
         if not self.session.isLoggedIn():
-            print("You must be logged in!")
+            self.output.message("You must be logged in!")
             return
  # Only admins are allowed to delete accounts
         if not self.session.isAdmin():
-            print("Only admins can delete accounts!")
+            self.output.message("Only admins can delete accounts!")
             return
 
-        accountNumber = input().strip()
-        account = self.accountManager.getAccount(accountNumber)
-# Validate account existence
-        if not account:
-            print("Account not found!")
-            return
+        accountNumber = self.readInput().strip()
+        self.attempt("06", "", accountNumber, self.money.zero)
+        with self.lockAccounts(accountNumber):
+            account = self.accountManager.getAccount(accountNumber)
+    # Validate account existence
+            if not account:
+                self.output.message("Account not found!")
+                return
 
-        self.accountManager.deleteAccount(accountNumber)
-        print("Account deleted successfully.")
- # Record delete transaction (06 = delete code)
-        transaction = Transaction("06", account.holderName, accountNumber, 0.0, "")
-        self.transactionManager.addTransaction(transaction)
+            self.accountManager.deleteAccount(accountNumber)
+            self.output.message("Account deleted successfully.")
+     # Record delete transaction (06 = delete code)
+            transaction = Transaction("06", account.holderName, accountNumber, self.money.zero, "")
+            self.recordTransaction(transaction)
 
     def handleChangePlan(self):
         # Ensure a user is logged in & is admin
         if not self.session.isLoggedIn() or not self.session.isAdmin():
-            print("Only admins can change account plans!")
+            self.output.message("Only admins can change account plans!")
             return
 
-        accountNumber = input().strip()
+        accountNumber = self.readInput().strip()
+        self.attempt("08", "", accountNumber, self.money.zero)
         account = self.accountManager.getAccount(accountNumber)
 
         if not account:
-            print("Account not found!")
+            self.output.message("Account not found!")
             return
         
-        newPlanInput = input().strip().upper()
+        newPlanInput = self.readInput().strip().upper()
 
         # Validate account existence
         account = self.accountManager.getAccount(accountNumber)
         if not account:
-            print("Account not found!")
+            self.output.message("Account not found!")
             return
             
         # Determine correct AccountPlan enum value
@@ -457,17 +620,110 @@ class FrontendMain:
         elif newPlanInput == "N":
             newPlan = AccountPlan.NON_STUDENT
         else:
-            print("Invalid plan type!")
+            self.output.message("Invalid plan type!")
             return
         
         # Update account plan through AccountManager
         self.accountManager.changeAccountPlan(accountNumber, newPlan)
-        print("Account plan updated successfully!")
+        self.output.message("Account plan updated successfully!")
 
         # Record change-plan transaction (08 = change plan code)
-        transaction = Transaction("08", account.holderName, accountNumber, 0.0, newPlanInput)
-        self.transactionManager.addTransaction(transaction)
-        
+        transaction = Transaction("08", account.holderName, accountNumber, self.money.zero, newPlanInput)
+        self.recordTransaction(transaction)
+
+    # list accounts by holder name: "text" matches names starting with text,
+    # "text~" or "text~2" names within 1 or 2 edits; then a page number (blank for 1)
+    def handleSearch(self):
+        if not self.session.isLoggedIn() or not self.session.isAdmin():
+            self.output.message("Only admins can search accounts!")
+            return
+
+        query = self.readInput().strip()
+        pageInput = self.readInput().strip()
+        maxDistance = 0
+        text, fuzzy, distance = query.rpartition("~") if "~" in query else (query, "", "")
+        if fuzzy:
+            if distance not in ("", "1", "2"):
+                self.output.message("Invalid search distance!")
+                return
+            maxDistance = int(distance or "1")
+        if not text:
+            self.output.message("Search text is required!")
+            return
+        if pageInput and not (pageInput.isdigit() and int(pageInput) >= 1):
+            self.output.message("Invalid page number!")
+            return
+        page = int(pageInput or "1")
+
+        try:
+            accounts, more = self.accountManager.searchHolders(text, maxDistance, page)
+        except ValueError:
+            self.output.message("Name search is not available!")
+            return
+        if not accounts:
+            self.output.message("No matching accounts found.")
+            return
+        for account in accounts:
+            status = "A" if account.isActive() else "D"
+            self.output.message(f"{account.accountNumber} {account.holderName} {status} "
+                                f"${self.money.format(account.balance)}")
+        if more:
+            self.output.message(f"More accounts on page {page + 1}.")
+
+
+
+# account manager selected by the environment (see header)
+def createAccountManager() -> AccountManager:
+    manager = _selectAccountManager()
+    if os.environ.get("ATM_ACCOUNT_LEASES"):
+        from account_leases import AccountNumberLeases, DEFAULT_BLOCK_SIZE
+        manager.numberLeases = AccountNumberLeases(
+            os.environ["ATM_ACCOUNT_LEASES"],
+            int(os.environ.get("ATM_LEASE_BLOCK", DEFAULT_BLOCK_SIZE)),
+        )
+    return manager
+
+
+def _selectAccountManager() -> AccountManager:
+    if os.environ.get("ATM_SHARDS"):
+        from sharded_account_manager import ShardedAccountManager
+        return ShardedAccountManager(int(os.environ["ATM_SHARDS"]))
+    if os.environ.get("ATM_LAZY_ACCOUNTS") == "1":
+        from lazy_account_manager import LazyAccountManager
+        return LazyAccountManager()
+    if os.environ.get("ATM_DELTA_LOG") == "1":
+        from delta_account_manager import DeltaAccountManager
+        return DeltaAccountManager()
+    if os.environ.get("ATM_SNAPSHOT") == "1":
+        from cached_account_manager import CachedAccountManager
+        return CachedAccountManager()
+    if os.environ.get("ATM_LOAD_WORKERS"):
+        from bulk_loader import BulkAccountManager
+        return BulkAccountManager(workers=int(os.environ["ATM_LOAD_WORKERS"]) or None)
+    return AccountManager()
+
+
+# why the ATM_* settings can not be used together, None if they can
+def settingsError() -> str:
+    if os.environ.get("ATM_DELTA_LOG") == "1" and (
+            os.environ.get("ATM_LAZY_ACCOUNTS") == "1" or os.environ.get("ATM_SHARDS")):
+        return "ATM_DELTA_LOG can not be combined with ATM_LAZY_ACCOUNTS or ATM_SHARDS"
+    return None
+
+
+# transaction manager selected by the environment (see header)
+def createTransactionManager(transactionsFile: str) -> TransactionManager:
+    if os.environ.get("ATM_JOURNAL"):
+        from transaction_journal import JournaledTransactionManager
+        return JournaledTransactionManager(
+            transactionsFile,
+            os.environ["ATM_JOURNAL"],
+            float(os.environ.get("ATM_JOURNAL_INTERVAL", "1.0")),
+        )
+    if os.environ.get("ATM_TRANSACTION_BUFFER"):
+        from bounded_transaction_manager import BoundedTransactionManager
+        return BoundedTransactionManager(int(os.environ["ATM_TRANSACTION_BUFFER"]))
+    return TransactionManager()
 
 
 if __name__ == "__main__":
@@ -476,12 +732,26 @@ if __name__ == "__main__":
         print("Usage: python frontend_main.py <accounts_file> <transactions_file> [<command_file>]")
         sys.exit(1)
 
+    error = settingsError()
+    if error:
+        print(error)
+        sys.exit(1)
+
     accounts_file = sys.argv[1]
     transactions_file = sys.argv[2]
     command_file = sys.argv[3] if len(sys.argv) == 4 else None
 
     frontend = FrontendMain()
+    frontend.accountManager = createAccountManager()
+    frontend.transactionManager = createTransactionManager(transactions_file)
     frontend.accountsFile = accounts_file
     frontend.transactionsFile = transactions_file
+    frontend.output = createSink(os.environ.get("ATM_OUTPUT", "text"))
+    frontend.saveAccounts = os.environ.get("ATM_DELTA_LOG") == "1"
+    if os.environ.get("ATM_STATS") or os.environ.get("ATM_PROFILE"):
+        from instrumentation import createStats
+        frontend.stats = createStats()
+    if os.environ.get("ATM_CENTS") == "1":
+        frontend.useMoney(CENTS_MONEY)
 
     frontend.run(command_file)
@@ -0,0 +1,306 @@
+"""
+history_store.py - archive of daily transaction files for statements
+
+Daily .atf files are ingested into a directory of append-only columns,
+one value per record:
+    days.col        date ordinal of the daily file (int32)
+    codes.col       transaction code (uint8)
+    accounts.col    account number (uint32)
+    amounts.col     amount in cents (int64)
+    names.col       holder name, id into strings.txt (uint32)
+    extras.col      extra field, id into strings.txt (uint32)
+    strings.txt     distinct names and extras, one per line
+
+Every ingested file is a segment with two sorted key columns in
+accounts.idx and names.idx: (account number << 32 | record) and
+(lower-cased holder name id << 32 | record). A statement only bisects
+the key columns of the segments inside its date range and reads the
+matching records, it never scans the archive.
+
+manifest.json is replaced last on every ingest, so columns that grew
+past the record count it lists (an interrupted ingest) are cut back on
+open. Files are identified by their day and content hash; ingesting a
+file again for the same day does nothing, while identical files of
+different days (e.g. two days without transactions) are both kept.
+
+Usage:
+    python history_store.py ingest <store_dir> [--day YYYY-MM-DD] <transactions_file>...
+    python history_store.py statement <store_dir> <account_number> [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+import mmap
+import os
+import re
+import sys
+from array import array
+
+from cached_account_manager import fileDigest
+from money import FLOAT_MONEY, formatCents
+from transaction import Transaction
+from transaction_reader import readColumns
+
+MANIFEST_VERSION = 1
+
+# column name -> array typecode
+COLUMNS = {
+    "days": "i",
+    "codes": "B",
+    "accounts": "I",
+    "amounts": "q",
+    "names": "I",
+    "extras": "I",
+}
+INDEXES = ("accounts", "names")
+
+# a date in a daily file name, e.g. transout-2025-03-14.atf
+DAY_IN_NAME = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+
+# the day a daily file belongs to: a date in its name, else its mtime
+def dayOfFile(filename: str) -> datetime.date:
+    match = DAY_IN_NAME.search(os.path.basename(filename))
+    if match:
+        try:
+            return datetime.date(*map(int, match.groups()))
+        except ValueError:
+            pass
+    return datetime.date.fromtimestamp(os.path.getmtime(filename))
+
+
+class TransactionHistory:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._readManifest()
+        self.strings = []
+        self.stringIds = {}
+        self._loadStrings()
+        self._trimColumns()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _readManifest(self) -> dict:
+        try:
+            with open(self._path("manifest.json")) as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return {"version": MANIFEST_VERSION, "records": 0, "strings": 0, "segments": []}
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"'{self.directory}' is not a version {MANIFEST_VERSION} history store")
+        return manifest
+
+    def _writeManifest(self) -> None:
+        tmpName = self._path("manifest.json.tmp")
+        with open(tmpName, "w") as file:
+            json.dump(self.manifest, file, indent=1)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmpName, self._path("manifest.json"))
+
+    def _loadStrings(self) -> None:
+        try:
+            with open(self._path("strings.txt"), encoding="utf-8", newline="\n") as file:
+                for line in file:
+                    if len(self.strings) == self.manifest["strings"]:
+                        break
+                    self._addString(line[:-1])
+        except FileNotFoundError:
+            pass
+
+    def _addString(self, text: str) -> int:
+        self.strings.append(text)
+        self.stringIds[text] = len(self.strings) - 1
+        return len(self.strings) - 1
+
+    # cut every column back to what the manifest lists
+    def _trimColumns(self) -> None:
+        records = self.manifest["records"]
+        for name, typecode in COLUMNS.items():
+            self._truncate(f"{name}.col", records * array(typecode).itemsize)
+        for name in INDEXES:
+            self._truncate(f"{name}.idx", records * array("Q").itemsize)
+        with open(self._path("strings.txt"), "a", encoding="utf-8", newline="\n") as file:
+            size = sum(len(text.encode("utf-8")) + 1 for text in self.strings)
+            file.truncate(size)
+
+    def _truncate(self, name: str, size: int) -> None:
+        with open(self._path(name), "ab") as file:
+            if file.tell() != size:
+                file.truncate(size)
+
+    def _stringId(self, text: str, added: list) -> int:
+        stringId = self.stringIds.get(text)
+        if stringId is None:
+            stringId = self._addString(text)
+            added.append(text)
+        return stringId
+
+    # add a daily file, returns the records added (0 if it was seen before for that day)
+    def ingest(self, filename: str, day: datetime.date = None) -> int:
+        day = day or dayOfFile(filename)
+        digest = fileDigest(filename).hex()
+        if any(segment["digest"] == digest and segment["day"] == day.isoformat()
+               for segment in self.manifest["segments"]):
+            return 0
+        transactions = readColumns(filename)
+        count = len(transactions)
+
+        first = self.manifest["records"]
+        added = []
+        nameIds = array("I", [self._stringId(name, added) for name in transactions.holderNames])
+        lowerIds = [self._stringId(name.lower(), added) for name in transactions.holderNames]
+        extraIds = array("I", [self._stringId(extra, added) for extra in transactions.extras])
+        columns = {
+            "days": array("i", [day.toordinal()]) * count,
+            "codes": transactions.codes,
+            "accounts": array("I", transactions.accountNumbers),
+            "amounts": transactions.amounts,
+            "names": nameIds,
+            "extras": extraIds,
+        }
+        keys = {
+            "accounts": array("Q", sorted((num << 32) | (first + i)
+                                          for i, num in enumerate(transactions.accountNumbers))),
+            "names": array("Q", sorted((nameId << 32) | (first + i) for i, nameId in enumerate(lowerIds))),
+        }
+
+        for name, column in columns.items():
+            with open(self._path(f"{name}.col"), "ab") as file:
+                file.write(column.tobytes())
+        offsets = {}
+        for name, column in keys.items():
+            with open(self._path(f"{name}.idx"), "ab") as file:
+                offsets[name] = file.tell() // column.itemsize
+                file.write(column.tobytes())
+        with open(self._path("strings.txt"), "a", encoding="utf-8", newline="\n") as file:
+            file.write("".join(text + "\n" for text in added))
+
+        self.manifest["segments"].append({
+            "file": os.path.abspath(filename),
+            "digest": digest,
+            "day": day.isoformat(),
+            "first": first,
+            "count": count,
+            "index": offsets,
+        })
+        self.manifest["records"] = first + count
+        self.manifest["strings"] = len(self.strings)
+        self._writeManifest()
+        return count
+
+    # the records of segments in [start, end] whose key column holds key
+    def _lookup(self, index: str, key: int, start: datetime.date, end: datetime.date) -> list:
+        segments = [segment for segment in self.manifest["segments"]
+                    if (start is None or segment["day"] >= start.isoformat())
+                    and (end is None or segment["day"] <= end.isoformat())]
+        if not segments or not self.manifest["records"]:
+            return []
+
+        records = []
+        with _MappedColumn(self._path(f"{index}.idx"), "Q") as keys:
+            for segment in segments:
+                lo = segment["index"][index]
+                hi = lo + segment["count"]
+                left = bisect.bisect_left(keys, key << 32, lo, hi)
+                right = bisect.bisect_left(keys, (key + 1) << 32, left, hi)
+                records.extend(keys[i] & 0xFFFFFFFF for i in range(left, right))
+        records.sort()
+        return records
+
+    # (date, Transaction) pairs for the given records, in the money representation
+    def _read(self, records: list, money=FLOAT_MONEY) -> list:
+        if not records:
+            return []
+        mapped = {name: _MappedColumn(self._path(f"{name}.col"), typecode) for name, typecode in COLUMNS.items()}
+        try:
+            days, codes, accounts, amounts, names, extras = (mapped[name] for name in COLUMNS)
+            statement = []
+            for i in records:
+                cents = amounts[i]
+                transaction = Transaction(f"{codes[i]:02}", self.strings[names[i]], f"{accounts[i]:05d}",
+                                          money.parse(formatCents(cents)), self.strings[extras[i]])
+                transaction.money = money
+                statement.append((datetime.date.fromordinal(days[i]), transaction))
+            return statement
+        finally:
+            for column in mapped.values():
+                column.close()
+
+    # one account's transactions between start and end (inclusive), oldest first
+    def statement(self, accountNumber: str, start: datetime.date = None, end: datetime.date = None,
+                  money=FLOAT_MONEY) -> list:
+        return self._read(self._lookup("accounts", int(accountNumber), start, end), money)
+
+    # every transaction recorded under a holder name (any case) between start and end
+    def holderStatement(self, holderName: str, start: datetime.date = None, end: datetime.date = None,
+                        money=FLOAT_MONEY) -> list:
+        nameId = self.stringIds.get(holderName.lower())
+        if nameId is None:
+            return []
+        return self._read(self._lookup("names", nameId, start, end), money)
+
+
+# read-only memory-mapped column, indexed like a list
+class _MappedColumn:
+    def __init__(self, filename: str, typecode: str):
+        self._file = open(filename, "rb")
+        self._map = None
+        self._view = memoryview(b"").cast(typecode)
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map).cast(typecode)
+
+    def __len__(self):
+        return len(self._view)
+
+    def __getitem__(self, i):
+        return self._view[i]
+
+    def close(self) -> None:
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transaction history store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingestParser = commands.add_parser("ingest", help="add daily transaction files")
+    ingestParser.add_argument("store")
+    ingestParser.add_argument("files", nargs="+")
+    ingestParser.add_argument("--day", type=datetime.date.fromisoformat, default=None,
+                              help="date of the files (default: from the file name or mtime)")
+    statementParser = commands.add_parser("statement", help="one account's transactions")
+    statementParser.add_argument("store")
+    statementParser.add_argument("account")
+    statementParser.add_argument("--from", dest="start", type=datetime.date.fromisoformat, default=None)
+    statementParser.add_argument("--to", dest="end", type=datetime.date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    history = TransactionHistory(args.store)
+    if args.command == "ingest":
+        for filename in args.files:
+            try:
+                added = history.ingest(filename, args.day)
+            except (FileNotFoundError, ValueError) as error:
+                print(f"Could not ingest '{filename}': {error}")
+                sys.exit(1)
+            if added:
+                print(f"Ingested {added} transactions from '{filename}'.")
+            else:
+                print(f"'{filename}' was already ingested.")
+    else:
+        for day, transaction in history.statement(args.account, args.start, args.end):
+            print(f"{day.isoformat()}  {transaction.formatForFile()}")
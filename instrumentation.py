@@ -0,0 +1,237 @@
+"""
+instrumentation.py - where the front end spends its time
+
+CommandStats keeps, per command, a latency histogram (power-of-two
+microsecond buckets) and the accepted / rejected / ok / invalid
+counts, plus call counts and times for the file operations it is
+attached to. Optional profilers:
+    cpu     - cProfile, the functions with the most cumulative time
+    memory  - tracemalloc, current / peak size and the top allocation sites
+
+The stats are written as JSON by dump(), and on SIGUSR1 by a watcher
+thread, so an idle process or one blocked on input dumps as well.
+Nothing is timed unless a
+CommandStats is attached, so the front end pays a single attribute
+check per command when instrumentation is off.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+PROFILERS = ("cpu", "memory")
+
+# entries kept in the profiler sections of the dump
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+
+# count, total, min, max and a log2 histogram of durations
+class LatencyHistogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = {}  # bucket -> count, durations up to 2**bucket us
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    # upper bound (us) of the bucket holding the given fraction of samples
+    def percentile(self, fraction: float) -> int:
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= fraction * self.count:
+                return 1 << bucket
+        return 0
+
+    def toDict(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1e3, 3),
+            "mean_us": round(self.total / self.count * 1e6, 1),
+            "min_us": round(self.min * 1e6, 1),
+            "max_us": round(self.max * 1e6, 1),
+            "p50_us": self.percentile(0.5),
+            "p90_us": self.percentile(0.9),
+            "p99_us": self.percentile(0.99),
+            "histogram_us": {f"<={1 << bucket}": self.buckets[bucket] for bucket in sorted(self.buckets)},
+        }
+
+
+class CommandStats:
+    def __init__(self, filename: str, profilers: tuple = ()):
+        for profiler in profilers:
+            if profiler not in PROFILERS:
+                raise ValueError(f"Unknown profiler '{profiler}'")
+        self.filename = filename
+        self.profilers = tuple(profilers)
+        self.started = time.time()
+        self.commands = {}  # command -> LatencyHistogram
+        self.outcomes = {}  # command -> {outcome: count}
+        self.operations = {}  # file operation -> LatencyHistogram
+        self._lock = threading.Lock()
+        self._profile = None
+        # set by the SIGUSR1 handler, the watcher thread writes the dump
+        self._dumpRequest = threading.Event()
+        self._dumpWatcher = None
+        self._dumpLock = threading.Lock()
+
+    # a finished command, with the outcome FrontendMain.commandDone reports
+    def recordCommand(self, command: str, outcome: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.commands.get(command)
+            if histogram is None:
+                histogram = self.commands[command] = LatencyHistogram()
+                self.outcomes[command] = {}
+            histogram.record(seconds)
+            counts = self.outcomes[command]
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def recordOperation(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.operations.get(name)
+            if histogram is None:
+                histogram = self.operations[name] = LatencyHistogram()
+            histogram.record(seconds)
+
+    # replace obj.method with a timed wrapper on this instance only
+    def wrap(self, obj, method: str, name: str = None) -> None:
+        original = getattr(obj, method)
+        if getattr(original, "_timedBy", None) is self:
+            return
+        name = name or f"{type(obj).__name__}.{method}"
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.recordOperation(name, time.perf_counter() - start)
+        timed._timedBy = self
+        setattr(obj, method, timed)
+
+    # time the file operations of frontend's managers
+    def attach(self, frontend) -> None:
+        self.wrap(frontend.accountManager, "loadAccountsFromFile")
+        self.wrap(frontend.accountManager, "saveAccountsToFile")
+        self.wrap(frontend.transactionManager, "writeTransactionsToFile")
+        self.wrap(frontend.transactionManager, "closeTransactionFile")
+
+    def startProfilers(self) -> None:
+        if "cpu" in self.profilers and self._profile is None:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        if "memory" in self.profilers:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def toDict(self) -> dict:
+        with self._lock:
+            totals = {}
+            for counts in self.outcomes.values():
+                for outcome, count in counts.items():
+                    totals[outcome] = totals.get(outcome, 0) + count
+            stats = {
+                "pid": os.getpid(),
+                "uptime_s": round(time.time() - self.started, 3),
+                "outcomes": totals,
+                "commands": {command: dict(histogram.toDict(), outcomes=self.outcomes[command])
+                             for command, histogram in sorted(self.commands.items())},
+                "operations": {name: histogram.toDict() for name, histogram in sorted(self.operations.items())},
+            }
+        if self._profile is not None:
+            stats["cpu"] = self._cpuStats()
+        if "memory" in self.profilers:
+            stats["memory"] = self._memoryStats()
+        return stats
+
+    # the functions with the most cumulative time so far; the profile is
+    # read without disabling it, so the watcher thread can take it too
+    def _cpuStats(self) -> list:
+        self._profile.snapshot_stats()
+        entries = self._profile.stats
+        top = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+        return [{
+            "function": f"{filename}:{line}({function})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1e3, 3),
+            "cumtime_ms": round(cumtime * 1e3, 3),
+        } for (filename, line, function), (_, calls, tottime, cumtime, _) in top]
+
+    def _memoryStats(self) -> dict:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            return {}
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+        return {
+            "current_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "top": [{"line": str(stat.traceback), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+                    for stat in top],
+        }
+
+    # write the stats to the JSON file ("-" for stderr)
+    def dump(self) -> None:
+        text = json.dumps(self.toDict(), indent=2)
+        with self._dumpLock:
+            if self.filename == "-":
+                print(text, file=sys.stderr)
+                return
+            tmpName = self.filename + ".tmp"
+            with open(tmpName, "w") as file:
+                file.write(text + "\n")
+            os.replace(tmpName, self.filename)
+
+    # dump on SIGUSR1 where the platform has it (main thread only); the
+    # handler only wakes the watcher, it may run while the lock is held
+    def installSignalHandler(self) -> bool:
+        import signal
+        if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+            return False
+        if self._dumpWatcher is None:
+            self._dumpWatcher = threading.Thread(target=self._watchDumps, name="stats-dump", daemon=True)
+            self._dumpWatcher.start()
+        signal.signal(signal.SIGUSR1, self._requestDump)
+        return True
+
+    def _requestDump(self, signum, frame) -> None:
+        self._dumpRequest.set()
+
+    # write a dump for every SIGUSR1, whatever the front end is doing
+    def _watchDumps(self) -> None:
+        while True:
+            self._dumpRequest.wait()
+            self._dumpRequest.clear()
+            try:
+                self.dump()
+            except OSError as error:
+                print(f"Could not write stats to '{self.filename}': {error}", file=sys.stderr)
+
+
+# stats selected by the environment: ATM_STATS=<file> and ATM_PROFILE=cpu,memory
+def createStats(environ=os.environ):
+    filename = environ.get("ATM_STATS")
+    profile = environ.get("ATM_PROFILE", "")
+    if not filename and not profile:
+        return None
+    profilers = tuple(name.strip() for name in profile.split(",") if name.strip())
+    return CommandStats(filename or "atm_stats.json", profilers)
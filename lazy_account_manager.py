@@ -0,0 +1,207 @@
+"""
+lazy_account_manager.py - account manager that reads accounts on demand
+
+The current accounts file is memory-mapped instead of parsed up front.
+Records are sorted by their fixed-width account number, so getAccount
+bisects the mapped bytes for the matching line. Only accounts that are
+actually looked up become Account objects. The first lookup by holder
+name indexes the names of all records (name -> line offsets) in one pass.
+"""
+
+import mmap
+import os
+import threading
+
+from account import Account
+from account_manager import AccountManager, parseAccountLine
+
+END_MARKER = b"END_OF_FILE"
+
+
+class LazyAccountManager(AccountManager):
+    def __init__(self):
+        super().__init__()
+
+        # accounts removed during this run, hidden from file lookups
+        self.deleted = set()
+        self._file = None
+        self._map = None
+        self._end = 0
+        # lower case holder name (bytes) -> offsets of its records, built on first use
+        self._nameOffsets = None
+        # concurrent lookups of one account must share one Account object
+        self._loadLock = threading.Lock()
+
+    # map the accounts file, the records are parsed on demand
+    def loadAccountsFromFile(self, filename: str):
+        self.close()
+        try:
+            self._file = open(filename, "rb")
+        except FileNotFoundError:
+            self.message(f"Account file '{filename}' not found.")
+            return
+
+        if os.fstat(self._file.fileno()).st_size == 0:
+            return
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._end = self._dataEnd()
+
+        last = self._lastRecord()
+        if last is not None:
+            self.nextAccountNumber = max(self.nextAccountNumber, int(last.accountNumber) + 1)
+
+    # release the mapped file
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._end = 0
+        self._nameOffsets = None
+
+    # find account by number, reading it from the file on first use
+    def getAccount(self, accountNumber: str) -> Account:
+        account = self.accounts.get(accountNumber)
+        if account is not None or accountNumber in self.deleted:
+            return account
+
+        with self._loadLock:
+            account = self.accounts.get(accountNumber)
+            if account is not None or accountNumber in self.deleted:
+                return account
+            line = self._findLine(accountNumber.encode())
+            if line is None:
+                return None
+            account = parseAccountLine(line.decode(), self.money)
+            if account is None or account.accountNumber != accountNumber:
+                return None
+            self.addAccount(account)
+            return account
+
+    # find account by holder name
+    def findByHolderName(self, holderName: str):
+        for account in self._scanHolderName(holderName):
+            return account
+        return None
+
+    # find every account owned by holder name
+    def findAllByHolderName(self, holderName: str) -> list:
+        return list(self._scanHolderName(holderName))
+
+    def deleteAccount(self, accountNumber: str):
+        if self.getAccount(accountNumber) is not None:
+            super().deleteAccount(accountNumber)
+            self.deleted.add(accountNumber)
+
+    # save accounts to file, untouched records are copied as they are
+    def saveAccountsToFile(self, filename: str):
+        tmpName = filename + ".tmp"
+        with open(tmpName, "w") as file:
+            for line in self._iterLines():
+                acctNum = line.split(None, 1)[0].decode() if line.strip() else ""
+                if acctNum in self.deleted:
+                    continue
+                account = self.accounts.get(acctNum)
+                if account is None:
+                    file.write(line.decode() + "\n")
+                    continue
+                status = "A" if account.isActive() else "D"
+                file.write(f"{account.accountNumber} {account.holderName} {status} {self.money.format(account.balance)}\n")
+            file.write("END_OF_FILE\n")
+        os.replace(tmpName, filename)
+
+    # offset where the account records stop
+    def _dataEnd(self) -> int:
+        mm = self._map
+        pos = mm.rfind(b"\n" + END_MARKER)
+        if pos >= 0:
+            return pos + 1
+        if mm[:len(END_MARKER)] == END_MARKER:
+            return 0
+        return len(mm)
+
+    # the last valid record in the file, used for the next account number;
+    # blank and malformed lines at the end are skipped
+    def _lastRecord(self):
+        mm = self._map
+        end = self._end
+        while end > 0:
+            stop = end - 1 if mm[end - 1:end] == b"\n" else end
+            start = mm.rfind(b"\n", 0, stop) + 1
+            line = mm[start:stop].strip()
+            if line:
+                account = parseAccountLine(line.decode(errors="replace"), self.money)
+                if account is not None:
+                    return account
+            end = start
+        return None
+
+    # every record line before the end marker
+    def _iterLines(self):
+        for _, line in self._iterRecords():
+            yield line
+
+    # (offset, line) of every record line before the end marker
+    def _iterRecords(self):
+        if self._map is None:
+            return
+        mm = self._map
+        pos = 0
+        while pos < self._end:
+            nl = mm.find(b"\n", pos, self._end)
+            if nl < 0:
+                nl = self._end
+            yield pos, mm[pos:nl].rstrip(b"\r")
+            pos = nl + 1
+
+    # bisect the sorted records for the line starting with key
+    def _findLine(self, key: bytes):
+        if self._map is None:
+            return None
+        mm = self._map
+        lo, hi = 0, self._end
+        # lo and hi always sit on line starts
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b"\n", lo, mid)
+            start = lo if start < 0 else start + 1
+            stop = mm.find(b"\n", start, hi)
+            if stop < 0:
+                stop = hi
+            line = mm[start:stop]
+            parts = line.split(None, 1)
+            num = parts[0] if parts else b""
+            if num == key:
+                return line
+            if num < key:
+                lo = stop + 1
+            else:
+                hi = start
+        return None
+
+    # records owned by holder name, in file order
+    def _scanHolderName(self, holderName: str):
+        words = holderName.split()
+        if self._map is None or not words:
+            return
+        mm = self._map
+        for offset in self._holderOffsets().get(" ".join(words).encode().lower(), ()):
+            stop = mm.find(b"\n", offset, self._end)
+            acctNum = mm[offset:stop if stop >= 0 else self._end].split(None, 1)[0].decode()
+            account = self.getAccount(acctNum)
+            if account is not None and account.matchesOwner(holderName):
+                yield account
+
+    # the name -> offsets index, built from the mapped file in one pass
+    def _holderOffsets(self) -> dict:
+        with self._loadLock:
+            if self._nameOffsets is None:
+                index = {}
+                for offset, line in self._iterRecords():
+                    parts = line.split()
+                    if len(parts) >= 4:
+                        index.setdefault(b" ".join(parts[1:-2]).lower(), []).append(offset)
+                self._nameOffsets = index
+            return self._nameOffsets
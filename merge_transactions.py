@@ -0,0 +1,124 @@
+"""
+merge_transactions.py - combine per-terminal daily transaction files
+
+Every input file is parsed in a process pool: each worker validates one
+file with transaction_reader and writes its records (sorted by account
+number with --by-account, stable so each terminal's order is kept) to a
+temporary run file. The runs are then streamed into the merged file,
+one after another or with a heap-based k-way merge on the account
+number, through fixed-size buffered reads. Each input's 00 record is
+dropped and a single end of transactions record ends the merged file.
+--by-account separates the two records of a transfer, so its output is
+not for backend_main.py, which pairs them in terminal order.
+
+Usage:
+    python merge_transactions.py [--by-account] [-j N] <merged_file> <transactions_file>...
+"""
+
+import argparse
+import heapq
+import locale
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from money import CENTS_MONEY
+from transaction import END_RECORD
+from transaction_encoder import writeEncoded
+from transaction_reader import readTransactions
+
+# read buffer per run during the merge
+BUFFER_SIZE = 64 * 1024
+
+END_RECORD_BYTES = END_RECORD.encode()
+END_LINE_BYTES = (END_RECORD + os.linesep).encode()
+
+
+# validate filename and write its records to runFile, returns the malformed records
+def prepareRun(filename: str, runFile: str, byAccount: bool, strict: bool) -> list:
+    errors = None if strict else []
+    # integer cents, so every amount is written back exactly as it was read
+    transactions = list(readTransactions(filename, errors, CENTS_MONEY))
+    if byAccount:
+        transactions.sort(key=lambda transaction: int(transaction.accountNumber))
+    writeEncoded(transactions, runFile)
+    return errors or []
+
+
+# the record lines of a run file, without its end record
+def _runLines(runFile: str):
+    with open(runFile, "rb", buffering=BUFFER_SIZE) as file:
+        for line in file:
+            if line.rstrip(b"\r\n") == END_RECORD_BYTES:
+                return
+            yield line
+
+
+# account number of a record line, for the k-way merge
+def _accountKey(line: bytes, encoding: str = locale.getpreferredencoding(False)) -> int:
+    if len(line) >= 29 and line[24:29].isdigit() and line[:29].isascii():
+        return int(line[24:29])
+    return int(line.decode(encoding)[24:29])
+
+
+# merge inputs into output, malformed records go to errors as (filename, offset, record)
+def mergeTransactionFiles(inputs: list, output: str, byAccount: bool = False,
+                          workers: int = None, errors: list = None) -> None:
+    workers = min(workers or os.cpu_count() or 1, max(len(inputs), 1))
+    strict = errors is None
+    tmpFile = output + ".tmp"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        runs = [os.path.join(tmpdir, f"run{i}.atf") for i in range(len(inputs))]
+        jobs = [(filename, runFile, byAccount, strict) for filename, runFile in zip(inputs, runs)]
+        if workers == 1:
+            results = [prepareRun(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(prepareRun, *zip(*jobs)))
+        if not strict:
+            for filename, found in zip(inputs, results):
+                errors.extend((filename, offset, record) for offset, record in found)
+
+        with open(tmpFile, "wb") as out:
+            if byAccount:
+                out.writelines(heapq.merge(*[_runLines(runFile) for runFile in runs], key=_accountKey))
+            else:
+                for runFile in runs:
+                    with open(runFile, "rb") as file:
+                        size = os.path.getsize(runFile) - len(END_LINE_BYTES)
+                        shutil.copyfileobj(_Limited(file, size), out, BUFFER_SIZE)
+            out.write(END_LINE_BYTES)
+    os.replace(tmpFile, output)
+
+
+# the first size bytes of a file, for copyfileobj
+class _Limited:
+    def __init__(self, file, size: int):
+        self.file = file
+        self.left = size
+
+    def read(self, n: int) -> bytes:
+        data = self.file.read(min(n, self.left))
+        self.left -= len(data)
+        return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge per-terminal daily transaction files.")
+    parser.add_argument("output", help="merged transaction file to write")
+    parser.add_argument("inputs", nargs="+", help="per-terminal transaction files")
+    parser.add_argument("--by-account", action="store_true", help="order the records by account number")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    problems = []
+    try:
+        mergeTransactionFiles(args.inputs, args.output, args.by_account, args.workers, problems)
+    except FileNotFoundError as error:
+        print(f"Transaction file '{error.filename}' not found.")
+        sys.exit(1)
+    for filename, offset, record in problems:
+        print(f"Skipped malformed record in '{filename}' at byte {offset}: {record!r}")
+    print(f"Merged {len(args.inputs)} files into '{args.output}'.")
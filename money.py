@@ -0,0 +1,116 @@
+"""
+money.py - how amounts are parsed, stored and formatted
+
+FLOAT_MONEY keeps amounts as float dollars (the original behaviour).
+CENTS_MONEY keeps them as integer cents: amounts are parsed straight
+from their decimal text, balances and session totals are plain int
+arithmetic and formatting never goes through float. CENTS_MONEY
+rejects amounts finer than a cent (ValueError) instead of rounding them;
+parseCents on its own rounds them half-even to the cent.
+"""
+
+import math
+
+# plain decimal text, compiled by parseCents on first use (keeps re out of startup)
+DECIMAL = None
+
+
+# decimal text to integer cents, raises ValueError like float() does;
+# exact=True also raises for amounts finer than a cent instead of rounding
+def parseCents(text: str, exact: bool = False) -> int:
+    # fast path for "1234.56"
+    whole, dot, frac = text.partition(".")
+    if len(frac) == 2 and frac.isdigit() and whole.isdigit():
+        return int(whole) * 100 + int(frac)
+
+    global DECIMAL
+    if DECIMAL is None:
+        import re
+        DECIMAL = re.compile(r"([+-]?)(\d*)(?:\.(\d*))?")
+
+    text = text.strip()
+    match = DECIMAL.fullmatch(text)
+    if match is None or not (match.group(2) or match.group(3)):
+        value = float(text)
+        if not math.isfinite(value):
+            raise ValueError(f"could not convert to cents: {text!r}")
+        cents = round(value * 100)
+        if exact and cents / 100 != value:
+            raise ValueError(f"amount is finer than a cent: {text!r}")
+        return cents
+
+    sign, whole, frac = match.groups()
+    frac = frac or ""
+    cents = int(whole or "0") * 100 + int((frac + "00")[:2])
+    rest = frac[2:]
+    if rest:
+        digits = int(rest)
+        if exact and digits:
+            raise ValueError(f"amount is finer than a cent: {text!r}")
+        half = 5 * 10 ** (len(rest) - 1)
+        if digits > half or (digits == half and cents % 2):
+            cents += 1
+    return -cents if sign == "-" else cents
+
+
+# integer cents to "1234.56"
+def formatCents(cents: int) -> str:
+    cents = int(cents)
+    if cents < 0:
+        return "-" + formatCents(-cents)
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+# integer cents to the zero-padded transaction field, like f"{x:08.2f}"
+def formatCentsField(cents: int) -> str:
+    cents = int(cents)
+    if cents < 0:
+        return f"-{-cents // 100:04d}.{-cents % 100:02d}"
+    return f"{cents // 100:05d}.{cents % 100:02d}"
+
+
+class FloatMoney:
+    cents = False
+    zero = 0.0
+    arrayType = "d"
+
+    def parse(self, text: str) -> float:
+        return float(text)
+
+    def toCents(self, value: float) -> int:
+        return round(value * 100)
+
+    # a dollar constant (limits, bounds) in this representation
+    def fromDollars(self, dollars: float) -> float:
+        return dollars
+
+    def format(self, value: float) -> str:
+        return f"{value:.2f}"
+
+    def formatField(self, value: float) -> str:
+        return f"{value:08.2f}"
+
+
+class CentsMoney:
+    cents = True
+    zero = 0
+    arrayType = "q"
+
+    def parse(self, text: str) -> int:
+        return parseCents(text, exact=True)
+
+    def toCents(self, value: int) -> int:
+        return value
+
+    def fromDollars(self, dollars: float) -> int:
+        return round(dollars * 100)
+
+    def format(self, value: int) -> str:
+        return formatCents(value)
+
+    def formatField(self, value: int) -> str:
+        return formatCentsField(value)
+
+
+FLOAT_MONEY = FloatMoney()
+CENTS_MONEY = CentsMoney()
@@ -0,0 +1,162 @@
+"""
+name_index.py - prefix and fuzzy search over holder names
+
+NameIndex keeps the distinct lower-cased holder names in one sorted
+list, built with a single sort when the accounts are loaded:
+    prefix      bisect to the first name >= the prefix and read on while
+                names start with it
+    fuzzy       names within maxDistance edits (Levenshtein) of the query.
+                The sorted list is walked like a trie: consecutive names
+                share the edit-distance rows of their common prefix, and
+                once every entry of a row exceeds maxDistance, all names
+                starting with that prefix are skipped with one bisect
+
+Names added after the build go to a small unsorted list that every query
+also checks; it is merged into the sorted list once it holds more than
+MAX_PENDING names. Names are never removed, callers skip names that no
+longer own an account.
+"""
+
+import bisect
+
+MAX_PENDING = 1000
+
+# upper bound on fuzzy queries, the number of names a query visits grows
+# quickly with the distance
+MAX_DISTANCE = 2
+
+
+# the first string after every string that starts with prefix
+def _successor(prefix: str) -> str:
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+# length of the common prefix of a and b
+def _commonLength(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+# the edit-distance row after the depth-th name character ch; only the
+# band of query positions within maxDistance of depth is computed, cells
+# outside it can not lead to a match and are left at maxDistance + 1
+def _nextRow(row: list, query: str, ch: str, depth: int, maxDistance: int) -> list:
+    over = maxDistance + 1
+    new = [over] * len(row)
+    new[0] = min(depth + 1, over)
+    for j in range(max(1, depth + 1 - maxDistance), min(len(query), depth + 1 + maxDistance) + 1):
+        cost = row[j - 1] if query[j - 1] == ch else row[j - 1] + 1
+        left = new[j - 1] + 1
+        up = row[j] + 1
+        new[j] = min(left, up, cost, over)
+    return new
+
+
+# the row of the empty name prefix
+def _firstRow(query: str, maxDistance: int) -> list:
+    return [min(j, maxDistance + 1) for j in range(len(query) + 1)]
+
+
+# edit distance between query and name, or None if it exceeds maxDistance
+def boundedDistance(query: str, name: str, maxDistance: int):
+    if abs(len(query) - len(name)) > maxDistance:
+        return None
+    row = _firstRow(query, maxDistance)
+    for depth, ch in enumerate(name):
+        row = _nextRow(row, query, ch, depth, maxDistance)
+        if min(row) > maxDistance:
+            return None
+    return row[-1] if row[-1] <= maxDistance else None
+
+
+class NameIndex:
+    def __init__(self, names=()):
+        self.names = sorted(set(names))
+        self.pending = []
+        self._known = None  # set of pending names, built on first add
+
+    # index over names that are already sorted and distinct
+    @classmethod
+    def fromSorted(cls, names: list):
+        index = cls()
+        index.names = names
+        return index
+
+    def __len__(self):
+        return len(self.names) + len(self.pending)
+
+    # add a (lower-cased) name after the build
+    def add(self, name: str) -> None:
+        if self._known is None:
+            self._known = set()
+        if name in self._known:
+            return
+        i = bisect.bisect_left(self.names, name)
+        if i < len(self.names) and self.names[i] == name:
+            return
+        self._known.add(name)
+        self.pending.append(name)
+        if len(self.pending) > MAX_PENDING:
+            self.names = sorted(self.names + self.pending)
+            self.pending = []
+            self._known = set()
+
+    # names starting with prefix, in order
+    def prefix(self, prefix: str):
+        prefix = prefix.lower()
+        names = self.names
+        extra = sorted(name for name in self.pending if name.startswith(prefix))
+        i = bisect.bisect_left(names, prefix)
+        end = len(names) if not prefix else bisect.bisect_left(names, _successor(prefix), i)
+        k = 0
+        while i < end:
+            if k < len(extra) and extra[k] < names[i]:
+                yield extra[k]
+                k += 1
+            else:
+                yield names[i]
+                i += 1
+        yield from extra[k:]
+
+    # (distance, name) for every name within maxDistance edits of query, closest first
+    def fuzzy(self, query: str, maxDistance: int = 1) -> list:
+        if not 0 <= maxDistance <= MAX_DISTANCE:
+            raise ValueError(f"Edit distance must be between 0 and {MAX_DISTANCE}")
+        query = query.lower()
+        names = self.names
+        found = []
+        rows = [_firstRow(query, maxDistance)]  # rows[d]: after the first d characters of prev
+        prev = ""
+        i = 0
+        while i < len(names):
+            name = names[i]
+            depth = _commonLength(prev, name)
+            del rows[depth + 1:]
+            skipped = False
+            while depth < len(name):
+                row = _nextRow(rows[depth], query, name[depth], depth, maxDistance)
+                rows.append(row)
+                depth += 1
+                if min(row) > maxDistance:
+                    # no name starting with name[:depth] can match
+                    i = bisect.bisect_left(names, _successor(name[:depth]), i + 1)
+                    prev = name[:depth - 1]
+                    del rows[depth:]
+                    skipped = True
+                    break
+            if skipped:
+                continue
+            if rows[depth][-1] <= maxDistance:
+                found.append((rows[depth][-1], name))
+            prev = name
+            i += 1
+
+        for name in self.pending:
+            distance = boundedDistance(query, name, maxDistance)
+            if distance is not None:
+                found.append((distance, name))
+        found.sort()
+        return found
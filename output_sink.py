@@ -0,0 +1,98 @@
+"""
+output_sink.py - where the front end sends its messages
+
+TextSink      - the terminal messages, buffered and written in bulk
+EventSink     - one JSON record per command (code, account, amount in
+                cents, outcome, latency) instead of the terminal messages;
+                a rejected command reports what it attempted
+NullSink      - discards everything, for throughput runs
+"""
+
+import sys
+
+# flush text output once this many characters are buffered
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class NullSink:
+    # terminal message
+    def message(self, text: str) -> None:
+        pass
+
+    # a command finished, transaction is the one it recorded, or for a
+    # rejected command the one it attempted (None if it read nothing)
+    def commandDone(self, command: str, transaction, outcome: str, seconds: float) -> None:
+        pass
+
+    # write out anything buffered
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+# collects lines and writes them with one call per buffer
+class BufferedSink(NullSink):
+    def __init__(self, stream=None, bufferSize: int = DEFAULT_BUFFER_SIZE):
+        self.stream = stream if stream is not None else sys.stdout
+        self.bufferSize = bufferSize
+        self._buffer = []
+        self._size = 0
+
+    def _append(self, line: str) -> None:
+        self._buffer.append(line)
+        self._size += len(line) + 1
+        if self._size >= self.bufferSize:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._buffer.append("")
+            self.stream.write("\n".join(self._buffer))
+            self._buffer = []
+            self._size = 0
+        self.stream.flush()
+
+
+class TextSink(BufferedSink):
+    def message(self, text: str) -> None:
+        self._append(text)
+
+
+class EventSink(BufferedSink):
+    def __init__(self, stream=None, bufferSize: int = DEFAULT_BUFFER_SIZE):
+        super().__init__(stream, bufferSize)
+        # only event output needs json, keep it out of startup otherwise
+        import json
+        self._dumps = json.dumps
+
+    def commandDone(self, command: str, transaction, outcome: str, seconds: float) -> None:
+        amount = None
+        if transaction is not None and transaction.amount is not None:
+            amount = transaction.money.toCents(transaction.amount)
+        event = {
+            "command": command,
+            "code": transaction.code if transaction else None,
+            "account": transaction.accountNumber if transaction else None,
+            "amount_cents": amount,
+            "outcome": outcome,
+            "latency_us": round(seconds * 1e6, 1),
+        }
+        self._append(self._dumps(event, separators=(",", ":")))
+
+
+SINKS = {
+    "text": TextSink,
+    "events": EventSink,
+    "off": NullSink,
+}
+
+
+# build the sink named by mode (text, events or off)
+def createSink(mode: str = "text", stream=None):
+    if mode not in SINKS:
+        raise ValueError(f"Unknown output mode '{mode}'")
+    if mode == "off":
+        return NullSink()
+    return SINKS[mode](stream)
@@ -0,0 +1,152 @@
+# =========================================================
+# Script: run_tests.py
+# Purpose: Run every test in 'inputs/' inside a pool of worker
+#          processes and compare the results with 'expected/'.
+#
+# How it works:
+#   - Each case gets a fresh FrontendMain in a worker process.
+#   - Commands are fed from the input file, terminal output is
+#     captured in memory.
+#   - The daily transaction file (.atf) is compared with the
+#     expected .etf, the terminal log with the expected .out.
+#   - Prints PASS/FAIL, a unified diff for failures and the time
+#     taken by each case.
+#
+# How to run:
+#   python run_tests.py [-j WORKERS] [--save] [CASE ...]
+#   --save writes the actual .atf/.out files to 'outputs/'
+#
+# Required files/directories:
+#   - frontend_main.py         main Python program
+#   - inputs/*.txt             test input files
+#   - expected/*.etf, *.out    expected outputs
+#   - current_accounts.txt     current bank account file
+# =========================================================
+
+import argparse
+import contextlib
+import difflib
+import glob
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from frontend_main import FrontendMain
+from output_sink import TextSink
+
+INPUTS_DIR = os.path.join(ROOT, "inputs")
+EXPECTED_DIR = os.path.join(ROOT, "expected")
+OUTPUTS_DIR = os.path.join(ROOT, "outputs")
+ACCOUNTS_FILE = os.path.join(ROOT, "current_accounts.txt")
+
+
+# result of one test case
+class CaseResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.atf = ""
+        self.out = ""
+        self.failures = []  # unified diffs
+        self.seconds = 0.0
+
+    def passed(self) -> bool:
+        return not self.failures
+
+
+# read a file as text with universal newlines, None if it is missing
+def readText(path: str):
+    try:
+        with open(path, "r") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+# diff of expected against actual, empty if they match
+def compareText(label: str, expected: str, actual: str) -> str:
+    if expected is None or expected == actual:
+        return ""
+    return "".join(difflib.unified_diff(
+        expected.splitlines(True), actual.splitlines(True),
+        fromfile=f"expected/{label}", tofile=f"actual/{label}",
+    ))
+
+
+# run one test case in a fresh front end
+def runCase(name: str) -> CaseResult:
+    result = CaseResult(name)
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        transactionsFile = os.path.join(tmp, name + ".atf")
+        stdout = io.StringIO()
+
+        frontend = FrontendMain()
+        frontend.accountsFile = ACCOUNTS_FILE
+        frontend.transactionsFile = transactionsFile
+        frontend.output = TextSink(stdout)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+            try:
+                frontend.run(os.path.join(INPUTS_DIR, name + ".txt"))
+            except SystemExit:
+                pass
+
+        result.atf = readText(transactionsFile) or ""
+        result.out = stdout.getvalue()
+    result.seconds = time.perf_counter() - start
+
+    for label, actual in ((name + ".etf", result.atf), (name + ".out", result.out)):
+        diff = compareText(label, readText(os.path.join(EXPECTED_DIR, label)), actual)
+        if diff:
+            result.failures.append(diff)
+    return result
+
+
+# write the actual outputs of a case to outputs/
+def saveOutputs(result: CaseResult) -> None:
+    os.makedirs(OUTPUTS_DIR, exist_ok=True)
+    with open(os.path.join(OUTPUTS_DIR, result.name + ".atf"), "w") as file:
+        file.write(result.atf)
+    with open(os.path.join(OUTPUTS_DIR, result.name + ".out"), "w") as file:
+        file.write(result.out)
+
+
+# run the named cases (all of them by default), returns the failure count
+def runAll(names: list = None, workers: int = None, save: bool = False) -> int:
+    if not names:
+        names = sorted(os.path.basename(path)[:-4] for path in glob.glob(os.path.join(INPUTS_DIR, "*.txt")))
+
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunk = max(1, len(names) // (workers * 4))
+        results = list(pool.map(runCase, names, chunksize=chunk))
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for result in results:
+        status = "PASS" if result.passed() else "FAIL"
+        print(f"{result.name}: {status} ({result.seconds * 1000:.1f} ms)")
+        for diff in result.failures:
+            print(diff, end="" if diff.endswith("\n") else "\n")
+        if not result.passed():
+            failed += 1
+        if save:
+            saveOutputs(result)
+
+    print(f"{len(results) - failed}/{len(results)} passed in {elapsed:.2f}s using {workers} workers")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the ATM front end regression tests.")
+    parser.add_argument("cases", nargs="*", help="test names, e.g. WD01 (default: all)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--save", action="store_true", help="write actual outputs to outputs/")
+    args = parser.parse_args()
+    sys.exit(1 if runAll(args.cases, args.workers, args.save) else 0)
@@ -1,25 +1,37 @@
 """
 session.py - manage login state 
 """
+import itertools
 from enum import Enum
+from money import FLOAT_MONEY
+
+# session ids, unique within the process (sessions of every terminal)
+_sessionIds = itertools.count(1)
+
 class SessionMode(Enum):
     STANDARD = "standard"
     ADMIN = "admin"
 
 class Session:
-    def __init__(self):
+    def __init__(self, money=FLOAT_MONEY):
         self.loggedIn = False
         self.mode = None 
         self.currentUser = None
-        self.withdrawTotal = 0.0
-        self.transferTotal = 0.0
-        self.paybillTotal = 0.0
+        self.sessionId = None
+
+        # session limits, in the units of money
+        self.money = money
+        self.withdrawLimit = money.fromDollars(500.0)
+        self.transferLimit = money.fromDollars(1000.0)
+        self.paybillLimit = money.fromDollars(2000.0)
+        self.resetTotals()
 
     # start up a session
     def login(self, mode: SessionMode, userName: str = None) -> None:
         self.loggedIn = True
         self.mode = mode
         self.currentUser = userName
+        self.sessionId = next(_sessionIds)
         self.resetTotals()
 
     # end a session
@@ -27,6 +39,7 @@ class Session:
         self.loggedIn = False
         self.mode = None
         self.currentUser = None
+        self.sessionId = None
         self.resetTotals()
 
     # check if logged in
@@ -41,19 +54,19 @@ class Session:
     def canWithdraw(self, amount: float) -> bool:
         if self.mode == SessionMode.ADMIN:
             return True
-        return (self.withdrawTotal + amount) <= 500.0
+        return (self.withdrawTotal + amount) <= self.withdrawLimit
     
     # check if transfer is within limits
     def canTransfer(self, amount: float) -> bool:
         if self.mode == SessionMode.ADMIN:
             return True
-        return (self.transferTotal + amount) <= 1000.0
+        return (self.transferTotal + amount) <= self.transferLimit
     
     # check if paybill is within limits
     def canPayBill(self, amount: float) -> bool:
         if self.mode == SessionMode.ADMIN:
             return True
-        return (self.paybillTotal + amount) <= 2000.0
+        return (self.paybillTotal + amount) <= self.paybillLimit
     
     # record withdrawal amount
     def recordTransfer(self, amount: float) -> None:
@@ -68,6 +81,6 @@ class Session:
 
     # reset totals
     def resetTotals(self) -> None:
-        self.withdrawTotal = 0.0
-        self.transferTotal = 0.0
-        self.paybillTotal = 0.0
\ No newline at end of file
+        self.withdrawTotal = self.money.zero
+        self.transferTotal = self.money.zero
+        self.paybillTotal = self.money.zero
\ No newline at end of file
@@ -0,0 +1,450 @@
+"""
+sharded_account_manager.py - accounts split by number range across processes
+
+Every shard is a worker process owning one range of account numbers.
+When the accounts file is sorted (as the back end writes it) the ranges
+follow equal byte slices of the file and each shard parses only its own
+slice; otherwise every shard filters the whole file. Single-account
+operations are sent straight to the owning shard. A transfer between two
+shards uses two-phase commit: the debit is reserved on the source shard,
+the credit is prepared on the target shard and both are committed, or
+every prepared step is aborted. An account with a prepared step can not
+be deleted until it is committed or aborted.
+
+getAccount returns a ShardAccount, a small proxy whose changes are sent
+to the shard, so FrontendMain runs on top of this manager unchanged.
+"""
+
+import collections
+import itertools
+import locale
+import multiprocessing
+import os
+import threading
+
+from account import AccountPlan
+from account_manager import AccountManager, parseAccountLine
+from money import FLOAT_MONEY
+
+# results of shard operations
+OK = "ok"
+NOT_FOUND = "not_found"
+NOT_OWNER = "not_owner"
+INSUFFICIENT_FUNDS = "insufficient_funds"
+UNKNOWN_TRANSACTION = "unknown_transaction"
+PENDING = "pending"
+
+
+# the manager inside one shard process
+class Shard:
+    def __init__(self):
+        self.manager = AccountManager()
+        self.pending = {}  # transaction id -> (accountNumber, amount)
+        self.held = collections.Counter()  # account number -> prepared steps
+        self.maxAccountNumber = 0
+
+    # load the records in [low, high) from the bytes [start, end) of filename
+    # (the whole file when end is None), amounts in money (see money.py)
+    def load(self, filename: str, low: int, high: int, money=FLOAT_MONEY, start: int = 0, end: int = None):
+        self.manager.money = money
+        encoding = locale.getpreferredencoding(False)
+        try:
+            with open(filename, "rb") as file:
+                file.seek(start)
+                position = start
+                for raw in file:
+                    if end is not None and position >= end:
+                        break
+                    position += len(raw)
+                    line = raw.decode(encoding).strip()
+                    if not line or line.startswith("END_OF_FILE"):
+                        break
+                    account = parseAccountLine(line, money)
+                    if account is None:
+                        continue
+                    num = int(account.accountNumber)
+                    if num > self.maxAccountNumber:
+                        self.maxAccountNumber = num
+                    if low <= num < high:
+                        self.manager.addAccount(account)
+        except FileNotFoundError:
+            pass
+        return self.maxAccountNumber
+
+    # snapshot of an account for a ShardAccount
+    def get(self, accountNumber: str):
+        account = self.manager.getAccount(accountNumber)
+        if account is None:
+            return None
+        return (account.accountNumber, account.holderName, account.balance,
+                account.isActive(), account.plan.value)
+
+    def find(self, holderName: str):
+        return [self.get(account.accountNumber) for account in self.manager.findAllByHolderName(holderName)]
+
+    # take amount out of an account if the owner matches and funds allow
+    def withdraw(self, accountNumber: str, amount: float, owner: str = None):
+        account = self.manager.getAccount(accountNumber)
+        if account is None:
+            return NOT_FOUND
+        if owner is not None and account.holderName != owner:
+            return NOT_OWNER
+        if account.balance < amount:
+            return INSUFFICIENT_FUNDS
+        account.adjustBalance(-amount)
+        return OK
+
+    def adjust(self, accountNumber: str, amount: float):
+        account = self.manager.getAccount(accountNumber)
+        if account is None:
+            return NOT_FOUND
+        account.adjustBalance(amount)
+        return OK
+
+    # both accounts live on this shard
+    def transfer(self, fromNum: str, toNum: str, amount: float, owner: str = None):
+        if self.manager.getAccount(toNum) is None:
+            return NOT_FOUND
+        result = self.withdraw(fromNum, amount, owner)
+        if result == OK:
+            self.manager.getAccount(toNum).adjustBalance(amount)
+        return result
+
+    # phase one of a cross-shard transfer, the debit is held until commit
+    def prepareDebit(self, txid: int, accountNumber: str, amount: float, owner: str = None):
+        result = self.withdraw(accountNumber, amount, owner)
+        if result == OK:
+            self.pending[txid] = (accountNumber, -amount)
+            self.held[accountNumber] += 1
+        return result
+
+    def prepareCredit(self, txid: int, accountNumber: str, amount: float):
+        if self.manager.getAccount(accountNumber) is None:
+            return NOT_FOUND
+        self.pending[txid] = (accountNumber, amount)
+        self.held[accountNumber] += 1
+        return OK
+
+    # phase two: the debit is already applied, the credit is applied now
+    def commit(self, txid: int):
+        if txid not in self.pending:
+            return UNKNOWN_TRANSACTION
+        accountNumber, amount = self._release(txid)
+        if amount > 0:
+            # held since prepareCredit, so the account is still there
+            self.manager.getAccount(accountNumber).adjustBalance(amount)
+        return OK
+
+    def abort(self, txid: int):
+        if txid not in self.pending:
+            return UNKNOWN_TRANSACTION
+        accountNumber, amount = self._release(txid)
+        if amount < 0:
+            self.manager.getAccount(accountNumber).adjustBalance(-amount)
+        return OK
+
+    def _release(self, txid: int) -> tuple:
+        accountNumber, amount = self.pending.pop(txid)
+        self.held[accountNumber] -= 1
+        if not self.held[accountNumber]:
+            del self.held[accountNumber]
+        return accountNumber, amount
+
+    def disable(self, accountNumber: str):
+        if self.manager.getAccount(accountNumber) is None:
+            return NOT_FOUND
+        self.manager.disableAccount(accountNumber)
+        return OK
+
+    def changePlan(self, accountNumber: str, planValue: str):
+        if self.manager.getAccount(accountNumber) is None:
+            return NOT_FOUND
+        self.manager.changeAccountPlan(accountNumber, AccountPlan(planValue))
+        return OK
+
+    def delete(self, accountNumber: str):
+        if self.manager.getAccount(accountNumber) is None:
+            return NOT_FOUND
+        if accountNumber in self.held:
+            return PENDING
+        self.manager.deleteAccount(accountNumber)
+        return OK
+
+    # account records in the saveAccountsToFile format
+    def dump(self):
+        lines = []
+        for account in self.manager.accounts.values():
+            status = "A" if account.isActive() else "D"
+            balance = self.manager.money.format(account.balance)
+            lines.append(f"{account.accountNumber} {account.holderName} {status} {balance}")
+        return lines
+
+    # run a list of (operation, args) in order
+    def batch(self, operations: list):
+        return [getattr(self, op)(*args) for op, args in operations]
+
+
+# worker process loop: receive (operation, args), send back the result
+def runShard(conn) -> None:
+    shard = Shard()
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        op, args = message
+        try:
+            conn.send(getattr(shard, op)(*args))
+        except Exception as error:
+            conn.send(error)
+    conn.close()
+
+
+# connection to one shard process
+class ShardClient:
+    def __init__(self, low: int, high: int):
+        self.low = low
+        self.high = high
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=runShard, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.lock = threading.Lock()
+
+    def send(self, op: str, *args) -> None:
+        self.conn.send((op, args))
+
+    def receive(self):
+        result = self.conn.recv()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def call(self, op: str, *args):
+        with self.lock:
+            self.send(op, *args)
+            return self.receive()
+
+    def stop(self) -> None:
+        with self.lock:
+            self.conn.send(None)
+        self.process.join()
+
+
+# proxy for an account owned by a shard
+class ShardAccount:
+    def __init__(self, manager, snapshot):
+        self.manager = manager
+        self.accountNumber, self.holderName, self.balance, active, plan = snapshot
+        self.active = active
+        self.plan = AccountPlan(plan)
+
+    def isActive(self) -> bool:
+        return self.active
+
+    def matchesOwner(self, name: str) -> bool:
+        return self.holderName.lower() == name.lower()
+
+    # debits go through the shard's checked withdraw, a failed one raises ValueError
+    def adjustBalance(self, amount: float) -> None:
+        if amount < 0:
+            result = self.manager.withdraw(self.accountNumber, -amount)
+            if result != OK:
+                raise ValueError(f"Withdrawal failed: {result}")
+        else:
+            self.manager.shardFor(self.accountNumber).call("adjust", self.accountNumber, amount)
+        self.balance += amount
+
+    def disable(self) -> None:
+        self.manager.disableAccount(self.accountNumber)
+        self.active = False
+
+    def changePlan(self, newPlan: AccountPlan) -> None:
+        self.manager.changeAccountPlan(self.accountNumber, newPlan)
+        self.plan = newPlan
+
+
+class ShardedAccountManager(AccountManager):
+    def __init__(self, shards: int = 4):
+        super().__init__()
+        self.shardCount = shards
+        self.shards = []
+        self._txids = itertools.count(1)
+
+    # start the shards, each loads its own range of the file
+    def loadAccountsFromFile(self, filename: str):
+        self.close()
+        try:
+            maxNum, slices = self._slices(filename)
+        except FileNotFoundError:
+            self.message(f"Account file '{filename}' not found.")
+            maxNum, slices = 0, None
+
+        if slices is not None:
+            # sorted file: shard i owns the numbers starting in byte slice i
+            bounds = [0] + [num for num, _ in slices[1:-1]] + [float("inf")]
+            offsets = [offset for _, offset in slices]
+        else:
+            step = -(-(maxNum + 1) // self.shardCount)
+            bounds = [i * step for i in range(self.shardCount)] + [float("inf")]
+        self.shards = [ShardClient(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+        for i, shard in enumerate(self.shards):
+            if slices is not None:
+                shard.send("load", filename, shard.low, shard.high, self.money, offsets[i], offsets[i + 1])
+            else:
+                shard.send("load", filename, shard.low, shard.high, self.money)
+        for shard in self.shards:
+            shardMax = shard.receive()
+            if shardMax >= self.nextAccountNumber:
+                self.nextAccountNumber = shardMax + 1
+
+    # stop the shard processes
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.stop()
+        self.shards = []
+
+    # quick pass over the account numbers only: the largest one and, for a
+    # sorted file, (first account number, byte offset) of every slice plus
+    # (None, end of the records); slices is None for an unsorted file
+    def _slices(self, filename: str) -> tuple:
+        target = os.path.getsize(filename) / self.shardCount
+        slices = []
+        maxNum = 0
+        last = -1
+        offset = 0
+        with open(filename, "rb") as file:
+            for line in file:
+                parts = line.split(None, 1)
+                if not parts or parts[0].startswith(b"END_OF_FILE"):
+                    break
+                if parts[0].isdigit():
+                    num = int(parts[0])
+                    if num <= last:
+                        slices = None
+                    elif slices is not None and offset >= len(slices) * target:
+                        slices.append((num, offset))
+                    last = num
+                    maxNum = max(maxNum, num)
+                offset += len(line)
+        if not slices:
+            return maxNum, None
+        slices.append((None, offset))
+        return maxNum, slices
+
+    # the shard owning accountNumber
+    def shardFor(self, accountNumber: str) -> ShardClient:
+        num = int(accountNumber) if accountNumber.isdigit() else 0
+        for shard in self.shards:
+            if num < shard.high:
+                return shard
+        return self.shards[-1]
+
+    def getAccount(self, accountNumber: str):
+        if not self.shards:
+            return None
+        snapshot = self.shardFor(accountNumber).call("get", accountNumber)
+        return ShardAccount(self, snapshot) if snapshot else None
+
+    def findAllByHolderName(self, holderName: str) -> list:
+        for shard in self.shards:
+            shard.lock.acquire()
+            shard.send("find", holderName)
+        found = []
+        for shard in self.shards:
+            try:
+                found += [ShardAccount(self, snapshot) for snapshot in shard.receive()]
+            finally:
+                shard.lock.release()
+        return found
+
+    def findByHolderName(self, holderName: str):
+        found = self.findAllByHolderName(holderName)
+        return found[0] if found else None
+
+    def deleteAccount(self, accountNumber: str):
+        if self.shards:
+            if self.shardFor(accountNumber).call("delete", accountNumber) == PENDING:
+                raise ValueError("Account has a transfer in progress")
+
+    def disableAccount(self, accountNumber: str):
+        if self.shards:
+            self.shardFor(accountNumber).call("disable", accountNumber)
+
+    def changeAccountPlan(self, accountNumber: str, newPlan: AccountPlan) -> None:
+        if self.shards:
+            self.shardFor(accountNumber).call("changePlan", accountNumber, newPlan.value)
+
+    # checked withdrawal on the owning shard
+    def withdraw(self, accountNumber: str, amount: float, owner: str = None) -> str:
+        return self.shardFor(accountNumber).call("withdraw", accountNumber, amount, owner)
+
+    # checked transfer, two-phase commit when the accounts are on different shards
+    def transfer(self, fromNum: str, toNum: str, amount: float, owner: str = None) -> str:
+        source = self.shardFor(fromNum)
+        target = self.shardFor(toNum)
+        if source is target:
+            return source.call("transfer", fromNum, toNum, amount, owner)
+
+        txid = next(self._txids)
+        result = source.call("prepareDebit", txid, fromNum, amount, owner)
+        if result != OK:
+            return result
+        result = target.call("prepareCredit", txid, toNum, amount)
+        if result != OK:
+            source.call("abort", txid)
+            return result
+        result = target.call("commit", txid)
+        if result != OK:
+            source.call("abort", txid)
+            return result
+        source.call("commit", txid)
+        return OK
+
+    # move funds between two accounts returned by getAccount
+    def transferFunds(self, fromAccount, toAccount, amount: float) -> None:
+        result = self.transfer(fromAccount.accountNumber, toAccount.accountNumber, amount)
+        if result != OK:
+            raise ValueError(f"Transfer failed: {result}")
+        fromAccount.balance -= amount
+        toAccount.balance += amount
+
+    # run single-account operations, e.g. ("withdraw", (num, amount, owner)),
+    # on every shard at once; cross-shard transfers run after them
+    def applyBatch(self, operations: list) -> list:
+        results = [None] * len(operations)
+        perShard = {}
+        crossShard = []
+        for i, (op, args) in enumerate(operations):
+            if op == "transfer" and self.shardFor(args[0]) is not self.shardFor(args[1]):
+                crossShard.append(i)
+                continue
+            shard = self.shardFor(args[0])
+            perShard.setdefault(shard, ([], []))
+            perShard[shard][0].append(i)
+            perShard[shard][1].append((op, args))
+
+        # locks are always taken in shard order
+        batches = sorted(perShard.items(), key=lambda item: item[0].low)
+        for shard, (_, ops) in batches:
+            shard.lock.acquire()
+            shard.send("batch", ops)
+        for shard, (indexes, _) in batches:
+            try:
+                for i, result in zip(indexes, shard.receive()):
+                    results[i] = result
+            finally:
+                shard.lock.release()
+
+        for i in crossShard:
+            results[i] = self.transfer(*operations[i][1])
+        return results
+
+    # save accounts to file, in shard (account number range) order
+    def saveAccountsToFile(self, filename: str):
+        lines = []
+        for shard in self.shards:
+            lines += shard.call("dump")
+        with open(filename, "w") as file:
+            for line in lines:
+                file.write(line + "\n")
+            file.write("END_OF_FILE\n")
@@ -1,6 +1,13 @@
 """
 transaction.py - Represents a single transaction record
 """
+from money import FLOAT_MONEY
+
+# end of transactions record
+END_RECORD = "00                      00000 00000.00  "
+
+# MM of the credit record that follows every transfer (02) record
+TRANSFER_CREDIT = "CR"
 
 # create transaction record
 class Transaction:
@@ -10,6 +17,8 @@ class Transaction:
         self.accountNumber = accountNumber # account number
         self.amount = amount # transaction amount
         self.extra = extra # additional info
+        self.money = FLOAT_MONEY # float dollars or integer cents
+        self.session = None # id of the session that recorded it, if known
 
     # format transaction for writing to file
     def formatTransaction(self) -> str:
@@ -18,7 +27,7 @@ class Transaction:
         holder = f"{self.holderName[:20]:<20}"
 
         acctNum = str(self.accountNumber).zfill(5)
-        amount = f"{abs(self.amount):08.2f}" 
+        amount = self.money.formatField(abs(self.amount))
         extra = f"{self.extra[:2]:<2}" 
         return f"{code} {holder} {acctNum} {amount}{extra}"
     
@@ -26,4 +35,4 @@ class Transaction:
         return self.formatTransaction()
     # debugging
     def __str__(self):
-        return f"{self.code} | {self.holderName} | {self.accountNumber} | {self.amount:.2f} | {self.extra}"
\ No newline at end of file
+        return f"{self.code} | {self.holderName} | {self.accountNumber} | {self.money.format(self.amount)} | {self.extra}"
\ No newline at end of file
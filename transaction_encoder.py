@@ -0,0 +1,102 @@
+"""
+transaction_encoder.py - render many transactions into one buffer
+
+encodeTransactions renders every record (CC_AAAAAAAAAAAAAAAAAAAA_NNNNN_PPPPPPPP_MM)
+with a single format string, joins them with the end of transactions
+record and encodes the lot once, so a daily file is written with a
+single write. The bytes are identical to writing formatTransaction()
+line by line in text mode.
+
+The compact binary sidecar stores one 36-byte record per transaction
+for internal pipelines:
+    code (uint8), account number (uint32), amount in cents (int64),
+    extra (2 bytes), holder name (20 bytes, space padded)
+"""
+
+import locale
+import os
+import struct
+
+from transaction import Transaction, END_RECORD
+
+NEWLINE = os.linesep
+END_LINE = END_RECORD + "\n"
+
+# "00" .. "99" and "0" .. "99", keyed by the code as given
+CODES = {f"{i:02}": f"{i:02}" for i in range(100)}
+CODES.update({str(i): f"{i:02}" for i in range(100)})
+
+SIDECAR_MAGIC = b"ATXB"
+SIDECAR_VERSION = 1
+SIDECAR_HEADER = struct.Struct("<4sHQ")
+SIDECAR_RECORD = struct.Struct("<BIq2s20s")
+
+
+# the daily file contents for transactions, ending with the end record
+def encodeTransactions(transactions: list) -> bytearray:
+    codes = CODES
+    lines = []
+    append = lines.append
+    for transaction in transactions:
+        code = codes.get(transaction.code)
+        if code is None:
+            code = f"{int(transaction.code):02}"
+        acctNum = transaction.accountNumber
+        if type(acctNum) is not str or len(acctNum) != 5:
+            acctNum = str(acctNum).zfill(5)
+        money = transaction.money
+        if money.cents:
+            amount = money.formatField(abs(transaction.amount))
+        else:
+            amount = f"{abs(transaction.amount):08.2f}"
+        append(f"{code} {transaction.holderName[:20]:<20} {acctNum} {amount}{transaction.extra[:2]:<2}\n")
+    append(END_LINE)
+
+    text = "".join(lines)
+    if NEWLINE != "\n":
+        text = text.replace("\n", NEWLINE)
+    if text.isascii():
+        return bytearray(text, "ascii")
+    return bytearray(text, locale.getpreferredencoding(False))
+
+
+# write the daily transaction file with a single write call
+def writeEncoded(transactions: list, filename: str) -> None:
+    buffer = encodeTransactions(transactions)
+    with open(filename, "wb") as file:
+        file.write(buffer)
+
+
+# compact binary copy of transactions
+def writeSidecar(transactions: list, filename: str) -> None:
+    buffer = bytearray(SIDECAR_HEADER.size + SIDECAR_RECORD.size * len(transactions))
+    SIDECAR_HEADER.pack_into(buffer, 0, SIDECAR_MAGIC, SIDECAR_VERSION, len(transactions))
+    offset = SIDECAR_HEADER.size
+    for transaction in transactions:
+        if transaction.money.cents:
+            cents = int(transaction.amount)
+        else:
+            cents = round(transaction.amount * 100)
+        SIDECAR_RECORD.pack_into(
+            buffer, offset, int(transaction.code), int(transaction.accountNumber or 0), cents,
+            transaction.extra[:2].encode().ljust(2), transaction.holderName[:20].encode().ljust(20))
+        offset += SIDECAR_RECORD.size
+    with open(filename, "wb") as file:
+        file.write(buffer)
+
+
+# transactions from a sidecar file, amounts in float dollars
+def readSidecar(filename: str) -> list:
+    with open(filename, "rb") as file:
+        data = file.read()
+    magic, version, count = SIDECAR_HEADER.unpack_from(data, 0)
+    if magic != SIDECAR_MAGIC or version != SIDECAR_VERSION:
+        raise ValueError(f"'{filename}' is not a transaction sidecar file")
+
+    transactions = []
+    for code, acctNum, cents, extra, name in SIDECAR_RECORD.iter_unpack(
+            data[SIDECAR_HEADER.size:SIDECAR_HEADER.size + SIDECAR_RECORD.size * count]):
+        transactions.append(Transaction(
+            f"{code:02}", name.decode(errors="ignore").rstrip(), f"{acctNum:05d}", cents / 100,
+            extra.decode(errors="ignore").rstrip()))
+    return transactions
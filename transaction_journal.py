@@ -0,0 +1,230 @@
+"""
+transaction_journal.py - append-only daily transaction file
+
+Each transaction is appended to the daily file once, by a background
+writer thread that commits every queued record with a single write.
+Nothing is kept in memory: getAllTransactions reads the file back.
+Logout only waits for the queued records, the end of transactions
+record is written on exit/quit, at the end of the input or when an
+unfinished journal is recovered. If the writer thread fails, the error
+is raised again by the next call that adds or waits for records.
+
+fsync policies:
+    record    - every transaction is on disk before addTransaction returns
+    session   - records are synced when a session ends (logout)
+    interval  - records are synced at most every `interval` seconds
+
+Usage (recover a journal left behind by a crash):
+    python transaction_journal.py <transactions_file>
+"""
+
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+
+from money import FLOAT_MONEY
+from transaction import Transaction
+from transaction_manager import TransactionManager, END_RECORD
+
+FSYNC_POLICIES = ("record", "session", "interval")
+
+# bytes read per step when looking for the last complete record
+TAIL_CHUNK = 4096
+
+
+# True if the file ends with the end of transactions record
+def isJournalFinished(filename: str) -> bool:
+    tail = (END_RECORD + "\n").encode()
+    try:
+        with open(filename, "rb") as file:
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+            if size < len(tail):
+                return False
+            file.seek(size - len(tail))
+            return file.read() == tail
+    except FileNotFoundError:
+        return False
+
+
+# cut a partially written last record, returns the new file size; only
+# the tail after the last newline is read, seeking back from the end
+def _truncatePartialRecord(filename: str) -> int:
+    with open(filename, "rb+") as file:
+        size = end = file.seek(0, os.SEEK_END)
+        keep = 0
+        while end > 0:
+            start = max(0, end - TAIL_CHUNK)
+            file.seek(start)
+            newline = file.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            end = start
+        if keep != size:
+            file.truncate(keep)
+        return keep
+
+
+# finish a journal left behind by a crash, returns True if it was changed
+def recoverJournal(filename: str) -> bool:
+    if not os.path.exists(filename) or isJournalFinished(filename):
+        return False
+    _truncatePartialRecord(filename)
+    with open(filename, "a") as file:
+        file.write(END_RECORD + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+    return True
+
+
+class JournaledTransactionManager(TransactionManager):
+    def __init__(self, filename: str, fsyncPolicy: str = "session", interval: float = 1.0):
+        super().__init__()
+        if fsyncPolicy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsyncPolicy}'")
+
+        self.transactionFile = filename
+        self.fsyncPolicy = fsyncPolicy
+        self.interval = interval
+        # how getAllTransactions parses amounts, from the transactions added
+        self._money = FLOAT_MONEY
+
+        # an unfinished journal is resumed, a finished one is started over
+        if os.path.exists(filename) and not isJournalFinished(filename):
+            _truncatePartialRecord(filename)
+            self._file = open(filename, "ab")
+        else:
+            self._file = open(filename, "wb")
+
+        self._queue = queue.Queue()
+        self._lock = threading.Condition()
+        self._queued = 0  # records handed to the writer
+        self._written = 0  # records written to the file
+        self._synced = 0  # records known to be on disk
+        self._lastSync = time.monotonic()
+        self._closed = False
+        self._error = None  # exception that stopped the writer
+
+        self._writer = threading.Thread(target=self._writeLoop, name="transaction-journal", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    # hand a new transaction to the writer
+    def addTransaction(self, transaction: Transaction):
+        if self._closed:
+            raise ValueError("Transaction journal is closed")
+        if self._error is not None:
+            raise self._error
+        self._money = transaction.money
+        record = (transaction.formatForFile() + "\n").encode()
+        with self._lock:
+            self._queued += 1
+            seq = self._queued
+            self._queue.put(record)
+        if self.fsyncPolicy == "record":
+            self._waitFor(seq, durable=True)
+
+    # the transactions in the daily file, read back once everything queued is written
+    def getAllTransactions(self):
+        from transaction_reader import readTransactions
+        self.flush()
+        return readTransactions(self.transactionFile, money=self._money)
+
+    # a session ended, make its records durable
+    def writeTransactionsToFile(self, filename: str):
+        self.flush(durable=self.fsyncPolicy != "interval")
+
+    # write the end of transactions record and stop the writer
+    def closeTransactionFile(self, filename: str):
+        if self._closed:
+            return
+        # the writer handles everything queued before the stop marker
+        self._closed = True
+        atexit.unregister(self.flush)
+        self._queue.put(None)
+        self._writer.join()
+        if self._error is not None:
+            self._file.close()
+            raise self._error
+        self._file.write((END_RECORD + "\n").encode())
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    # wait for everything queued so far to be written (and synced)
+    def flush(self, durable: bool = False) -> None:
+        if self._closed:
+            return
+        with self._lock:
+            seq = self._queued
+        self._waitFor(seq, durable)
+
+    def _waitFor(self, seq: int, durable: bool) -> None:
+        with self._lock:
+            while self._written < seq and self._error is None:
+                self._lock.wait()
+            if self._error is not None:
+                raise self._error
+            if durable and self._synced < seq:
+                self._sync()
+
+    # caller holds self._lock
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._synced = self._written
+        self._lastSync = time.monotonic()
+        self._lock.notify_all()
+
+    # run the writer, keeping its error for the callers waiting on it
+    def _writeLoop(self) -> None:
+        try:
+            self._writeRecords()
+        except BaseException as error:
+            with self._lock:
+                self._error = error
+                self._lock.notify_all()
+
+    # group commit: write every record waiting in the queue at once
+    def _writeRecords(self) -> None:
+        timeout = self.interval if self.fsyncPolicy == "interval" else None
+        while True:
+            try:
+                first = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                first = b""
+            batch = [first]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            records = [record for record in batch if record]
+
+            with self._lock:
+                if records:
+                    self._file.write(b"".join(records))
+                    self._file.flush()
+                    self._written += len(records)
+                if self.fsyncPolicy == "record" and self._synced < self._written:
+                    self._sync()
+                elif (self.fsyncPolicy == "interval" and self._synced < self._written
+                        and time.monotonic() - self._lastSync >= self.interval):
+                    self._sync()
+                self._lock.notify_all()
+            if stop:
+                return
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python transaction_journal.py <transactions_file>")
+        sys.exit(1)
+    if recoverJournal(sys.argv[1]):
+        print(f"Recovered transaction journal '{sys.argv[1]}'.")
+    else:
+        print(f"Transaction journal '{sys.argv[1]}' needs no recovery.")
@@ -1,7 +1,8 @@
 """
 transaction_manager.py - stores transactions during a session
 """
-from transaction import Transaction
+from transaction import Transaction, END_RECORD
+
 class TransactionManager:
     def __init__(self):
         # all transactions in the system
@@ -12,13 +13,19 @@ class TransactionManager:
     def addTransaction(self, transaction: Transaction):
         self.transactions.append(transaction)
 
+    # add transactions that must stay next to each other in the file
+    def addTransactions(self, transactions: list):
+        for transaction in transactions:
+            self.addTransaction(transaction)
+
+    # write all transactions and the end of transactions record in one write
     def writeTransactionsToFile(self, filename: str):
-        with open(filename, "w") as file:
-            for transaction in self.transactions:
-                file.write(transaction.formatForFile() + "\n")
+        from transaction_encoder import writeEncoded
+        writeEncoded(self.transactions, filename)
 
-            # write end of transactions record
-            file.write("00                      00000 00000.00  \n")
+    # write the final transaction file when the front end exits
+    def closeTransactionFile(self, filename: str):
+        self.writeTransactionsToFile(filename)
 
     # retrieve all transactions
     def getAllTransactions(self):
@@ -0,0 +1,193 @@
+"""
+transaction_reader.py - read daily transaction (.atf) files back
+
+readTransactions yields Transaction objects one at a time from a
+memory-mapped file, cutting every record at the fixed offsets of
+formatTransaction (CC_AAAAAAAAAAAAAAAAAAAA_NNNNN_PPPPPPPP_MM) through
+memoryview slices. Reading stops at the 00 end of transactions record.
+
+parseTransactions does the same for records already in memory (any
+bytes-like buffer).
+
+readColumns reads a whole file in one pass into columns: arrays of
+codes, account numbers and amounts in cents, plus lists of holder
+names and extras. withoutTransferCredits drops the credit record that
+follows every transfer, for totals that count a transfer once.
+
+Malformed records are appended to `errors` as (byte offset, record)
+and skipped; without an errors list the first one raises ValueError.
+
+Usage (check a file):
+    python transaction_reader.py <transactions_file>
+"""
+
+import itertools
+import locale
+import mmap
+import sys
+from array import array
+
+from money import FLOAT_MONEY
+from transaction import TRANSFER_CREDIT, Transaction
+
+RECORD_LENGTH = 40
+END_CODE = "00"
+
+# field slices inside a record
+CODE = slice(0, 2)
+NAME = slice(3, 23)
+ACCOUNT = slice(24, 29)
+AMOUNT = slice(30, 38)
+EXTRA = slice(38, 40)
+SEPARATORS = (2, 23, 29)
+
+
+# columns of a whole transaction file
+class TransactionColumns:
+    def __init__(self):
+        self.codes = array("B")
+        self.accountNumbers = array("L")
+        self.amounts = array("q")  # integer cents
+        self.holderNames = []
+        self.extras = []
+        self.finished = False  # ended with the end of transactions record
+
+    def __len__(self):
+        return len(self.codes)
+
+
+# "PPPPP.PP", the amount field as formatField writes it
+def _validAmount(field: str) -> bool:
+    return field[5:6] == "." and field[:5].isdigit() and field[6:].isdigit() and field.isascii()
+
+
+# (offset, code, name, account number, amount text, extra) for every record
+# before the end record, then None if the end record was reached
+def _records(filename: str, errors: list = None):
+    with open(filename, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return
+        try:
+            yield from _bufferRecords(mapped, errors)
+        finally:
+            mapped.close()
+
+
+# _records over a bytes-like buffer (bytes, bytearray or mmap)
+def _bufferRecords(data, errors: list = None):
+    encoding = locale.getpreferredencoding(False)
+    with memoryview(data) as view:
+        size = len(data)
+        offset = 0
+        while offset < size:
+            newline = data.find(b"\n", offset)
+            end = size if newline < 0 else newline
+            stop = end
+            if stop > offset and data[stop - 1] == 0x0D:
+                stop -= 1
+
+            record = view[offset:stop]
+            if len(record) == RECORD_LENGTH:
+                # one byte per character, slice the raw bytes
+                fields = (str(record[CODE], "ascii", "replace"), str(record[NAME], encoding, "replace"),
+                          str(record[ACCOUNT], "ascii", "replace"),
+                          str(record[AMOUNT], "ascii", "replace"), str(record[EXTRA], encoding, "replace"))
+                separators = bytes(record[i] for i in SEPARATORS)
+            else:
+                # multi-byte characters in the name, slice the decoded text
+                text = str(record, encoding, "replace")
+                fields = (text[CODE], text[NAME], text[ACCOUNT], text[AMOUNT], text[EXTRA])
+                separators = b""
+                if len(text) == RECORD_LENGTH:
+                    separators = "".join(text[i] for i in SEPARATORS).encode()
+            record.release()
+
+            code, name, acctNum, amount, extra = fields
+            if (separators != b"   " or not code.isdigit() or not acctNum.isdigit()
+                    or not _validAmount(amount)):
+                _malformed(errors, offset, bytes(data[offset:stop]))
+            elif code == END_CODE:
+                yield None
+                return
+            else:
+                yield offset, code, name.rstrip(), acctNum, amount, extra.rstrip()
+            offset = end + 1
+
+
+def _malformed(errors: list, offset: int, record: bytes) -> None:
+    if errors is None:
+        raise ValueError(f"Malformed transaction record at byte {offset}: {record!r}")
+    errors.append((offset, record))
+
+
+# Transaction objects for records, amounts in the money representation
+def _transactions(records, money):
+    parse = money.parse
+    for fields in records:
+        if fields is None:
+            return
+        _, code, name, acctNum, amount, extra = fields
+        transaction = Transaction(code, name, acctNum, parse(amount), extra)
+        transaction.money = money
+        yield transaction
+
+
+# stream the transactions of filename, amounts in the money representation
+def readTransactions(filename: str, errors: list = None, money=FLOAT_MONEY):
+    return _transactions(_records(filename, errors), money)
+
+
+# stream the transactions of records held in a bytes-like buffer
+def parseTransactions(data, errors: list = None, money=FLOAT_MONEY):
+    return _transactions(_bufferRecords(data, errors), money)
+
+
+# the whole file as TransactionColumns, in one pass
+def readColumns(filename: str, errors: list = None) -> TransactionColumns:
+    columns = TransactionColumns()
+    codes = columns.codes
+    numbers = columns.accountNumbers
+    amounts = columns.amounts
+    names = columns.holderNames
+    extras = columns.extras
+    for fields in _records(filename, errors):
+        if fields is None:
+            columns.finished = True
+            break
+        _, code, name, acctNum, amount, extra = fields
+        codes.append(int(code))
+        numbers.append(int(acctNum))
+        amounts.append(int(amount[:5]) * 100 + int(amount[6:]))
+        names.append(name)
+        extras.append(extra)
+    return columns
+
+
+# columns without the credit records of transfers (code 02, MM = CR)
+def withoutTransferCredits(columns: TransactionColumns) -> TransactionColumns:
+    if TRANSFER_CREDIT not in columns.extras:
+        return columns
+    keep = [code != 2 or extra != TRANSFER_CREDIT for code, extra in zip(columns.codes, columns.extras)]
+    result = TransactionColumns()
+    result.codes = array("B", itertools.compress(columns.codes, keep))
+    result.accountNumbers = array("L", itertools.compress(columns.accountNumbers, keep))
+    result.amounts = array("q", itertools.compress(columns.amounts, keep))
+    result.holderNames = list(itertools.compress(columns.holderNames, keep))
+    result.extras = list(itertools.compress(columns.extras, keep))
+    result.finished = columns.finished
+    return result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python transaction_reader.py <transactions_file>")
+        sys.exit(1)
+    problems = []
+    columns = readColumns(sys.argv[1], problems)
+    for offset, record in problems:
+        print(f"Malformed record at byte {offset}: {record!r}")
+    state = "finished" if columns.finished else "missing its end record"
+    print(f"{len(columns)} transactions, {len(problems)} malformed, {state}.")
@@ -0,0 +1,215 @@
+"""
+validation.py - the business rules for proposed transactions, in bulk
+
+validateBatch takes columns of proposed withdrawals (01), transfers (02),
+paybills (03) and deposits (04) plus the Session they belong to and
+returns one reason code per transaction, ACCEPTED (0) or why it was
+rejected. Nothing is changed: the session totals and balances the rules
+need are tracked on the side, so a transaction is checked as if every
+accepted one before it had been applied.
+
+The checks, in the order the front end makes them:
+    code            01-04, the commands that move money
+    payee           paybills go to EC, CQ or FI
+    amount          positive
+    limit           the session withdraw / transfer / paybill limits
+                    (standard sessions, cumulative over accepted amounts)
+    account         the account (and a transfer's target) exists
+    owner           standard sessions only use the logged in user's accounts
+    active          the accounts are not disabled
+    funds           the balance covers a withdrawal, transfer or paybill
+
+Reason codes are numbered so that an earlier check has a larger code.
+The checks that need no state (code, payee, amount) are computed over
+the whole batch as byte vectors and combined with max; only the
+transactions that pass them are walked in order for the rest.
+
+Usage (check a daily file as one admin session would make it):
+    python validation.py <accounts_file> <transactions_file>
+"""
+
+import itertools
+import operator
+import sys
+
+# reason codes, larger = checked earlier
+ACCEPTED = 0
+INSUFFICIENT_FUNDS = 1
+ACCOUNT_DISABLED = 2
+NOT_OWNER = 3
+NOT_FOUND = 4
+LIMIT_EXCEEDED = 5
+NOT_POSITIVE = 6
+INVALID_PAYEE = 7
+INVALID_CODE = 8
+
+REASONS = ("accepted", "insufficient_funds", "account_disabled", "not_owner", "not_found",
+           "limit_exceeded", "not_positive", "invalid_payee", "invalid_code")
+
+WITHDRAW = 1
+TRANSFER = 2
+PAYBILL = 3
+DEPOSIT = 4
+
+PAYEES = ("EC", "CQ", "FI")
+
+# every spelling of a payee code, for a C-level membership test
+_PAYEE_CODES = frozenset("".join(spelling) for payee in PAYEES
+                         for spelling in itertools.product(*((ch.lower(), ch.upper()) for ch in payee)))
+
+
+# translate table: value -> code for the values in wanted, 0 elsewhere
+def _table(wanted, code: int) -> bytes:
+    table = bytearray(256)
+    for value in wanted:
+        table[value] = code
+    return bytes(table)
+
+
+_CODE_REASONS = bytes(INVALID_CODE if code not in (WITHDRAW, TRANSFER, PAYBILL, DEPOSIT) else ACCEPTED
+                      for code in range(256))
+_PAYBILLS = _table((PAYBILL,), 1)
+_NOT_POSITIVE = _table((0,), NOT_POSITIVE)
+_INVALID_PAYEE = _table((1,), INVALID_PAYEE)
+
+
+# True if code is a valid payee (any case)
+def isValidPayee(code: str) -> bool:
+    return code in _PAYEE_CODES
+
+
+# the reason code for every proposed transaction:
+#   codes           transaction codes (ints)
+#   accountNumbers  account numbers as 5-digit strings
+#   amounts         amounts in the session's money representation
+#   extras          payee codes for paybills, target account numbers for transfers
+#   accounts        anything with getAccount(accountNumber), e.g. an AccountManager
+#   found           optional dict that receives every account looked up
+def validateBatch(codes, accountNumbers, amounts, extras, session, accounts,
+                  found: dict = None) -> bytearray:
+    codes = bytes(codes)
+    count = len(codes)
+    if not (len(accountNumbers) == len(amounts) == len(extras) == count):
+        raise ValueError("Batch columns must have the same length")
+
+    # checks that need no state, over the whole batch
+    codeReasons = codes.translate(_CODE_REASONS)
+    # 1 for paybills whose payee is not valid
+    badPayee = bytes(map(operator.gt, codes.translate(_PAYBILLS), map(_PAYEE_CODES.__contains__, extras)))
+    positive = bytes(map(operator.gt, amounts, itertools.repeat(0)))
+    reasons = bytearray(map(max, codeReasons, badPayee.translate(_INVALID_PAYEE),
+                            positive.translate(_NOT_POSITIVE)))
+
+    admin = session.isAdmin()
+    holderName = session.currentUser
+    totals = {WITHDRAW: session.withdrawTotal, TRANSFER: session.transferTotal, PAYBILL: session.paybillTotal}
+    limits = {WITHDRAW: session.withdrawLimit, TRANSFER: session.transferLimit, PAYBILL: session.paybillLimit}
+    balances = {}  # account number -> balance after the accepted transactions
+    if found is None:
+        found = {}
+
+    def lookup(accountNumber):
+        if accountNumber not in found:
+            found[accountNumber] = accounts.getAccount(accountNumber)
+        return found[accountNumber]
+
+    i = reasons.find(ACCEPTED)
+    while i >= 0:
+        code = codes[i]
+        amount = amounts[i]
+        accountNumber = accountNumbers[i]
+        reason = ACCEPTED
+        account = target = None
+
+        if not admin and code != DEPOSIT and totals[code] + amount > limits[code]:
+            reason = LIMIT_EXCEEDED
+        else:
+            account = lookup(accountNumber)
+            if code == TRANSFER:
+                target = lookup(extras[i])
+            if account is None or (code == TRANSFER and target is None):
+                reason = NOT_FOUND
+            elif not admin and not _owns(account, holderName, code):
+                reason = NOT_OWNER
+            elif not account.isActive() or (target is not None and not target.isActive()):
+                reason = ACCOUNT_DISABLED
+            elif code != DEPOSIT and balances.get(accountNumber, account.balance) < amount:
+                reason = INSUFFICIENT_FUNDS
+
+        if reason:
+            reasons[i] = reason
+        elif code != DEPOSIT:
+            # deposits only become available in the next session
+            totals[code] += amount
+            balances[accountNumber] = balances.get(accountNumber, account.balance) - amount
+            if target is not None:
+                balances[target.accountNumber] = balances.get(target.accountNumber, target.balance) + amount
+        i = reasons.find(ACCEPTED, i + 1)
+    return reasons
+
+
+# validateBatch over Transaction objects
+def validateTransactions(transactions: list, session, accounts, found: dict = None) -> bytearray:
+    return validateBatch([int(transaction.code) for transaction in transactions],
+                         [transaction.accountNumber for transaction in transactions],
+                         [transaction.amount for transaction in transactions],
+                         [transaction.extra for transaction in transactions],
+                         session, accounts, found)
+
+
+# validateBatch over TransactionColumns (transaction_reader.readColumns),
+# amounts are converted from cents to the session's money. A transfer's
+# target is the account of the credit record after it; credit records are
+# not checked on their own and get no reason code
+def validateColumns(columns, session, accounts, found: dict = None) -> bytearray:
+    from transaction import TRANSFER_CREDIT
+    from transaction_reader import withoutTransferCredits
+
+    extras = columns.extras
+    if TRANSFER_CREDIT in extras:
+        extras = list(extras)
+        for i in range(1, len(extras)):
+            if extras[i] == TRANSFER_CREDIT and columns.codes[i] == TRANSFER and columns.codes[i - 1] == TRANSFER:
+                extras[i - 1] = f"{columns.accountNumbers[i]:05d}"
+        keep = [code != TRANSFER or extra != TRANSFER_CREDIT for code, extra in zip(columns.codes, columns.extras)]
+        extras = list(itertools.compress(extras, keep))
+        columns = withoutTransferCredits(columns)
+    if session.money.cents:
+        amounts = columns.amounts
+    else:
+        amounts = [cents / 100 for cents in columns.amounts]
+    return validateBatch(columns.codes, [f"{num:05d}" for num in columns.accountNumbers], amounts,
+                         extras, session, accounts, found)
+
+
+# deposits accept the owner's name in any case, debits need it exactly
+def _owns(account, holderName: str, code: int) -> bool:
+    if code == DEPOSIT:
+        return account.matchesOwner(holderName)
+    return account.holderName == holderName
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python validation.py <accounts_file> <transactions_file>")
+        sys.exit(1)
+
+    from account_manager import AccountManager
+    from money import CENTS_MONEY
+    from session import Session, SessionMode
+    from transaction_reader import readColumns
+
+    manager = AccountManager(CENTS_MONEY)
+    manager.loadAccountsFromFile(sys.argv[1])
+    session = Session(CENTS_MONEY)
+    session.login(SessionMode.ADMIN, "admin")
+    try:
+        columns = readColumns(sys.argv[2])
+    except (FileNotFoundError, ValueError) as error:
+        print(f"Could not read transactions: {error}")
+        sys.exit(1)
+    reasons = validateColumns(columns, session, manager)
+    for code, name in enumerate(REASONS):
+        count = reasons.count(code)
+        if count:
+            print(f"{name:<20}{count}")